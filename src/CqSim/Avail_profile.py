@@ -0,0 +1,452 @@
+from bisect import bisect_left, bisect_right
+
+__metaclass__ = type
+
+class Avail_profile:
+    """
+    Availability profile: the points (time, avail) in time order, used as Node_struc_SWF.predict_node.
+
+    - The points are kept in blocks of at most 2*load points (times and avails in flat lists),
+      a block is split in two when it grows past that and dropped when it is empty.
+    - Every block keeps its first index, its last time, the min and the max of its avails and a
+      lazy add counted in min and max but not yet in its avails. In an overlay the min and max
+      are only bounds (a min below the real one, a max above), they are made exact again
+      outside overlays. They are only used to skip blocks.
+    - Points are found by position or by time (bisect) with a binary search over the blocks, then
+      inside the block. earliest_fit / fits / first_short skip the blocks whose min or max
+      answers for the whole block, add updates a whole block through its lazy add.
+      earliest_fit runs the whole search of a reservation in one walk over the blocks.
+      A query or an update touches at most two partial blocks, O(load + n/load) for n points,
+      the scans inside a block are on plain lists of numbers.
+    - Times never decrease along the profile, bisect / fits / earliest_fit rely on it. The caller
+      keeps them in order: Node_struc_SWF inserts the points in order and its pre_reset moves the
+      ends passed (jobs running past their end) to the current time with the first point.
+    - Points are addressed by their position, like the list of dicts used before:
+      profile[i] returns {'time', 'idle', 'avail'}, iterating gives the points in order.
+    - begin() starts an overlay: the changes made after it are dropped by rollback() (the last
+      overlay) or discard() (all the overlays). Overlays nest, a search can keep a prefix of
+      reservations and try the next one on top of it.
+      The block lists are copied by begin() (n/load entries), a block is copied the first time
+      it is changed in an overlay (copy on write), rollback() puts the saved lists back.
+    """
+    def __init__(self, load = 64):
+        self.myInfo = "Avail Profile"
+        self.load = load
+        self.times = []
+        self.avails = []
+        self.lazy = []
+        self.mins = []
+        self.maxes = []
+        self.lasts = []
+        self.offsets = []
+        self.length = 0
+        self.saved = []
+        self.owned = set()
+
+    def begin(self):
+        """
+        Starts an overlay, the profile before begin() comes back on rollback().
+        """
+        self.saved.append((self.times, self.avails, self.lazy, self.mins, self.maxes, self.lasts,\
+         self.offsets, self.length, self.owned))
+        self.owned = set()
+        self.times = self.times[:]
+        self.avails = self.avails[:]
+        self.lazy = self.lazy[:]
+        self.mins = self.mins[:]
+        self.maxes = self.maxes[:]
+        self.lasts = self.lasts[:]
+        self.offsets = self.offsets[:]
+
+    def rollback(self):
+        """
+        Drops the changes made since the last begin().
+        """
+        (self.times, self.avails, self.lazy, self.mins, self.maxes, self.lasts,\
+         self.offsets, self.length, self.owned) = self.saved.pop()
+
+    def discard(self):
+        """
+        Drops the changes made since the first begin().
+        """
+        if (not self.saved):
+            return
+        del self.saved[1:]
+        self.rollback()
+
+    def copy(self):
+        """
+        Returns a copy of the profile without its overlays (the profile before the first begin()).
+        """
+        if (self.saved):
+            (temp_times, temp_avails, temp_lazy, temp_mins, temp_maxes, temp_lasts,\
+             temp_offsets, temp_length, temp_owned) = self.saved[0]
+        else:
+            (temp_times, temp_avails, temp_lazy, temp_mins, temp_maxes, temp_lasts,\
+             temp_offsets, temp_length) = (self.times, self.avails, self.lazy, self.mins, self.maxes,\
+             self.lasts, self.offsets, self.length)
+        temp_profile = Avail_profile(self.load)
+        temp_profile.times = [temp_block[:] for temp_block in temp_times]
+        temp_profile.avails = [temp_block[:] for temp_block in temp_avails]
+        temp_profile.lazy = temp_lazy[:]
+        temp_profile.mins = temp_mins[:]
+        temp_profile.maxes = temp_maxes[:]
+        temp_profile.lasts = temp_lasts[:]
+        temp_profile.offsets = temp_offsets[:]
+        temp_profile.length = temp_length
+        return temp_profile
+
+    def own(self, b):
+        # copy the block b before its first change in an overlay
+        if (self.saved and id(self.avails[b]) not in self.owned):
+            self.times[b] = self.times[b][:]
+            self.avails[b] = self.avails[b][:]
+            self.owned.add(id(self.avails[b]))
+
+    def __len__(self):
+        return self.length
+
+    def locate(self, i):
+        """
+        Returns (block, index in the block) of the point i, i == len(self) goes after the last point.
+        """
+        b = bisect_right(self.offsets, i) - 1
+        if (b < 0):
+            return 0, 0
+        return b, i - self.offsets[b]
+
+    def point(self, i):
+        """
+        Returns (time, avail) of the point i.
+        """
+        if (i < 0 or i >= self.length):
+            raise IndexError(i)
+        b = bisect_right(self.offsets, i) - 1
+        k = i - self.offsets[b]
+        return self.times[b][k], self.avails[b][k] + self.lazy[b]
+
+    def time(self, i):
+        return self.point(i)[0]
+
+    def avail(self, i):
+        return self.point(i)[1]
+
+    def set_time(self, i, time):
+        """
+        Moves the point i to time, it must stay between its neighbours.
+        """
+        if (i < 0 or i >= self.length):
+            raise IndexError(i)
+        b, k = self.locate(i)
+        self.own(b)
+        self.times[b][k] = time
+        if (k == len(self.times[b]) - 1):
+            self.lasts[b] = time
+
+    def bisect(self, time, lo = 0):
+        """
+        Returns the first point at or after lo with a time >= time (len(self) when there is none).
+        """
+        b = bisect_left(self.lasts, time)
+        if (b == len(self.lasts)):
+            return self.length
+        return max(lo, self.offsets[b] + bisect_left(self.times[b], time))
+
+    def earliest_fit(self, proc_num, i, length):
+        """
+        Returns the first point at or after i from which proc_num processors stay available
+        for length: its avail and the avail of every point before its time + length are
+        >= proc_num (len(self) when there is none).
+        """
+        if (i >= self.length):
+            return self.length
+        b, k = self.locate(i)
+        temp_block_num = len(self.times)
+        while (b < temp_block_num):
+            # first point with proc_num processors
+            if (self.maxes[b] < proc_num):
+                b += 1
+                k = 0
+                continue
+            temp_avails = self.avails[b]
+            temp_proc = proc_num - self.lazy[b]
+            temp_num = len(temp_avails)
+            while (k < temp_num and temp_avails[k] < temp_proc):
+                k += 1
+            if (k == temp_num):
+                b += 1
+                k = 0
+                continue
+            # first point short of processors before the end
+            end = self.times[b][k] + length
+            b_short = b
+            k_short = k + 1
+            is_short = 0
+            while (b_short < temp_block_num and is_short == 0):
+                if (self.mins[b_short] >= proc_num):
+                    if (self.lasts[b_short] >= end):
+                        break
+                    b_short += 1
+                    k_short = 0
+                    continue
+                temp_times = self.times[b_short]
+                temp_avails = self.avails[b_short]
+                temp_proc = proc_num - self.lazy[b_short]
+                temp_num = len(temp_avails)
+                while (k_short < temp_num):
+                    if (temp_times[k_short] >= end):
+                        break
+                    if (temp_avails[k_short] < temp_proc):
+                        is_short = 1
+                        break
+                    k_short += 1
+                if (k_short < temp_num):
+                    break
+                b_short += 1
+                k_short = 0
+            if (is_short == 0):
+                return self.offsets[b] + k
+            b = b_short
+            k = k_short + 1
+        return self.length
+
+    def fits(self, proc_num, start, end):
+        """
+        Returns True when the points from start to end (times) all have avail >= proc_num.
+        """
+        b = bisect_left(self.lasts, start)
+        if (b == len(self.lasts)):
+            return True
+        k = bisect_left(self.times[b], start)
+        temp_block_num = len(self.times)
+        while (b < temp_block_num):
+            if (self.mins[b] < proc_num):
+                temp_times = self.times[b]
+                temp_avails = self.avails[b]
+                temp_proc = proc_num - self.lazy[b]
+                temp_num = len(temp_avails)
+                while (k < temp_num):
+                    if (temp_times[k] >= end):
+                        return True
+                    if (temp_avails[k] < temp_proc):
+                        return False
+                    k += 1
+            elif (self.lasts[b] >= end):
+                return True
+            b += 1
+            k = 0
+        return True
+
+    def first_short(self, proc_num, i, end):
+        """
+        Returns the first point at or after i and before end (time) with avail < proc_num
+        (len(self) when there is none).
+        """
+        if (i >= self.length):
+            return self.length
+        b, k = self.locate(i)
+        temp_block_num = len(self.times)
+        while (b < temp_block_num):
+            if (self.mins[b] < proc_num):
+                temp_times = self.times[b]
+                temp_avails = self.avails[b]
+                temp_proc = proc_num - self.lazy[b]
+                temp_num = len(temp_avails)
+                while (k < temp_num):
+                    if (temp_times[k] >= end):
+                        return self.length
+                    if (temp_avails[k] < temp_proc):
+                        return self.offsets[b] + k
+                    k += 1
+            elif (self.lasts[b] >= end):
+                return self.length
+            b += 1
+            k = 0
+        return self.length
+
+    def add(self, i, j, d):
+        """
+        Adds d to the avail of the points i to j-1.
+        """
+        if (j > self.length):
+            j = self.length
+        if (i >= j or not d):
+            return
+        b, k = self.locate(i)
+        b_end, k_end = self.locate(j - 1)
+        if (b == b_end):
+            self.add_block(b, k, k_end + 1, d)
+            return
+        self.add_block(b, k, len(self.avails[b]), d)
+        temp_b = b + 1
+        while (temp_b < b_end):
+            self.lazy[temp_b] += d
+            self.mins[temp_b] += d
+            self.maxes[temp_b] += d
+            temp_b += 1
+        self.add_block(b_end, 0, k_end + 1, d)
+
+    def add_block(self, b, k, k_end, d):
+        if (k == 0 and k_end == len(self.avails[b])):
+            self.lazy[b] += d
+            self.mins[b] += d
+            self.maxes[b] += d
+            return
+        self.own(b)
+        temp_avails = self.avails[b]
+        temp_new = [temp_avail + d for temp_avail in temp_avails[k:k_end]]
+        temp_avails[k:k_end] = temp_new
+        if (not self.saved):
+            self.mins[b] = min(temp_avails) + self.lazy[b]
+            self.maxes[b] = max(temp_avails) + self.lazy[b]
+        elif (d < 0):
+            self.mins[b] = min(self.mins[b], min(temp_new) + self.lazy[b])
+        else:
+            self.maxes[b] = max(self.maxes[b], max(temp_new) + self.lazy[b])
+
+    def take(self, proc_num, i, end, tot):
+        """
+        Takes proc_num processors from the point i until end: the points from i to end lose
+        them, a point is added at end when there is none, with the avail of the point before it
+        (tot after the last point).
+        """
+        b, k = self.locate(i)
+        temp_times = self.times[b]
+        k_end = bisect_left(temp_times, end, k)
+        if (k < k_end and (k_end < len(temp_times) or b == len(self.times) - 1)):
+            # the points taken are all in the block b
+            if (k_end < len(temp_times) and temp_times[k_end] == end):
+                self.add_block(b, k, k_end, -proc_num)
+                return
+            if (k_end == len(temp_times)):
+                temp_avail = tot
+            else:
+                temp_avail = self.avails[b][k_end-1] + self.lazy[b]
+            self.own(b)
+            temp_times = self.times[b]
+            temp_avails = self.avails[b]
+            temp_new = [temp_value - proc_num for temp_value in temp_avails[k:k_end]]
+            temp_avails[k:k_end] = temp_new
+            temp_min = min(temp_new) + self.lazy[b]
+            if (temp_min < self.mins[b]):
+                self.mins[b] = temp_min
+            temp_times.insert(k_end, end)
+            temp_avails.insert(k_end, temp_avail - self.lazy[b])
+            self.after_insert(b, temp_avail)
+            return
+        j = self.bisect(end, i)
+        if (j == self.length):
+            self.add(i, j, -proc_num)
+            self.insert(j, end, tot)
+            return
+        b, k = self.locate(j)
+        if (self.times[b][k] == end):
+            self.add(i, j, -proc_num)
+            return
+        # the avail of the point before j, before it loses proc_num
+        if (k > 0):
+            temp_avail = self.avails[b][k-1] + self.lazy[b]
+        else:
+            temp_avail = self.avails[b-1][-1] + self.lazy[b-1]
+        if (j == i):
+            temp_avail += proc_num
+        self.add(i, j, -proc_num)
+        self.insert(j, end, temp_avail)
+
+    def insert(self, i, time, avail):
+        """
+        Inserts the point (time, avail) before the point i.
+        """
+        if (self.length == 0):
+            self.times = [[time]]
+            self.avails = [[avail]]
+            self.lazy = [0]
+            self.mins = [avail]
+            self.maxes = [avail]
+            self.lasts = [time]
+            self.offsets = [0]
+            self.length = 1
+            return
+        if (i >= self.length):
+            b = len(self.times) - 1
+            k = len(self.times[b])
+        else:
+            b, k = self.locate(i)
+        self.insert_block(b, k, time, avail)
+
+    def insert_block(self, b, k, time, avail):
+        self.own(b)
+        self.times[b].insert(k, time)
+        self.avails[b].insert(k, avail - self.lazy[b])
+        self.after_insert(b, avail)
+
+    def after_insert(self, b, avail):
+        # block b got a point of avail
+        if (avail < self.mins[b]):
+            self.mins[b] = avail
+        if (avail > self.maxes[b]):
+            self.maxes[b] = avail
+        self.lasts[b] = self.times[b][-1]
+        self.length += 1
+        temp_b = b + 1
+        temp_block_num = len(self.times)
+        while (temp_b < temp_block_num):
+            self.offsets[temp_b] += 1
+            temp_b += 1
+        if (len(self.times[b]) > 2 * self.load):
+            self.split_block(b)
+
+    def split_block(self, b):
+        temp_lazy = self.lazy[b]
+        temp_times = self.times[b]
+        temp_avails = self.avails[b]
+        self.times[b:b+1] = [temp_times[:self.load], temp_times[self.load:]]
+        self.avails[b:b+1] = [temp_avails[:self.load], temp_avails[self.load:]]
+        self.lazy[b:b+1] = [temp_lazy, temp_lazy]
+        self.mins[b:b+1] = [min(self.avails[b]) + temp_lazy, min(self.avails[b+1]) + temp_lazy]
+        self.maxes[b:b+1] = [max(self.avails[b]) + temp_lazy, max(self.avails[b+1]) + temp_lazy]
+        self.lasts[b:b+1] = [self.times[b][-1], self.times[b+1][-1]]
+        self.offsets[b+1:b+1] = [self.offsets[b] + self.load]
+        if (self.saved):
+            self.owned.add(id(self.avails[b]))
+            self.owned.add(id(self.avails[b+1]))
+
+    def delete(self, i):
+        if (i < 0 or i >= self.length):
+            raise IndexError(i)
+        b, k = self.locate(i)
+        self.own(b)
+        del self.times[b][k]
+        del self.avails[b][k]
+        self.length -= 1
+        temp_b = b + 1
+        temp_block_num = len(self.times)
+        while (temp_b < temp_block_num):
+            self.offsets[temp_b] -= 1
+            temp_b += 1
+        if (len(self.times[b]) == 0):
+            del self.times[b]
+            del self.avails[b]
+            del self.lazy[b]
+            del self.mins[b]
+            del self.maxes[b]
+            del self.lasts[b]
+            del self.offsets[b]
+            return
+        if (not self.saved):
+            self.mins[b] = min(self.avails[b]) + self.lazy[b]
+            self.maxes[b] = max(self.avails[b]) + self.lazy[b]
+        self.lasts[b] = self.times[b][-1]
+
+    def __getitem__(self, i):
+        if (i < 0):
+            i += self.length
+        temp_time, temp_avail = self.point(i)
+        return {'time':temp_time, 'idle':temp_avail, 'avail':temp_avail}
+
+    def __iter__(self):
+        b = 0
+        while (b < len(self.times)):
+            for temp_time, temp_avail in zip(self.times[b], self.avails[b]):
+                yield {'time':temp_time, 'idle':temp_avail + self.lazy[b], 'avail':temp_avail + self.lazy[b]}
+            b += 1
@@ -50,6 +50,9 @@ class Backfill:
         elif (self.mode == 2):
             # Conservative backfill
             result = self.backfill_cons() 
+        elif (self.mode == 3):
+            # EASY backfill from the shadow time of the first job
+            result = self.backfill_EASY_shadow()
         else:
             return None
         return result
@@ -78,6 +81,52 @@ class Backfill:
             i += 1
         return backfill_list
         
+    def backfill_EASY_shadow(self):
+        #self.debug.debug("* "+self.myInfo+" -- backfill_EASY_shadow",5)
+        # Same jobs as backfill_EASY, without the reservation profile: the first job starts at the
+        # shadow time, the end of the first running jobs giving it enough processors, with extra
+        # processors left then. A job is backfilled when it fits in the idle processors and either
+        # ends by the shadow time or fits in the extra processors.
+        backfill_list=[]
+        temp_time = self.current_para['time']
+        temp_proc = self.wait_job[0]['proc']
+        temp_idle = self.node_module.get_idle()
+        
+        # shadow time, a single walk over the running jobs in end time order (see Node_struc.pre_reset)
+        temp_shadow = None
+        temp_avail = temp_idle
+        if (temp_avail >= temp_proc):
+            temp_shadow = temp_time
+        else:
+            temp_job_list = self.node_module.job_list
+            temp_job_num = len(temp_job_list)
+            i = 0
+            while (i < temp_job_num):
+                temp_avail += temp_job_list[i]['node']
+                # the jobs ending at the same time share their point
+                if (i == temp_job_num - 1 or temp_job_list[i+1]['end'] != temp_job_list[i]['end']):
+                    if (temp_avail >= temp_proc):
+                        temp_shadow = temp_job_list[i]['end']
+                        break
+                i += 1
+        temp_extra = temp_avail - temp_proc
+        
+        i = 1
+        job_num = len(self.wait_job)
+        while (i < job_num):
+            temp_job = self.wait_job[i]
+            temp_end = temp_time + temp_job['run']
+            if (temp_job['proc'] <= temp_idle):
+                if (temp_shadow == None or temp_end <= temp_shadow):
+                    backfill_list.append(temp_job['index'])
+                    temp_idle -= temp_job['proc']
+                elif (temp_job['proc'] <= temp_extra):
+                    backfill_list.append(temp_job['index'])
+                    temp_idle -= temp_job['proc']
+                    temp_extra -= temp_job['proc']
+            i += 1
+        return backfill_list
+        
     def backfill_cons(self):
         #self.debug.debug("* "+self.myInfo+" -- backfill_cons",5)
         backfill_list=[]
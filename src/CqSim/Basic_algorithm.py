@@ -1,3 +1,5 @@
+import ast
+import numpy as np
 
 __metaclass__ = type
 
@@ -22,6 +24,7 @@ class Basic_algorithm:
         while (i < temp_num):
             self.algStr += self.element[0][i]
             i += 1
+        self.compile_alg()
     
     def reset (self, ad_mode = None, element = None, debug = None, para_list = None, ad_para_list=None):
         #self.debug.debug("* "+self.myInfo+" -- reset",5)
@@ -41,6 +44,108 @@ class Basic_algorithm:
         while (i < temp_num):
             self.algStr += self.element[0][i]
             i += 1
+        self.compile_alg()
+    
+    def compile_alg(self):
+        #self.debug.debug("* "+self.myInfo+" -- compile_alg",5)
+        # The score expression is compiled once. It is first evaluated on whole columns,
+        # and falls back to one evaluation per job when the expression does not accept
+        # arrays (e.g. it calls min/max or uses integer-only operators).
+        self.algCode = compile(self.algStr, "<alg>", "eval")
+        self.vectorized = True
+        self.wait_form = self.analyse_alg()
+    
+    def __getstate__(self):
+        # code objects can not be pickled, compiled again by __setstate__
+        temp_state = dict(self.__dict__)
+        del temp_state['algCode']
+        return temp_state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.algCode = compile(self.algStr, "<alg>", "eval")
+
+    def __copy__(self):
+        # a copy shares the compiled expression
+        temp_alg = self.__class__.__new__(self.__class__)
+        temp_alg.__dict__.update(self.__dict__)
+        return temp_alg
+    
+    def analyse_alg(self):
+        #self.debug.debug("* "+self.myInfo+" -- analyse_alg",5)
+        # Tells how the score depends on the wait time w, so the wait queue can be kept in order
+        # without sorting it on every event (see Wait_index):
+        #   'fixed'  : a*w+c, a >= 0 and c are constants
+        #   'linear' : a*w+b, a and b only depend on s, t and n
+        #   None     : anything else, including every score using z or l
+        try:
+            tree = ast.parse(self.algStr.strip(), mode='eval')
+        except SyntaxError:
+            return None
+        self.alg_names = set()
+        degree = self.wait_degree(tree.body)
+        if (degree < 0 or 'z' in self.alg_names or 'l' in self.alg_names):
+            return None
+        if (self.alg_names & set(['s', 't', 'n'])):
+            return 'linear'
+        # With a < 0 two jobs tied on the truncated w can split against the arrival order
+        try:
+            if (eval(self.algCode, {}, {'w':1.0}) < eval(self.algCode, {}, {'w':0.0})):
+                return 'linear'
+        except Exception:
+            return None
+        return 'fixed'
+    
+    def wait_degree(self, node):
+        # 0: does not depend on w, 1: affine in w, -1: anything else
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+                return 0
+            return -1
+        if isinstance(node, ast.Name):
+            if node.id not in ('s', 't', 'n', 'w', 'z', 'l'):
+                return -1
+            self.alg_names.add(node.id)
+            if (node.id == 'w'):
+                return 1
+            return 0
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            return self.wait_degree(node.operand)
+        if isinstance(node, ast.BinOp):
+            left = self.wait_degree(node.left)
+            right = self.wait_degree(node.right)
+            if (left < 0 or right < 0):
+                return -1
+            if isinstance(node.op, (ast.Add, ast.Sub)):
+                return max(left, right)
+            if isinstance(node.op, ast.Mult):
+                if (left + right > 1):
+                    return -1
+                return left + right
+            if isinstance(node.op, ast.Div):
+                if (right > 0):
+                    return -1
+                return left
+            if (left + right == 0):
+                return 0
+        return -1
+    
+    def get_score_coef(self, submit, reqTime, reqProc):
+        #self.debug.debug("* "+self.myInfo+" -- get_score_coef",5)
+        # For a 'linear' or 'fixed' score, returns the arrays a and b with score = a*w+b,
+        # or None when the score cannot be evaluated on the columns.
+        waitNum = len(submit)
+        try:
+            with np.errstate(divide='raise', invalid='raise'):
+                temp_local = {'s':submit, 't':reqTime, 'n':reqProc, 'w':np.zeros(waitNum)}
+                inter = np.broadcast_to(np.asarray(eval(self.algCode, {}, temp_local), dtype=float), (waitNum,))
+                temp_local['w'] = np.ones(waitNum)
+                slope = np.broadcast_to(np.asarray(eval(self.algCode, {}, temp_local), dtype=float), (waitNum,)) - inter
+        except Exception:
+            return None
+        if not (np.all(np.isfinite(slope)) and np.all(np.isfinite(inter))):
+            return None
+        return slope, inter
             
     def get_score(self, wait_job, currentTime, para_list = None):
         #self.debug.debug("* "+self.myInfo+" -- get_score",5)
@@ -67,10 +172,42 @@ class Basic_algorithm:
                 t = float(wait_job[i]['reqTime'])
                 n = float(wait_job[i]['reqProc'])
                 w = int(currentTime - s)
-                self.scoreList.append(float(eval(self.algStr)))
+                self.scoreList.append(float(eval(self.algCode)))
                 i += 1
         #self.debug.debug("  Score:"+str(self.scoreList),4)
         return self.scoreList
+    
+    def get_score_columns(self, submit, reqTime, reqProc, wait, para_list = None):
+        #self.debug.debug("* "+self.myInfo+" -- get_score_columns",5)
+        # submit, reqTime, reqProc: numpy arrays over the wait queue
+        # wait: current time minus submit, for every waiting job
+        waitNum = len(submit)
+        if (waitNum<=0):
+            self.scoreList = []
+            return self.scoreList
+        z = float(wait.max())
+        l = float(reqTime.min())
+        if (z == 0):
+            z = 1
+        if (self.vectorized):
+            try:
+                with np.errstate(divide='raise', invalid='raise'):
+                    scores = eval(self.algCode, {}, {'s':submit, 't':reqTime, 'n':reqProc,\
+                     'w':np.trunc(wait), 'z':z, 'l':l})
+                self.scoreList = np.broadcast_to(np.asarray(scores, dtype=float), (waitNum,)).tolist()
+                return self.scoreList
+            except Exception:
+                self.vectorized = False
+        self.scoreList = []
+        i = 0
+        while (i<waitNum):
+            s = float(submit[i])
+            t = float(reqTime[i])
+            n = float(reqProc[i])
+            w = int(wait[i])
+            self.scoreList.append(float(eval(self.algCode)))
+            i += 1
+        return self.scoreList
             
     def log_analysis(self):
         #self.debug.debug("* "+self.myInfo+" -- log_analysis",5)
@@ -0,0 +1,111 @@
+import os
+import time
+import zlib
+import struct
+import pickle
+
+__metaclass__ = type
+
+# Header of a checkpoint file: magic, then the format version (little endian uint32).
+CHECKPOINT_MAGIC = b'CQSIMCKP'
+CHECKPOINT_VERSION = 1
+
+class Checkpoint:
+    """
+    Checkpoint of simulators on disk, a long simulation resumes from it after a crash.
+
+    - The file is CHECKPOINT_MAGIC, the version, then the state pickled and compressed with
+      zlib: the simulators (Cqsim_sim and its modules, see their __getstate__) and the data of
+      the caller (extra, e.g. the bookkeeping of Cqsim_plus). The job file is not saved, only
+      the offset of its next line, the trace cache columns are saved as their file names.
+    - save() writes a temporary file next to the checkpoint, flushes it to disk then renames it
+      over the checkpoint: a crash leaves the previous checkpoint or the new one, never a part.
+    - The output files are appended to during the simulation, their sizes are saved with the
+      state. load() cuts them back to these sizes, the lines after the checkpoint are written
+      again by the resumed simulators.
+    - due() tells when the next checkpoint is to be written: every_events events or
+      every_minutes minutes after the last one.
+    """
+    def __init__(self, path, every_events = None, every_minutes = None):
+        self.myInfo = "Checkpoint"
+        self.path = path
+        self.every_events = every_events
+        self.every_minutes = every_minutes
+        self.last_events = 0
+        self.last_time = time.time()
+        self.save_num = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def due(self, event_num):
+        """
+        Returns 1 when a checkpoint is to be written after event_num events (all the simulators).
+        """
+        if (self.every_events != None and event_num - self.last_events >= self.every_events):
+            return 1
+        if (self.every_minutes != None and time.time() - self.last_time >= self.every_minutes*60):
+            return 1
+        return 0
+
+    def save(self, sims, extra = None, event_num = 0):
+        """
+        Writes the checkpoint of the simulators sims (Cqsim_sim) and of extra (picklable).
+        """
+        temp_sizes = []
+        for module_sim in sims:
+            for temp_file in module_sim.log_files():
+                temp_sizes.append((temp_file.filePath, temp_file.file_size()))
+        temp_state = {'sims':sims, 'extra':extra, 'log_sizes':temp_sizes, 'event_num':event_num}
+        temp_data = zlib.compress(pickle.dumps(temp_state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+        temp_dir = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(CHECKPOINT_MAGIC)
+            temp_file.write(struct.pack('<I', CHECKPOINT_VERSION))
+            temp_file.write(temp_data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, self.path)
+        if hasattr(os, 'O_DIRECTORY'):
+            # the rename itself is on disk once the directory is
+            temp_fd = os.open(temp_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(temp_fd)
+            finally:
+                os.close(temp_fd)
+
+        self.last_events = event_num
+        self.last_time = time.time()
+        self.save_num += 1
+        return len(temp_data)
+
+    def load(self):
+        """
+        Reads the checkpoint, truncates the output files of the simulators to their size then.
+
+        Returns:
+            (sims, extra): the simulators and the extra data given to save().
+        """
+        with open(self.path, 'rb') as temp_file:
+            temp_data = temp_file.read()
+        temp_head = len(CHECKPOINT_MAGIC)
+        if (temp_data[:temp_head] != CHECKPOINT_MAGIC):
+            raise ValueError("Not a checkpoint: "+str(self.path))
+        temp_version = struct.unpack('<I', temp_data[temp_head:temp_head+4])[0]
+        if (temp_version != CHECKPOINT_VERSION):
+            raise ValueError("Checkpoint version "+str(temp_version)+" not supported: "+str(self.path))
+        temp_state = pickle.loads(zlib.decompress(temp_data[temp_head+4:]))
+
+        temp_sizes = dict(temp_state['log_sizes'])
+        for module_sim in temp_state['sims']:
+            for temp_file in module_sim.log_files():
+                if (temp_file.filePath in temp_sizes):
+                    temp_file.file_truncate(temp_sizes[temp_file.filePath])
+
+        self.last_events = temp_state['event_num']
+        self.last_time = time.time()
+        return temp_state['sims'], temp_state['extra']
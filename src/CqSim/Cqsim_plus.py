@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+import contextlib
 from multiprocessing import Process, Pipe
 from unique_names_generator import get_random_name
 import json
@@ -15,12 +16,15 @@ import IOModule.Debug_log as Class_Debug_log
 import IOModule.Output_log as Class_Output_log
 
 import CqSim.Job_trace as Class_Job_trace
+import CqSim.Trace_cache as Class_Trace_cache
 #import CqSim.Node_struc as Class_Node_struc
 import CqSim.Backfill as Class_Backfill
 import CqSim.Start_window as Class_Start_window
 import CqSim.Basic_algorithm as Class_Basic_algorithm
 import CqSim.Info_collect as Class_Info_collect
 import CqSim.Cqsim_sim as Class_Cqsim_sim
+import CqSim.Turnaround_estimator as Class_Turnaround_estimator
+import CqSim.Checkpoint as Class_Checkpoint
 
 import Extend.SWF.Filter_job_SWF as filter_job_ext
 import Extend.SWF.Filter_node_SWF as filter_node_ext
@@ -54,6 +58,10 @@ class Cqsim_plus:
             traces: A map from trace paths to simulator ids, prevents the parsing of a trace that was already parsed.
             disable_child_stdout: Flag to disable the stdout of the child. (default: False)
             tag: A string used to create output folder under ../data/Results/
+            trace_cache: Cache of the filtered SWF traces shared across runs (see Trace_cache), None to disable it.
+            what_if_pool: Map from simulator ids to their what-if worker (process, connection), see start_what_if_pool.
+            what_if_deltas: Map from simulator ids to the calls changing the simulator since its worker was last synchronized.
+            sim_checkpoint: Checkpoint of the simulators on disk (see set_checkpoint), None without checkpoints.
         """
         
         self.monitor = 500
@@ -71,11 +79,25 @@ class Cqsim_plus:
         self.tag = tag
         if self.tag != None:
             self.exp_directory = f'../data/Results/{self.tag}'
+        self.trace_cache = Class_Trace_cache.Trace_cache()
+        self.what_if_pool = {}
+        self.what_if_deltas = {}
+        self.sim_checkpoint = None
 
     def set_exp_directory(self, dir):
         self.exp_directory = dir
 
+    def set_trace_cache_directory(self, dir):
+        """
+        Sets the directory of the trace cache, None disables the cache.
+        """
+        if dir == None:
+            self.trace_cache = None
+        else:
+            self.trace_cache = Class_Trace_cache.Trace_cache(dir)
+
     def set_sim_times(self, id, real_start_time, virtual_start_time):
+        self._record_what_if_delta(id, 'set_sim_times', real_start_time, virtual_start_time)
         job_module = self.sim_modules[id].module['job']
         job_module.real_start_time = real_start_time
         job_module.virtual_start_time = virtual_start_time
@@ -158,6 +180,53 @@ class Cqsim_plus:
 
         #return job_ids, job_procs, job_submits
     
+    def get_job_records(self, trace_dir, trace_file):
+        """
+        Get the jobs of a trace as given to simulators by submit_job().
+        The SWF trace is filtered as single_cqsim() does.
+
+        Parameters
+        ----------
+        trace_dir : str
+            A path to the directory where the trace file is located.
+        trace_file : str
+            The trace file name to read.
+
+        Returns
+        -------
+        job_records : list[dict]
+            The fields of the formatted trace (Job_trace.FMT_FIELDS) of every job, in submit order.
+        """
+        trace_name = trace_file.split('.')[0]
+        fmt_dir = f'{self.exp_directory}/jobs/Fmt'
+        if not os.path.exists(fmt_dir):
+            os.makedirs(fmt_dir)
+        module_debug = Class_Debug_log.Debug_log(
+            lvl=0,
+            show=0,
+            path=f'{fmt_dir}/{trace_name}_debug.log',
+            log_freq=1
+        )
+        module_debug.disable()
+        module_filter_job = filter_job_ext.Filter_job_SWF(
+            trace=f'{trace_dir}/{trace_file}', 
+            save=f'{fmt_dir}/{trace_name}.csv', 
+            config=f'{fmt_dir}/{trace_name}.con', 
+            debug=module_debug
+        )
+        columns = {}
+        if self.trace_cache != None:
+            job_cache = module_filter_job.feed_job_trace_cached(self.trace_cache)
+            for name in Class_Job_trace.FMT_FIELDS:
+                columns[name] = job_cache[name].tolist()
+        else:
+            blocks = []
+            module_filter_job.feed_job_trace(blocks)
+            for name in Class_Job_trace.FMT_FIELDS:
+                columns[name] = [value for block in blocks for value in block[name].tolist()]
+        temp_cols = [columns[name] for name in Class_Job_trace.FMT_FIELDS]
+        return [dict(zip(Class_Job_trace.FMT_FIELDS, temp_row)) for temp_row in zip(*temp_cols)]
+
     def get_miscellaneous_data(self, trace_dir, trace_file, parsed_trace = False):
         """
         Get the miscellaneous job data from some trace.
@@ -209,7 +278,7 @@ class Cqsim_plus:
         return cluster_ids, gpu_req
 
 
-    def single_cqsim(self, trace_dir, trace_file, proc_count, parsed_trace = False, sim_tag = 'sim'):
+    def single_cqsim(self, trace_dir, trace_file, proc_count, parsed_trace = False, sim_tag = 'sim', batch_events = False):
         """
         Sets up a single cqsim instance.
 
@@ -218,9 +287,11 @@ class Cqsim_plus:
         trace_dir : str
             A path to the directory where the trace file is located.
         trace_file : str
-            The trace file name to read.
+            The trace file name to read, None for no trace: the jobs are given by submit_job().
         proc_count: int
             The amount of processes for the simualted cluster.
+        batch_events: bool
+            Run one scheduling pass per batch of job events sharing a time stamp.
 
         Returns
         -------
@@ -238,7 +309,10 @@ class Cqsim_plus:
             if not os.path.exists(dir):
                 os.makedirs(dir)
 
-        trace_name = trace_file.split('.')[0]
+        if trace_file == None:
+            trace_name = 'jobs'
+        else:
+            trace_name = trace_file.split('.')[0]
 
         output_sys_file = f'{trace_name}.ult'
         output_adapt_file = f'{trace_name}.adp'
@@ -257,29 +331,22 @@ class Cqsim_plus:
         # Filter SWF module -- If needed
         fmt_job_file = f'{trace_name}.csv'
         fmt_job_config_file = f'{trace_name}.con'
-        fmt_node_file = f'{trace_name}_node.csv'
-        fmt_node_config_file = f'{trace_name}_node.con'
     
+        # Columns of the filtered trace, when it comes from the trace cache
+        job_cache = None
+
+        # No trace, nothing to parse
+        if trace_file == None:
+            pass
+
         # If the trace parsed is already in in .csv
-        if parsed_trace:
+        elif parsed_trace:
 
             destination = f'{fmt_dir}/{fmt_job_file}'
             source = f'{trace_dir}/{trace_file}'
 
             from CqSim.utils import copy_file
             copy_file(source, destination)
-            
-
-            # Generate Node realted format files
-            module_filter_node = filter_node_ext.Filter_node_SWF(
-                struc=None,
-                save=f'{fmt_dir}/{fmt_node_file}', 
-                config=f'{fmt_dir}/{fmt_node_config_file}', 
-                debug=module_debug
-            )
-            module_filter_node.static_node_struc(proc_count)
-            module_filter_node.output_node_data()
-            module_filter_node.output_node_config()
             pass
 
         # Parse SWF file
@@ -290,36 +357,28 @@ class Cqsim_plus:
                 config=f'{fmt_dir}/{fmt_job_config_file}', 
                 debug=module_debug
             )
-            module_filter_job.feed_job_trace()
+            if self.trace_cache != None:
+                job_cache = module_filter_job.feed_job_trace_cached(self.trace_cache)
+            else:
+                module_filter_job.feed_job_trace()
             module_filter_job.output_job_config()
 
-            module_filter_node = filter_node_ext.Filter_node_SWF(
-                struc=f'{trace_dir}/{trace_file}',
-                save=f'{fmt_dir}/{fmt_node_file}', 
-                config=f'{fmt_dir}/{fmt_node_config_file}', 
-                debug=module_debug
-            )
-            module_filter_node.static_node_struc(proc_count)
-            module_filter_node.output_node_data()
-            module_filter_node.output_node_config()
-
 
 
 
         # Job trace module
         module_job_trace = Class_Job_trace.Job_trace(
-            job_file_path=f'{fmt_dir}/{fmt_job_file}',
+            job_file_path=f'{fmt_dir}/{fmt_job_file}' if trace_file != None else None,
             debug=module_debug,
             real_start_time=0,
             virtual_start_time=0,
-            max_lines=1000
+            max_lines=1000,
+            job_cache=job_cache
         )
         # module_job_trace.import_job_config(f'{fmt_dir}/{fmt_job_config_file}')
 
-        # Node structure module
-        module_node_struc = node_struc_ext.Node_struc_SWF(debug=module_debug)
-        module_node_struc.import_node_file(f'{fmt_dir}/{fmt_node_file}')
-        module_node_struc.import_node_config(f'{fmt_dir}/{fmt_node_config_file}')
+        # Node structure module, proc_count identical processors, no node file needed
+        module_node_struc = node_struc_ext.Node_struc_SWF.from_proc_count(proc_count, debug=module_debug)
 
         # Backfill module
         module_backfill = Class_Backfill.Backfill(
@@ -373,7 +432,8 @@ class Cqsim_plus:
         module_sim = Class_Cqsim_sim.Cqsim_sim(
             module=module_list, 
             debug=module_debug, 
-            monitor = 500
+            monitor = 500,
+            batch_events = batch_events
         )
 
         # Get the generator object
@@ -452,38 +512,59 @@ class Cqsim_plus:
             if job_proc > self.sim_procs[id]:
                 continue
 
-            # Modify the job module so that no new jobs are read.
-            job_module = self.sim_modules[id].module['job']
-            job_module.update_max_lines(self.line_counters[id] + 1)
-
-            # Disable outputs of debug, log and output modules.
-            debug_module = self.sim_modules[id].module['debug']
-            output_module = self.sim_modules[id].module['output']
-            debug_module.disable()
-            output_module.disable()
-
-            if self.disable_child_stdout:
-                with open(os.devnull, 'w') as sys.stdout:
-                    while not self.check_sim_ended(id):
-                        self.line_step(id)
-            else:
-                with open(f'runon_{self.line_counters[id]}.txt', 'w') as sys.stdout:
-                    while not self.check_sim_ended(id):
-                        self.line_step(id)
-
-            df = output_module.get_result()
-            # Get the results for the job we just simulated
-            last_job_results = df.loc[df['id'] == job_id]
-
-            # Get the turnaround of the latest job.
-            last_job_turnaround = last_job_results['end'] - last_job_results['submit']
-            turnarounds[id] = float(last_job_turnaround.iloc[0])
+            # The turnaround is known once the job starts, the rest is not simulated.
+            result = self._run_until_start(id, job_id)
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
         
         json_string = json.dumps(turnarounds)
         conn.send(str(json_string))
         conn.close()
 
 
+    def _run_until_start(self, id, job_id):
+        """
+        Advances the simulator with given id by one line in the job file, then
+        runs it without new job input until the job job_id starts. Runs in the
+        current process, the simulator can not be used after it.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_id : int
+            id of the job in the trace
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+
+        # Modify the job module so that no new jobs are read.
+        job_module = self.sim_modules[id].module['job']
+        job_module.update_max_lines(self.line_counters[id] + 1)
+
+        # Disable outputs of debug, log and output modules.
+        debug_module = self.sim_modules[id].module['debug']
+        output_module = self.sim_modules[id].module['output']
+        debug_module.disable()
+        output_module.disable()
+
+        self.sim_modules[id].watch_job(job_id)
+        if self.disable_child_stdout:
+            with open(os.devnull, 'w') as sys.stdout:
+                while not self.check_sim_ended(id):
+                    self.line_step(id)
+        else:
+            with open(f'runon_{self.line_counters[id]}.txt', 'w') as sys.stdout:
+                while not self.check_sim_ended(id):
+                    self.line_step(id)
+        return self.sim_modules[id].watch_result
+
+
 
 
     def line_step(self, id, write_results = False) -> None:
@@ -501,8 +582,11 @@ class Cqsim_plus:
         -------
         None
         """
-        try:
-            next(self.sims[id])
+        self._record_what_if_delta(id, 'line_step')
+        # the worker replays the line while this simulator goes on
+        self.sync_what_if_worker(id)
+        # same as next(self.sims[id]), without going through the generator
+        if self.sim_modules[id].step():
             self.line_counters[id] += 1
 
             if write_results:
@@ -513,8 +597,87 @@ class Cqsim_plus:
                 df = self.rst_to_df(results)
                 df.to_csv(f'{dest_dir}/result.csv', index=False)
                 
-        except StopIteration:
+        else:
+            self.end_flags[id] = True
+
+
+    def submit_job(self, id, job_record):
+        """
+        Submits a job to a simulator set up without trace (single_cqsim with
+        trace_file None). The job is pushed in the event queue at its submit
+        time, the simulator runs up to it (Cqsim_sim.submit_job). The other
+        simulators are not touched: routing a job costs one submit_job.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_record : dict
+            fields of the job as in the formatted trace: 'id', 'submit', 'run',
+            'reqProc', 'reqTime' and optionally 'wait', before the scale factors.
+            Jobs are submitted in submit order.
+
+        Returns
+        -------
+        None
+        """
+        self._record_what_if_delta(id, 'submit_job', job_record)
+        self.sync_what_if_worker(id)
+        module_sim = self.sim_modules[id]
+        module_sim.submit_job(job_record)
+        self.line_counters[id] += 1
+        if module_sim.sim_phase == Class_Cqsim_sim.PHASE_DONE:
+            self.end_flags[id] = True
+
+
+    def end_submits(self, id):
+        """
+        No more jobs will be submitted to the simulator with given id (see
+        submit_job). line_step() or advance() then run it to its end.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+
+        Returns
+        -------
+        None
+        """
+        self._record_what_if_delta(id, 'end_submits')
+        self.sim_modules[id].end_submits()
+
+
+    def advance(self, id, until_time = None, until_jobs = None, max_events = None):
+        """
+        Advances a certain simulator with given id by many events at once
+        (Cqsim_sim.advance), instead of one line of the job file per line_step.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        until_time : float
+            stops before the first event after until_time (simulation time)
+        until_jobs : int
+            stops before a read of the job file once the line counter
+            of the simulator reaches until_jobs (as many line_step calls)
+        max_events : int
+            stops after max_events events
+
+        Returns
+        -------
+        event_num : int
+            number of events done
+        """
+        self._record_what_if_delta(id, 'advance', until_time, until_jobs, max_events)
+        self.sync_what_if_worker(id)
+        module_sim = self.sim_modules[id]
+        event_num = module_sim.advance(until_time, until_jobs, max_events)
+        self.line_counters[id] = module_sim.line_num
+        if module_sim.sim_phase == Class_Cqsim_sim.PHASE_DONE:
             self.end_flags[id] = True
+        return event_num
 
 
     def run_on(self, id):
@@ -626,6 +789,499 @@ class Cqsim_plus:
         return results
 
 
+    def line_step_what_if(self, id, job_id):
+        """
+        Creates a copy of the simulator with given id. The copied
+        simulator is advanced by one step in the job file then run
+        without any new jobs until the job job_id starts.
+
+        Unlike line_step_run_on(), the jobs after it are not simulated
+        and no job results are written.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_id : int
+            id of the job in the trace, usually the next job of the job file
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+        parent_conn, child_conn = Pipe()
+
+        p = Process(target=self._line_step_what_if_child, args=(id, job_id, child_conn,))
+        p.start()
+        child_conn.close()
+        json_str = ""
+        while True:
+            try:
+                msg = parent_conn.recv()
+                json_str = json_str + msg
+            except EOFError:  # Child closed the connection
+                break
+        p.join()
+        parent_conn.close()
+        return json.loads(json_str)
+
+
+    def _line_step_what_if_child(self, id, job_id, conn):
+        """
+        This function is a helper for line_step_what_if(). The function is run
+        inside a child process which contains the copy of a simulator.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_id : int
+            id of the job in the trace
+        conn:
+            piped connection for the child to send the result back to parent process.
+
+        Returns
+        -------
+        None
+        """
+        result = self._run_until_start(id, job_id)
+        conn.send(json.dumps(result))
+        conn.close()
+
+
+    def clone_cqsim(self, id, sim_tag = None):
+        """
+        Adds a copy of the simulator with given id, made in the current process
+        (Cqsim_sim.clone). The copy goes on from the same line of the job file,
+        independently of the original. It writes no output files, its results
+        are kept in memory (get_job_results).
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        sim_tag : str
+            tag of the copy, the tag of the original followed by the new id by default
+
+        Returns
+        -------
+        sim_id : int
+            id of the copy
+        """
+        sim_id = len(self.sims)
+        module_sim = self.sim_modules[id].clone()
+        self.sims.append(module_sim.cqsim_sim())
+        self.line_counters.append(self.line_counters[id])
+        self.end_flags.append(self.end_flags[id])
+        self.sim_modules.append(module_sim)
+        self.sim_procs.append(self.sim_procs[id])
+        self.sim_uses_parsed_trace.append(self.sim_uses_parsed_trace[id])
+        if sim_tag == None:
+            self.sim_tags.append(f'{self.sim_tags[id]}_{sim_id}')
+        else:
+            self.sim_tags.append(sim_tag)
+        return sim_id
+
+
+    def what_if_clone(self, id, job_id):
+        """
+        Same result as line_step_what_if(), the simulator is copied in the
+        current process (Cqsim_sim.clone) instead of a child process. The copy
+        is dropped afterwards, the simulator is not advanced.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_id : int
+            id of the job in the trace, usually the next job of the job file
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+        if self.end_flags[id]:
+            return None
+        module_sim = self.sim_modules[id].clone()
+        module_sim.module['job'].update_max_lines(self.line_counters[id] + 1)
+        module_sim.watch_job(job_id)
+        with contextlib.ExitStack() as stack:
+            if self.disable_child_stdout:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            module_sim.advance()
+        return module_sim.watch_result
+
+
+    def clone_next_job_turnarounds(self, ids, job_id, job_proc):
+        """
+        Same as predict_next_job_turnarounds(), with what_if_clone():
+        the simulators are copied in the current process.
+
+        Parameters
+        ----------
+        ids : list[int]
+            id of a cqsim instances stored in self.sims
+
+        Returns
+        -------
+        turnarounds : dict[sim_id -> float]
+            a dict mapping sim_id to the turnarounds value for the given job_id
+
+        """
+        turnarounds = {}
+        for id in ids:
+            if job_proc > self.sim_procs[id]:
+                continue
+            result = self.what_if_clone(id, job_id)
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
+        return turnarounds
+
+
+    def estimate_next_job(self, id, job_id):
+        """
+        Same result as line_step_what_if(), computed in the current process
+        without copying the simulator (see Turnaround_estimator). The simulator
+        is not advanced, the lines read by line_step_what_if() are only peeked.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_id : int
+            id of the job in the trace, the next job of the job file
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+        job_module = self.sim_modules[id].module['job']
+        job_list = job_module.peek_jobs(self.line_counters[id] + 1)
+        estimator = Class_Turnaround_estimator.Turnaround_estimator(self.sim_modules[id])
+        return estimator.estimate(job_list, job_id)
+
+
+    def estimate_job(self, id, job_record):
+        """
+        Same as estimate_next_job() for a simulator without trace: the
+        start and turnaround the job would get from submit_job(), the
+        simulator is not advanced.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_record : dict
+            fields of the job, see submit_job()
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+        if self.end_flags[id]:
+            return None
+        job_module = self.sim_modules[id].module['job']
+        estimator = Class_Turnaround_estimator.Turnaround_estimator(self.sim_modules[id])
+        return estimator.estimate([job_module.job_values(job_record)], job_record['id'])
+
+
+    def estimate_job_turnarounds(self, ids, job_record):
+        """
+        Same as estimate_next_job_turnarounds() for simulators without
+        trace, with estimate_job().
+
+        Parameters
+        ----------
+        ids : list[int]
+            id of a cqsim instances stored in self.sims
+        job_record : dict
+            fields of the job, see submit_job()
+
+        Returns
+        -------
+        turnarounds : dict[sim_id -> float]
+            a dict mapping sim_id to the turnarounds value for the job
+
+        """
+        turnarounds = {}
+        for id in ids:
+            if job_record['reqProc'] > self.sim_procs[id]:
+                continue
+            result = self.estimate_job(id, job_record)
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
+        return turnarounds
+
+
+    def what_if_submit(self, id, job_record):
+        """
+        Same result as estimate_job(), by running a copy of the simulator
+        (Cqsim_sim.clone) given the job and no other job until it starts.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        job_record : dict
+            fields of the job, see submit_job()
+
+        Returns
+        -------
+        result : dict
+            {'start', 'end', 'turnaround'} of the job, None when the
+            simulation ends without starting it.
+        """
+        if self.end_flags[id]:
+            return None
+        module_sim = self.sim_modules[id].clone()
+        module_sim.watch_job(job_record['id'])
+        module_sim.end_submits()
+        with contextlib.ExitStack() as stack:
+            if self.disable_child_stdout:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            module_sim.submit_job(job_record)
+            module_sim.advance()
+        return module_sim.watch_result
+
+
+    def estimate_next_job_turnarounds(self, ids, job_id, job_proc):
+        """
+        Same as predict_next_job_turnarounds(), with estimate_next_job():
+        no child process is started and the simulators are not advanced.
+
+        Parameters
+        ----------
+        ids : list[int]
+            id of a cqsim instances stored in self.sims
+
+        Returns
+        -------
+        turnarounds : dict[sim_id -> float]
+            a dict mapping sim_id to the turnarounds value for the given job_id
+
+        """
+        turnarounds = {}
+        for id in ids:
+            if job_proc > self.sim_procs[id]:
+                continue
+            result = self.estimate_next_job(id, job_id)
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
+        return turnarounds
+
+
+    def start_what_if_pool(self, ids):
+        """
+        Starts one what-if worker per simulator of given ids. A worker is a
+        copy of the simulator made once, it is kept in step with the simulator
+        by replaying the calls changing it (line_step, masks, scale factors)
+        when it is queried, and answers the turnaround queries of
+        pool_next_job_turnarounds() with what_if_clone() on its copy: the
+        simulations of the clusters run at the same time, in their workers.
+        estimate_next_job_turnarounds() is faster when an estimate is enough.
+
+        Parameters
+        ----------
+        ids : list[int]
+            id of a cqsim instances stored in self.sims
+
+        Returns
+        -------
+        None
+        """
+        for id in ids:
+            if id in self.what_if_pool:
+                continue
+            parent_conn, child_conn = Pipe()
+            p = Process(target=self._what_if_worker, args=(id, child_conn, parent_conn,), daemon=True)
+            p.start()
+            child_conn.close()
+            self.what_if_pool[id] = (p, parent_conn)
+            self.what_if_deltas[id] = []
+
+
+    def stop_what_if_pool(self):
+        """
+        Stops the what-if workers started by start_what_if_pool().
+        """
+        for id, (p, conn) in self.what_if_pool.items():
+            try:
+                conn.send(('stop',))
+            except OSError:  # The worker is dead
+                pass
+            conn.close()
+            p.join()
+        self.what_if_pool = {}
+        self.what_if_deltas = {}
+
+
+    def pool_next_job_turnarounds(self, ids, job_id, job_proc, timeout = None):
+        """
+        Same as clone_next_job_turnarounds(), answered by the what-if
+        workers of the simulators (see start_what_if_pool). Each worker gets
+        the calls made on its simulator since its last synchronization, the
+        workers compute their turnarounds at the same time.
+
+        A worker that dies, or does not answer within timeout, is removed
+        from the pool and the turnaround of its simulator is computed in the
+        current process (what_if_clone).
+
+        Parameters
+        ----------
+        ids : list[int]
+            id of a cqsim instances stored in self.sims, all with a worker
+        timeout : float
+            Seconds to wait for the answer of a worker, None to wait as long
+            as it is alive.
+
+        Returns
+        -------
+        turnarounds : dict[sim_id -> float]
+            a dict mapping sim_id to the turnarounds value for the given job_id
+
+        """
+        queried = []
+        for id in ids:
+            if job_proc > self.sim_procs[id]:
+                continue
+            if id in self.what_if_pool:
+                try:
+                    self.what_if_pool[id][1].send(('what_if', self.what_if_deltas[id], job_id))
+                    self.what_if_deltas[id] = []
+                except OSError:  # The worker is dead
+                    self._drop_what_if_worker(id)
+            queried.append(id)
+
+        deadline = None if timeout == None else time.time() + timeout
+        turnarounds = {}
+        for id in queried:
+            result = None
+            if id in self.what_if_pool:
+                result = self._what_if_worker_result(id, deadline)
+            if id not in self.what_if_pool:
+                # No worker, or it failed: the simulator is up to date in this process
+                result = self.what_if_clone(id, job_id)
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
+        return turnarounds
+
+
+    def _what_if_worker_result(self, id, deadline):
+        """
+        Waits for the answer of the what-if worker of the simulator with given
+        id. The worker is removed from the pool when it dies or the deadline
+        (time.time(), None for no limit) passes, None is returned then.
+        """
+        p, conn = self.what_if_pool[id]
+        while True:
+            wait = 1.0
+            if deadline != None:
+                wait = min(wait, deadline - time.time())
+            if wait > 0 and conn.poll(wait):
+                try:
+                    return conn.recv()
+                except EOFError:  # The worker died
+                    break
+            if not p.is_alive() or (deadline != None and time.time() >= deadline):
+                break
+        self._drop_what_if_worker(id)
+        return None
+
+
+    def _drop_what_if_worker(self, id):
+        """
+        Stops the what-if worker of the simulator with given id and removes it
+        from the pool, the simulator itself is not changed.
+        """
+        p, conn = self.what_if_pool.pop(id)
+        del self.what_if_deltas[id]
+        conn.close()
+        if p.is_alive():
+            p.kill()
+        p.join()
+
+
+    def sync_what_if_worker(self, id):
+        """
+        Sends the calls made on the simulator with given id since the last
+        synchronization to its what-if worker, without waiting for it.
+        """
+        if id in self.what_if_pool and self.what_if_deltas[id]:
+            try:
+                self.what_if_pool[id][1].send(('sync', self.what_if_deltas[id]))
+                self.what_if_deltas[id] = []
+            except OSError:  # The worker is dead
+                self._drop_what_if_worker(id)
+
+
+    def _record_what_if_delta(self, id, name, *args):
+        """
+        Keeps a call changing the simulator with given id, it is replayed by
+        its what-if worker before the next query.
+        """
+        if id in self.what_if_deltas:
+            self.what_if_deltas[id].append((name, args))
+
+
+    def _what_if_worker(self, id, conn, parent_conn):
+        """
+        This function is a helper for start_what_if_pool(). The function is run
+        inside a child process which contains the copy of a simulator, until
+        the parent stops it or closes the connection.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims
+        conn:
+            piped connection for the queries of the parent and the results.
+        parent_conn:
+            parent end of the connection, closed in the child.
+
+        Returns
+        -------
+        None
+        """
+        # Only the parent keeps the ends of the worker connections.
+        parent_conn.close()
+        for temp_id, (p, temp_conn) in self.what_if_pool.items():
+            temp_conn.close()
+        self.what_if_pool = {}
+        self.what_if_deltas = {}
+
+        # Disable outputs of debug, log and output modules.
+        self.sim_modules[id].module['debug'].disable()
+        self.sim_modules[id].module['output'].disable()
+
+        if self.disable_child_stdout:
+            sys.stdout = open(os.devnull, 'w')
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:  # Parent closed the connection
+                break
+            if msg[0] == 'stop':
+                break
+            # ('sync', calls) or ('what_if', calls, job_id)
+            for name, args in msg[1]:
+                getattr(self, name)(id, *args)
+            if msg[0] == 'what_if':
+                conn.send(self.what_if_clone(id, msg[2]))
+        conn.close()
+
+
     def line_step_run_on_fork_based(self, id):
         """
         Same as line_step_run_on(), but used tradiation fork() instead
@@ -724,6 +1380,7 @@ class Cqsim_plus:
         -------
         None
         """
+        self._record_what_if_delta(id, 'set_max_lines', max_lines)
         job_module = self.sim_modules[id].module['job']
         job_module.update_max_lines(max_lines)
 
@@ -745,6 +1402,7 @@ class Cqsim_plus:
         -------
         None
         """
+        self._record_what_if_delta(id, 'set_job_run_scale_factor', scale_factor)
         job_module = self.sim_modules[id].module['job']
         job_module.job_runtime_scale_factor = scale_factor
 
@@ -766,6 +1424,7 @@ class Cqsim_plus:
         -------
         None
         """
+        self._record_what_if_delta(id, 'set_job_walltime_scale_factor', scale_factor)
         job_module = self.sim_modules[id].module['job']
         job_module.job_walltime_scale_factor = scale_factor
     
@@ -782,6 +1441,7 @@ class Cqsim_plus:
         Returns
         -------
         """
+        self._record_what_if_delta(id, 'disable_next_job')
         job_module = self.sim_modules[id].module['job']
         job_module.disable_job(self.line_counters[id])
 
@@ -799,6 +1459,7 @@ class Cqsim_plus:
         Returns
         -------
         """
+        self._record_what_if_delta(id, 'enable_next_job')
         job_module = self.sim_modules[id].module['job']
         job_module.enable_job(self.line_counters[id])
     
@@ -835,6 +1496,7 @@ class Cqsim_plus:
         Returns
         -------
         """
+        self._record_what_if_delta(id, 'set_job_file_mask', list(mask))
         self.sim_modules[id].module['job'].mask = mask
 
     
@@ -874,13 +1536,33 @@ class Cqsim_plus:
             config=config_name_j, 
             debug=module_debug
         )
-        module_filter_job.feed_job_trace()
+        if self.trace_cache != None:
+            module_filter_job.feed_job_trace_cached(self.trace_cache)
+        else:
+            module_filter_job.feed_job_trace()
         module_filter_job.output_job_config()
 
         job_submits = module_filter_job.job_submits
         return job_submits
     
 
+    def get_saved_passes(self, id):
+        """
+        For a certain simulator, get the number of scheduling passes saved
+        by batching job events that share a time stamp.
+
+        Parameters
+        ----------
+        id : int
+            id of a cqsim instance stored in self.sims.
+
+        Returns
+        -------
+        saved_passes: int
+            Number of scheduling passes skipped so far.
+        """
+        return self.sim_modules[id].saved_passes
+
     def print_results(self, id):
         output_module = self.sim_modules[id].module['output']
         output_module.print_saved_results()
@@ -899,4 +1581,87 @@ class Cqsim_plus:
         None
         """
         debug_module = self.sim_modules[id].module['debug']
-        debug_module.disable()
\ No newline at end of file
+        debug_module.disable()
+
+    def set_checkpoint(self, path, every_events = None, every_minutes = None):
+        """
+        Sets up the checkpoint of the simulators on disk (see Checkpoint), written by
+        save_checkpoint() every every_events events (of all the simulators) or every
+        every_minutes minutes.
+
+        Parameters
+        ----------
+        path : str
+            Path of the checkpoint file.
+        every_events : int
+            Events between two checkpoints, None for no limit.
+        every_minutes : float
+            Minutes between two checkpoints, None for no limit.
+
+        Returns
+        -------
+        None
+        """
+        self.sim_checkpoint = Class_Checkpoint.Checkpoint(path, every_events, every_minutes)
+
+    def save_checkpoint(self, extra = None, force = False):
+        """
+        Writes the checkpoint of the simulators and of their bookkeeping when it is due.
+        To be called by the experiment loop between two steps, extra holds the state of
+        the loop. The what-if workers (start_what_if_pool) are not saved.
+
+        Parameters
+        ----------
+        extra : dict
+            Picklable data of the caller, returned by resume_checkpoint().
+        force : bool
+            Write the checkpoint even when it is not due.
+
+        Returns
+        -------
+        saved : bool
+            True when the checkpoint was written.
+        """
+        if self.sim_checkpoint == None:
+            return False
+        event_num = sum([module_sim.event_num for module_sim in self.sim_modules])
+        if not force and not self.sim_checkpoint.due(event_num):
+            return False
+        bookkeeping = {
+            'line_counters': self.line_counters,
+            'end_flags': self.end_flags,
+            'sim_names': self.sim_names,
+            'sim_procs': self.sim_procs,
+            'sim_uses_parsed_trace': self.sim_uses_parsed_trace,
+            'sim_tags': self.sim_tags,
+            'exp_directory': self.exp_directory,
+            'extra': extra if extra != None else {},
+        }
+        self.sim_checkpoint.save(self.sim_modules, bookkeeping, event_num)
+        return True
+
+    def resume_checkpoint(self):
+        """
+        Replaces the simulators by the ones of the checkpoint (see set_checkpoint), they go
+        on where they were when it was written. Their output files are cut back to the
+        checkpoint. The what-if workers are stopped, start_what_if_pool starts them again.
+
+        Returns
+        -------
+        extra : dict
+            The extra data given to save_checkpoint(), None when there is no checkpoint.
+        """
+        if self.sim_checkpoint == None or not self.sim_checkpoint.exists():
+            return None
+        self.stop_what_if_pool()
+        sims, bookkeeping = self.sim_checkpoint.load()
+        self.sim_modules = sims
+        self.sims = [module_sim.cqsim_sim() for module_sim in sims]
+        self.line_counters = bookkeeping['line_counters']
+        self.end_flags = bookkeeping['end_flags']
+        self.sim_names = bookkeeping['sim_names']
+        self.sim_procs = bookkeeping['sim_procs']
+        self.sim_uses_parsed_trace = bookkeeping['sim_uses_parsed_trace']
+        self.sim_tags = bookkeeping['sim_tags']
+        self.exp_directory = bookkeeping['exp_directory']
+        return bookkeeping['extra']
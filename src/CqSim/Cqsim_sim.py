@@ -1,25 +1,40 @@
 import IOModule.Log_print as Log_print
+import CqSim.Event_queue as Class_Event_queue
+import CqSim.Sched_pass as Class_Sched_pass
 import sys
+import copy
 __metaclass__ = type
 
 time_stamps = []
 
-class Cqsim_sim:
-    def __init__(self, module, debug = None, monitor = None):
+# Phases of the simulation (Cqsim_sim.sim_phase), see Cqsim_sim.advance.
+PHASE_START = 0         # nothing simulated yet
+PHASE_FIRST_READ = 1    # reading the first jobs, before a read of the job file
+PHASE_SCAN = 2          # scanning the events, before the next one
+PHASE_READ = 3          # scanning the events, before a read of the job file
+PHASE_DONE = 4          # simulation over (or stopped by watch_job)
+
+class Cqsim_sim(Class_Sched_pass.Sched_pass):
+    def __init__(self, module, debug = None, monitor = None, batch_events = False):
         self.myInfo = "Cqsim Sim"
         self.module = module
         self.debug = debug
         self.monitor = monitor
+        self.batch_events = batch_events
         
         self.debug.line(4," ")
         self.debug.line(4,"#")
         self.debug.debug("# "+self.myInfo,1)
         self.debug.line(4,"#")
         
-        self.event_seq = []
-        #self.event_pointer = 0
-        self.monitor_start = 0
+        self.event_seq = Class_Event_queue.Event_queue()
         self.current_event = None
+        self.saved_passes = 0
+        self.watch_id = None
+        self.watch_result = None
+        self.sim_phase = PHASE_START
+        self.line_num = 0 # reads of the job file reached, one per pause of cqsim_sim
+        self.event_num = 0 # events done
         #obsolete
         self.job_num = len(self.module['job'].job_info())
         self.currentTime = 0
@@ -34,7 +49,7 @@ class Cqsim_sim:
             self.debug.debug(temp_name+" ................... Load",4)
             self.debug.line(4)
 
-    def reset(self, module = None, debug = None, monitor = None):
+    def reset(self, module = None, debug = None, monitor = None, batch_events = None):
         #self.debug.debug("# "+self.myInfo+" -- reset",5)
         if module:
             self.module = module
@@ -43,12 +58,18 @@ class Cqsim_sim:
             self.debug = debug
         if monitor:
             self.monitor = monitor
+        if batch_events != None:
+            self.batch_events = batch_events
                
             
-        self.event_seq = []
-        #self.event_pointer = 0
-        self.monitor_start = 0
+        self.event_seq = Class_Event_queue.Event_queue()
         self.current_event = None
+        self.saved_passes = 0
+        self.watch_id = None
+        self.watch_result = None
+        self.sim_phase = PHASE_START
+        self.line_num = 0
+        self.event_num = 0
         #obsolete
         self.job_num = len(self.module['job'].job_info())
         self.currentTime = 0
@@ -56,16 +77,145 @@ class Cqsim_sim:
         self.read_job_buf_size = 100
         self.read_job_pointer = 0
         self.previous_read_job_time = -1
+
+    def clone(self):
+        """
+        Returns a copy of the simulator at the same point, to run in the current process
+        (in place of a fork, see Cqsim_plus.clone_cqsim). It goes on from the same phase.
+
+        The scheduling state is copied: the event queue, the jobs in flight and the wait
+        index (job module clone), the running jobs and the availability profile (node module
+        clone). The modules without state of their own (algorithm, start window, backfill,
+        info) are shallow copies given the copied modules. The parsed job file and the trace
+        cache are shared. The copy logs nothing, the output keeps its results in memory.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- clone",5)
+        temp_sim = copy.copy(self)
+        temp_sim.debug = self.debug.clone()
+        temp_copies = {id(self.debug):temp_sim.debug}
+        temp_module = {}
+        for module_name in self.module:
+            temp_old = self.module[module_name]
+            if (id(temp_old) not in temp_copies):
+                if (hasattr(temp_old, 'clone')):
+                    temp_copies[id(temp_old)] = temp_old.clone()
+                else:
+                    temp_copies[id(temp_old)] = copy.copy(temp_old)
+            temp_module[module_name] = temp_copies[id(temp_old)]
+        # the copies point to each other (node_module, alg_module, debug)
+        for temp_new in temp_module.values():
+            for temp_name in ('debug', 'node_module', 'alg_module'):
+                temp_ref = getattr(temp_new, temp_name, None)
+                if (temp_ref is not None and id(temp_ref) in temp_copies):
+                    setattr(temp_new, temp_name, temp_copies[id(temp_ref)])
+        temp_sim.module = temp_module
+        temp_sim.event_seq = self.event_seq.copy()
+        return temp_sim
+        
+    def log_files(self):
+        """
+        Returns the files the simulator writes to (Log_print of the debug and output modules).
+        """
+        temp_files = self.debug.log_files()
+        for temp_file in self.module['output'].log_files():
+            if (temp_file not in temp_files):
+                temp_files.append(temp_file)
+        return temp_files
         
     def cqsim_sim(self):
+        """
+        Generator over the simulation, pausing (yield) before every read of the job file.
+        It only calls step(), it goes on from the phase the simulator is in.
+        """
         #self.debug.debug("# "+self.myInfo+" -- cqsim_sim",5)
-        #self.insert_submit_events()
-        yield from self.import_submit_events()
-        #self.insert_event_job()
-        self.insert_event_extend()
-        yield from self.scan_event()
+        while (self.step()):
+            yield 0
+        return
+
+    def step(self):
+        """
+        Runs the simulation up to the next read of the job file (one pause of cqsim_sim).
+        Returns 1 when paused there, 0 once the simulation is over.
+        """
+        self.advance(until_jobs = self.line_num + 1)
+        if (self.sim_phase == PHASE_DONE):
+            return 0
+        return 1
+
+    def advance(self, until_time = None, until_jobs = None, max_events = None):
+        """
+        Runs the simulation until one of the limits is reached, or to its end without limits.
+        The simulator keeps its phase (sim_phase), the next call goes on from there.
+
+        - until_time: stops before the first event after until_time.
+        - until_jobs: stops before a read of the job file once line_num reads were reached,
+          line_num counts the reads like the pauses of cqsim_sim (the line counter of Cqsim_plus).
+        - max_events: stops after max_events events (a batch of job events counts as one).
+
+        Returns the number of events done.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- advance",5)
+        temp_event_num = 0
+        while (self.sim_phase != PHASE_DONE):
+            if (self.sim_phase == PHASE_SCAN):
+                #while (self.event_pointer < len(self.event_seq) or self.read_job_pointer >= 0):
+                if ((len(self.event_seq) == 0 and self.read_job_pointer < 0) or self.watch_result != None):
+                    self.scan_done()
+                    self.sim_done()
+                    continue
+                if len(self.event_seq) > 0:
+                    temp_currentTime = self.event_seq.peek()['time']
+                else:
+                    temp_currentTime = -1
+                #if (temp_currentTime >= self.previous_read_job_time or self.event_pointer >= len(self.event_seq)) and self.read_job_pointer >= 0:
+                if (len(self.event_seq) == 0 or temp_currentTime >= self.previous_read_job_time) and self.read_job_pointer >= 0:
+                    #self.insert_submit_events()
+                    self.sim_phase = PHASE_READ
+                    self.line_num += 1
+                    continue
+                if ((until_time != None and temp_currentTime > until_time) or\
+                 (max_events != None and temp_event_num >= max_events)):
+                    break
+                self.scan_event()
+                temp_event_num += 1
+                self.event_num += 1
+            elif (self.sim_phase == PHASE_READ or self.sim_phase == PHASE_FIRST_READ):
+                if (until_jobs != None and self.line_num >= until_jobs):
+                    break
+                temp_return = self.import_submit_events()
+                if (temp_return == -2):
+                    # nothing read (the line was skipped), the next line is another read
+                    self.line_num += 1
+                    continue
+                if (temp_return == -3):
+                    # no job to read yet, waiting for submit_job
+                    break
+                if (self.sim_phase == PHASE_FIRST_READ):
+                    #self.insert_event_job()
+                    self.insert_event_extend()
+                    self.scan_start()
+                self.sim_phase = PHASE_SCAN
+            else:
+                # PHASE_START, the first jobs are read before the events are scanned
+                if (self.read_job_pointer < 0):
+                    self.insert_event_extend()
+                    self.scan_start()
+                    self.sim_phase = PHASE_SCAN
+                    continue
+                self.sim_phase = PHASE_FIRST_READ
+                self.line_num += 1
+        return temp_event_num
+
+    def sim_done(self):
+        #self.debug.debug("# "+self.myInfo+" -- sim_done",5)
+        self.sim_phase = PHASE_DONE
+        if (self.watch_result != None):
+            # stopped when the watched job started, the results are not complete
+            return
         self.print_result()
         self.debug.debug("------ Simulating Done!",2) 
+        if (self.batch_events):
+            self.debug.debug("------ Saved scheduling passes: "+str(self.saved_passes),2) 
         self.debug.debug(lvl=1)
 
         #file = open('time_stamps.txt', 'w')
@@ -77,21 +227,72 @@ class Cqsim_sim:
 
         return
 
+    def watch_job(self, job_id):
+        """
+        Stops the simulation once the job job_id (id in the trace) is started:
+        watch_result is then {'start', 'end', 'turnaround'} of the job, the simulation can not go on.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- watch_job",5)
+        self.watch_id = job_id
+        self.watch_result = None
+        return
+
+    def submit_job(self, job_record):
+        """
+        Submits a job to a simulator without job file (Job_trace.inject_job), read in place of
+        the next line. Runs the simulation up to the next read, before the submit time of the
+        job: the simulator then waits for the next job or for end_submits.
+        The jobs are to be submitted in submit order.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- submit_job",5)
+        if (self.module['job'].job_values(job_record)['submit'] < self.previous_read_job_time):
+            raise ValueError("Job "+str(job_record['id'])+" submitted before the previous job")
+        self.module['job'].inject_job(job_record)
+        return self.advance()
+
+    def advance_before(self, time):
+        """
+        Runs the events before time on a simulator waiting for its next job (submit_job), no job
+        will be submitted before time. The events at time wait for the jobs submitted at time.
+        Returns the number of events done.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- advance_before",5)
+        if (self.sim_phase != PHASE_READ or self.read_job_pointer < 0 or len(self.module['job'].job_inject_list) > 0):
+            return 0
+        if (time <= self.previous_read_job_time):
+            return 0
+        # as if a job submitted at time was read, the next read waits for the events before it
+        self.previous_read_job_time = time
+        self.sim_phase = PHASE_SCAN
+        return self.advance()
+
+    def end_submits(self):
+        """
+        No more jobs will be submitted (submit_job), the next step or advance runs the simulation to its end.
+        """
+        #self.debug.debug("# "+self.myInfo+" -- end_submits",5)
+        self.module['job'].end_injected_jobs()
+        return
+
     def import_submit_events(self):
         # fread jobs to job list and buffer to event_list dynamically
+        # one read of the job file, -2 when nothing was read and the next line is to be read (see advance),
+        # -3 when there is no job to read yet (see submit_job)
         if self.read_job_pointer < 0:
             return -1
-        temp_return = -2
-        while temp_return == -2:
-            yield 0
-            temp_return = self.module['job'].dynamic_read_job_file()
+        temp_return = self.module['job'].dynamic_read_job_file()
+        if temp_return == -2 or temp_return == -3:
+            return temp_return
         i = self.read_job_pointer
         #while (i < len(self.module['job'].job_info())):
-        while (i < self.module['job'].job_info_len()):
-            self.insert_event(1,self.module['job'].job_info(i)['submit'],2,[1,i])
-            self.previous_read_job_time = self.module['job'].job_info(i)['submit']
-            self.debug.debug("  "+"Insert job["+"2"+"] "+str(self.module['job'].job_info(i)['submit']),4)
-            i += 1
+        temp_num = self.module['job'].job_info_len()
+        if (i < temp_num):
+            # submit times of the jobs read since the last call, from the job table
+            for temp_submit in self.module['job'].job_column('submit', range(i, temp_num)).tolist():
+                self.insert_event(1,temp_submit,2,[1,i])
+                self.previous_read_job_time = temp_submit
+                self.debug.debug("  "+"Insert job["+"2"+"] "+str(temp_submit),4)
+                i += 1
         #print("Insert Jobs!")
         if temp_return == None or temp_return < 0 :
             self.read_job_pointer = -1
@@ -108,9 +309,6 @@ class Cqsim_sim:
         temp_num = int(temp_num)
         temp_time = temp_num*self.monitor
 
-        #self.monitor_start=self.event_pointer
-        self.monitor_start=0
-
         i = 0
         while (temp_time < end):
             if (temp_time>=start):
@@ -125,122 +323,63 @@ class Cqsim_sim:
     
     def insert_event(self, type, time, priority, para = None):
         #self.debug.debug("# "+self.myInfo+" -- insert_event",5) 
-        temp_index = -1
+        # The event queue keeps the events ordered on (time, prio, insertion order).
+        # Monitor events always fall between the current event and the next one,
+        # so they end up right after the current event, as get_index_monitor placed them.
         new_event = {"type":type, "time":time, "prio":priority, "para":para}
-        if (type == 1):
-            #i = self.event_pointer
-            i = 0
-            while (i<len(self.event_seq)):
-                if (self.event_seq[i]['time']==time):
-                    if (self.event_seq[i]['prio']>priority):
-                        temp_index = i
-                        break
-                elif (self.event_seq[i]['time']>time):
-                    temp_index = i
-                    break 
-                i += 1
-        elif (type == 2):
-            temp_index = self.get_index_monitor()
-            
-        if (temp_index>=len(self.event_seq) or temp_index == -1):
-            self.event_seq.append(new_event)
-        else:
-            self.event_seq.insert(temp_index,new_event)
+        self.event_seq.push(new_event)
             
     
     def delete_event(self, type, time, index):
         #self.debug.debug("# "+self.myInfo+" -- delete_event",5) 
         return
     
-    def get_index_monitor (self):
-        #self.debug.debug("# "+self.myInfo+" -- get_index_monitor",5) 
-        '''
-        if (self.event_pointer>=self.monitor_start):
-            self.monitor_start=self.event_pointer+1
-        temp_mon = self.monitor_start
-        self.monitor_start += 1
-        return temp_mon
-        '''
-        self.monitor_start += 1
-        return self.monitor_start
-
-    
-    def scan_event(self):
-       # self.debug.debug("# "+self.myInfo+" -- scan_event",5) 
+    def scan_start(self):
+       # self.debug.debug("# "+self.myInfo+" -- scan_start",5) 
         self.debug.line(2," ")
         self.debug.line(2,"=")
         self.debug.line(2,"=")
         self.current_event = None
-        #while (self.event_pointer < len(self.event_seq) or self.read_job_pointer >= 0):
-        while (len(self.event_seq) > 0 or self.read_job_pointer >= 0):
-            #print('event_seq',len(self.event_seq))
-            if len(self.event_seq) > 0:
-                temp_current_event = self.event_seq[0]
-                temp_currentTime = temp_current_event['time']
+
+    def scan_event(self):
+       # self.debug.debug("# "+self.myInfo+" -- scan_event",5) 
+        # the next event, advance reads the jobs submitted up to its time first
+        self.current_event = self.event_seq.pop()
+        self.currentTime = self.current_event['time']
+        if (self.current_event['type'] == 1):
+            self.debug.line(2," ") 
+            self.debug.line(2,">>>") 
+            self.debug.line(2,"--") 
+            #print ("  Time: "+str(self.currentTime)) 
+            self.debug.debug("  Time: "+str(self.currentTime),2) 
+            self.debug.debug("   "+str(self.current_event),2)
+            self.debug.line(2,"--") 
+            self.debug.debug("  Wait: "+str(self.module['job'].wait_list()),2) 
+            self.debug.debug("  Run : "+str(self.module['job'].run_list()),2) 
+            self.debug.line(2,"--") 
+            self.debug.debug("  Tot:"+str(self.module['node'].get_tot())+" Idle:"+str(self.module['node'].get_idle())+" Avail:"+str(self.module['node'].get_avail())+" ",2)
+            self.debug.line(2,"--") 
+            
+            if (self.batch_events):
+                self.event_job_batch(self.current_event['para'])
             else:
-                temp_current_event = None
-                temp_currentTime = -1
-            #if (temp_currentTime >= self.previous_read_job_time or self.event_pointer >= len(self.event_seq)) and self.read_job_pointer >= 0:
-            if (len(self.event_seq) == 0 or temp_currentTime >= self.previous_read_job_time) and self.read_job_pointer >= 0:
-                #print('insert_submit_events from scan_event',temp_currentTime >= self.previous_read_job_time,(self.event_pointer >= len(self.event_seq) and self.read_job_pointer >= 0))
-                #self.insert_submit_events()
-                yield from self.import_submit_events()
-                continue
-            self.current_event = temp_current_event
-            self.currentTime = temp_currentTime
-            if (self.current_event['type'] == 1):
-                self.debug.line(2," ") 
-                self.debug.line(2,">>>") 
-                self.debug.line(2,"--") 
-                #print ("  Time: "+str(self.currentTime)) 
-                self.debug.debug("  Time: "+str(self.currentTime),2) 
-                self.debug.debug("   "+str(self.current_event),2)
-                self.debug.line(2,"--") 
-                self.debug.debug("  Wait: "+str(self.module['job'].wait_list()),2) 
-                self.debug.debug("  Run : "+str(self.module['job'].run_list()),2) 
-                self.debug.line(2,"--") 
-                self.debug.debug("  Tot:"+str(self.module['node'].get_tot())+" Idle:"+str(self.module['node'].get_idle())+" Avail:"+str(self.module['node'].get_avail())+" ",2)
-                self.debug.line(2,"--") 
-                
                 self.event_job(self.current_event['para'])
-            elif (self.current_event['type'] == 2):
-                self.event_monitor(self.current_event['para'])
-            elif (self.current_event['type'] == 3):
-                self.event_extend(self.current_event['para'])
-            self.sys_collect()
-            self.interface()
-            #self.event_pointer += 1
-            del self.event_seq[0]
+        elif (self.current_event['type'] == 2):
+            self.event_monitor(self.current_event['para'])
+        elif (self.current_event['type'] == 3):
+            self.event_extend(self.current_event['para'])
+        self.sys_collect()
+        self.interface()
+        #self.event_pointer += 1
+        return
+
+    def scan_done(self):
+       # self.debug.debug("# "+self.myInfo+" -- scan_done",5) 
         self.debug.line(2,"=")
         self.debug.line(2,"=")
         self.debug.line(2," ")
         return
     
-    def event_job(self, para_in = None):
-        #self.debug.debug("# "+self.myInfo+" -- event_job",5) 
-        '''
-        self.debug.line(2,"xxxxx")
-        i = 0
-        while (i<len(self.event_seq)):
-            self.debug.debug(self.event_seq[i],2) 
-            i += 1
-            
-        self.debug.line(2,"xxxxx")
-        self.debug.line(2," ")
-        self.debug.line(2," ")
-        '''
-        if (self.current_event['para'][0] == 1):
-            self.submit(self.current_event['para'][1])
-        elif (self.current_event['para'][0] == 2):
-            self.finish(self.current_event['para'][1])
-        self.score_calculate()
-        self.start_scan()
-        #if (self.event_pointer < len(self.event_seq)-1):
-        if (len(self.event_seq) > 1):
-            #self.insert_event_monitor(self.currentTime, self.event_seq[self.event_pointer+1]['time'])
-            self.insert_event_monitor(self.currentTime, self.event_seq[1]['time'])
-        return
-    
     def event_monitor(self, para_in = None):
         #self.debug.debug("# "+self.myInfo+" -- event_monitor",5) 
         self.alg_adapt()
@@ -275,95 +414,17 @@ class Cqsim_sim:
     def start(self, job_index):
         #self.debug.debug("# "+self.myInfo+" -- start",5) 
         self.debug.debug("[Start]  "+str(job_index),3)
-        self.module['node'].node_allocate(self.module['job'].job_info(job_index)['reqProc'], job_index,\
-         self.currentTime, self.currentTime + self.module['job'].job_info(job_index)['reqTime'])
+        self.allocate(job_index)
         self.module['job'].job_start(job_index, self.currentTime)
         self.insert_event(1,self.currentTime+self.module['job'].job_info(job_index)['run'],1,[2,job_index])
+        if (self.watch_id != None and self.module['job'].job_info(job_index)['id'] == self.watch_id):
+            temp_job = self.module['job'].job_info(job_index)
+            self.watch_result = {'start':temp_job['start'], 'end':temp_job['end'],\
+             'turnaround':temp_job['end'] - temp_job['submit']}
         global time_stamps
         time_stamps.append([self.currentTime, 1, job_index])
         return
     
-    def score_calculate(self):
-        #self.debug.debug("# "+self.myInfo+" -- score_calculate",5) 
-        temp_wait_list = self.module['job'].wait_list()
-        wait_num = len(temp_wait_list)
-        temp_wait=[]
-        i = 0
-        while (i<wait_num):
-            temp_job = self.module['job'].job_info(temp_wait_list[i])
-            temp_wait.append(temp_job)
-            i += 1
-        score_list = self.module['alg'].get_score(temp_wait,self.currentTime)
-        self.module['job'].refresh_score(score_list)
-        return
-    
-    def start_scan(self):
-        #self.debug.debug("# "+self.myInfo+" -- start_scan",5) 
-        start_max = self.module['win'].start_num()
-        temp_wait = self.module['job'].wait_list()
-        wait_num = len(temp_wait)
-        win_count = start_max
-            
-        i = 0
-        while (i<wait_num):
-            if (win_count >= start_max):
-                win_count = 0
-                temp_wait = self.start_window(temp_wait)
-            #print "....  ", temp_wait[i]
-            temp_job = self.module['job'].job_info(temp_wait[i])
-            if (self.module['node'].is_available(temp_job['reqProc'])):
-                self.start(temp_wait[i])
-            else:
-                temp_wait = self.module['job'].wait_list()
-                self.backfill(temp_wait)
-                break
-            i += 1
-            win_count += 1
-        return
-    
-    def start_window(self, temp_wait_B):
-        #self.debug.debug("# "+self.myInfo+" -- start_window",5) 
-        win_size = self.module['win'].window_size()
-        
-        if (len(temp_wait_B)>win_size):
-            temp_wait_A = temp_wait_B[0:win_size]
-            temp_wait_B = temp_wait_B[win_size:]
-        else:
-            temp_wait_A = temp_wait_B
-            temp_wait_B = []
-
-        temp_wait_info = []
-        max_num = len(temp_wait_A)
-        i = 0
-        while (i < max_num):
-            temp_job = self.module['job'].job_info(temp_wait_A[i])
-            temp_wait_info.append({"index":temp_wait_A[i],"proc":temp_job['reqProc'],\
-             "node":temp_job['reqProc'],"run":temp_job['run'],"score":temp_job['score']})
-            i += 1 
-            
-        temp_wait_A = self.module['win'].start_window(temp_wait_info,{"time":self.currentTime})
-        temp_wait_B[0:0] = temp_wait_A
-        return temp_wait_B
-    
-    def backfill(self, temp_wait):
-        #self.debug.debug("# "+self.myInfo+" -- backfill",5) 
-        temp_wait_info = []
-        max_num = len(temp_wait)
-        i = 0
-        while (i < max_num):
-            temp_job = self.module['job'].job_info(temp_wait[i])
-            temp_wait_info.append({"index":temp_wait[i],"proc":temp_job['reqProc'],\
-             "node":temp_job['reqProc'],"run":temp_job['run'],"score":temp_job['score']})
-            i += 1
-        backfill_list = self.module['backfill'].backfill(temp_wait_info, {'time':self.currentTime})
-        #self.debug.debug("HHHHHHHHHHHHH "+str(backfill_list)+" -- backfill",2) 
-        if not backfill_list:
-            return 0
-        
-        for job in backfill_list:
-            self.start(job)
-        return 1
-    
     def sys_collect(self):
         #self.debug.debug("# "+self.myInfo+" -- sys_collect",5) 
         '''
@@ -382,17 +443,17 @@ class Cqsim_sim:
             event_code='Q'
         '''
         temp_inter = 0
-        if (len(self.event_seq) > 1):
-            temp_inter = self.event_seq[1]['time'] - self.currentTime
+        if (len(self.event_seq) > 0):
+            temp_inter = self.event_seq.peek()['time'] - self.currentTime
         temp_size = 0
         
         event_code=None
-        if (self.event_seq[0]['type'] == 1):
-            if (self.event_seq[0]['para'][0] == 1):   
+        if (self.current_event['type'] == 1):
+            if (self.current_event['para'][0] == 1):   
                 event_code='S'
-            elif(self.event_seq[0]['para'][0] == 2):   
+            elif(self.current_event['para'][0] == 2):   
                 event_code='E'
-        elif (self.event_seq[0]['type'] == 2):
+        elif (self.current_event['type'] == 2):
             event_code='Q'
         temp_info = self.module['info'].info_collect(time=self.currentTime, event=event_code,\
          uti=(self.module['node'].get_tot()-self.module['node'].get_idle())*1.0/self.module['node'].get_tot(),\
@@ -0,0 +1,49 @@
+import heapq
+
+__metaclass__ = type
+
+class Event_queue:
+    """
+    Priority queue holding the simulator events.
+
+    - Events are the dicts built by Cqsim_sim.insert_event: {"type", "time", "prio", "para"}.
+    - Events are ordered on (time, prio, seq), where seq is the insertion counter. This is the
+      order the old sorted list produced: a new event went after every event with a smaller time,
+      or with the same time and a priority value not larger than its own.
+    - Push and pop are O(log n) instead of the O(n) list walk and list delete.
+    """
+    def __init__(self):
+        self.myInfo = "Event Queue"
+        self.heap = []
+        self.seq = 0
+
+    def reset(self):
+        self.heap = []
+        self.seq = 0
+
+    def copy(self):
+        """
+        Returns a copy of the queue, the events themselves are shared (they are not changed once queued).
+        """
+        temp_queue = Event_queue()
+        temp_queue.heap = self.heap[:]
+        temp_queue.seq = self.seq
+        return temp_queue
+
+    def push(self, event):
+        heapq.heappush(self.heap, (event['time'], event['prio'], self.seq, event))
+        self.seq += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[3]
+
+    def peek(self):
+        """
+        Returns the next event without removing it, or None when the queue is empty.
+        """
+        if not self.heap:
+            return None
+        return self.heap[0][3]
+
+    def __len__(self):
+        return len(self.heap)
@@ -0,0 +1,187 @@
+import numpy as np
+
+__metaclass__ = type
+
+# Columns of the job table: (name, dtype, default value)
+JOB_FIELDS = [
+    ('id', np.int64, -1),
+    ('submit', np.float64, -1),
+    ('wait', np.float64, -1),
+    ('run', np.float64, -1),
+    ('usedProc', np.int32, -1),
+    ('usedAveCPU', np.float64, -1),
+    ('usedMem', np.float64, -1),
+    ('reqProc', np.int32, -1),
+    ('reqTime', np.float64, -1),
+    ('reqMem', np.float64, -1),
+    ('status', np.int32, -1),
+    ('userID', np.int32, -1),
+    ('groupID', np.int32, -1),
+    ('num_exe', np.int32, -1),
+    ('num_queue', np.int32, -1),
+    ('num_part', np.int32, -1),
+    ('num_pre', np.int32, -1),
+    ('thinkTime', np.int32, -1),
+    ('start', np.float64, -1),
+    ('end', np.float64, -1),
+    ('score', np.float64, 0),
+    ('state', np.int8, 0),
+    ('happy', np.int32, -1),
+    ('estStart', np.float64, -1),
+]
+
+JOB_DTYPES = dict((name, dtype) for name, dtype, default in JOB_FIELDS)
+
+CHUNK_SHIFT = 12
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_SIZE - 1
+
+class Job_row:
+    """
+    View of one job of a Job_table, used like the per-job dict Job_trace kept before:
+    job['reqProc'] reads the column, job['state'] = 2 writes it.
+    The view holds its chunk, it stays readable after the job is removed from the table.
+    """
+    __slots__ = ('chunk', 'offset')
+
+    def __init__(self, chunk, offset):
+        self.chunk = chunk
+        self.offset = offset
+
+    def __getitem__(self, key):
+        return self.chunk[key].item(self.offset)
+
+    def __setitem__(self, key, value):
+        self.chunk[key][self.offset] = value
+
+    def __contains__(self, key):
+        return key in self.chunk
+
+    def __iter__(self):
+        return iter(self.chunk)
+
+    def __len__(self):
+        return len(self.chunk)
+
+    def keys(self):
+        return self.chunk.keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self.chunk]
+
+    def get(self, key, default=None):
+        if key in self.chunk:
+            return self[key]
+        return default
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+class Job_table:
+    """
+    Job table of Job_trace, one typed numpy array per job field (see JOB_FIELDS).
+
+    - Jobs are addressed by job index. Rows are grouped in chunks of CHUNK_SIZE jobs,
+      a chunk is allocated when its first job is added and dropped when all its jobs
+      have been removed, so memory follows the jobs in flight and not the trace length.
+    - table[i] returns a Job_row view, table[i] = dict adds a job, del table[i] removes it.
+    - columns() and set_column() read and write one field for a list of jobs at once.
+    """
+    def __init__(self):
+        self.myInfo = "Job Table"
+        self.chunks = {}
+        self.chunk_live = {}
+        self.chunk_count = {}
+        self.job_num = 0
+
+    def copy(self):
+        """
+        Returns a copy of the table, only the chunks holding jobs (in flight) are copied.
+        """
+        temp_table = Job_table()
+        for chunk_id, chunk in self.chunks.items():
+            temp_table.chunks[chunk_id] = dict((name, chunk[name].copy()) for name in chunk)
+            temp_table.chunk_live[chunk_id] = self.chunk_live[chunk_id].copy()
+            temp_table.chunk_count[chunk_id] = self.chunk_count[chunk_id]
+        temp_table.job_num = self.job_num
+        return temp_table
+
+    def new_chunk(self):
+        chunk = {}
+        for name, dtype, default in JOB_FIELDS:
+            chunk[name] = np.full(CHUNK_SIZE, default, dtype=dtype)
+        return chunk
+
+    def __setitem__(self, job_index, job_info):
+        chunk_id = job_index >> CHUNK_SHIFT
+        chunk = self.chunks.get(chunk_id)
+        if chunk is None:
+            chunk = self.new_chunk()
+            self.chunks[chunk_id] = chunk
+            self.chunk_live[chunk_id] = np.zeros(CHUNK_SIZE, dtype=bool)
+            self.chunk_count[chunk_id] = 0
+        offset = job_index & CHUNK_MASK
+        for name, dtype, default in JOB_FIELDS:
+            chunk[name][offset] = job_info.get(name, default)
+        if not self.chunk_live[chunk_id][offset]:
+            self.chunk_live[chunk_id][offset] = True
+            self.chunk_count[chunk_id] += 1
+            self.job_num += 1
+
+    def __getitem__(self, job_index):
+        return Job_row(self.chunks[job_index >> CHUNK_SHIFT], job_index & CHUNK_MASK)
+
+    def __delitem__(self, job_index):
+        if job_index not in self:
+            raise KeyError(job_index)
+        chunk_id = job_index >> CHUNK_SHIFT
+        self.chunk_live[chunk_id][job_index & CHUNK_MASK] = False
+        self.chunk_count[chunk_id] -= 1
+        self.job_num -= 1
+        if (self.chunk_count[chunk_id] <= 0):
+            del self.chunks[chunk_id]
+            del self.chunk_live[chunk_id]
+            del self.chunk_count[chunk_id]
+
+    def __contains__(self, job_index):
+        chunk_id = job_index >> CHUNK_SHIFT
+        return chunk_id in self.chunks and bool(self.chunk_live[chunk_id][job_index & CHUNK_MASK])
+
+    def __len__(self):
+        return self.job_num
+
+    def group(self, job_list):
+        """
+        Splits a list of job indexes by chunk.
+        Returns [(chunk, positions in job_list, offsets in the chunk)].
+        """
+        index = np.asarray(job_list, dtype=np.int64)
+        chunk_id = index >> CHUNK_SHIFT
+        offset = index & CHUNK_MASK
+        if (len(index) == 0):
+            return []
+        if (chunk_id[0] == chunk_id[-1] and np.all(chunk_id == chunk_id[0])):
+            return [(self.chunks[int(chunk_id[0])], slice(None), offset)]
+        groups = []
+        for c in np.unique(chunk_id):
+            temp_sel = (chunk_id == c)
+            groups.append((self.chunks[int(c)], temp_sel, offset[temp_sel]))
+        return groups
+
+    def columns(self, job_list, names, dtype=None):
+        """
+        Returns one numpy array per field in names, holding the field of every job of job_list.
+        """
+        groups = self.group(job_list)
+        result = []
+        for name in names:
+            temp_col = np.empty(len(job_list), dtype=dtype or JOB_DTYPES[name])
+            for chunk, temp_sel, offset in groups:
+                temp_col[temp_sel] = chunk[name][offset]
+            result.append(temp_col)
+        return result
+
+    def set_column(self, job_list, name, values):
+        values = np.asarray(values)
+        for chunk, temp_sel, offset in self.group(job_list):
+            chunk[name][offset] = values[temp_sel]
@@ -3,9 +3,23 @@ from functools import cmp_to_key
 import time
 import re
 import os
+import io
+import copy
+import numpy as np
+import CqSim.Wait_index as Class_Wait_index
+import CqSim.Job_table as Class_Job_table
+import CqSim.Trace_reader as Class_Trace_reader
 
 __metaclass__ = type
 
+# Fields of the formatted job trace (Fmt/*.csv), in file order.
+FMT_FIELDS = ['id', 'submit', 'wait', 'run', 'usedProc', 'usedAveCPU', 'usedMem', 'reqProc', 'reqTime',\
+ 'reqMem', 'status', 'userID', 'groupID', 'num_exe', 'num_queue', 'num_part', 'num_pre', 'thinkTime']
+# Fields read from the formatted trace into the job table, the other fields keep their default value.
+TRACE_COLUMNS = ['id', 'submit', 'wait', 'run', 'reqProc', 'reqTime']
+# Number of lines of the formatted trace parsed at once.
+TRACE_CHUNK_LINES = 4096
+
 class Job_trace:
     """
     - Receive formatted job trace file name or the formatted job trace data. 
@@ -22,11 +36,13 @@ class Job_trace:
             mask = None,
             max_lines = 8000,
             job_runtime_scale_factor = 1.0,
-            job_walltime_scale_factor = 1.0):
+            job_walltime_scale_factor = 1.0,
+            job_cache = None):
         """Initialize the Job Trace Module.
 
         Args:
-            job_file_path: Path of the job file to read from.
+            job_file_path: Path of the job file to read from, None for no job file: the jobs are
+                given one by one by inject_job (see Cqsim_sim.submit_job).
             real_start_time: Real start time for the simulator.
             virutual_start_time: Virtual start time for the simulator.
             density: The scale of the interval between each job.
@@ -35,6 +51,7 @@ class Job_trace:
             max_lines: The maximum number of lines to read from job file.
             job_runtime_scaler: Factor to scale the job runtimes by.
             job_walltime_scaler: Factor to scale the job walltimes by.
+            job_cache: Columns of the formatted trace (e.g. loaded by Trace_cache), read instead of job_file_path.
 
         Attributes:
             myInfo: Module information.
@@ -45,19 +62,28 @@ class Job_trace:
             mask: A binary mask for excluding or including jobs.
             max_lines: The maximum number of lines to read from job file.
             cluster_speed: The speed of the cluster.
-            jobTrace: Dictionary to keep track of the jobs while simulation.
+            jobTrace: Job table (columns of typed arrays) to keep track of the jobs while simulation,
+                jobTrace[i] gives a dict-like view of job i.
             job_file_path: The CSV file to read the job submit events from.
-            job_fd: file descriptior for the job file read at job_file_path.
+            job_fd: Buffered reader (Trace_reader) of the job file at job_file_path, None with job_cache.
+            job_cache: Dict of numpy arrays, one per field of the formatted trace, or None.
             job_counter: counter for the jobs read, also used to assign internal ids.
             job_wait_size: ???
-            job_submit_list: ???
-            job_wait_list: ???
-            job_run_list: ???
+            job_submit_list: Jobs read but not submitted yet, a dict used as an insertion ordered set.
+            job_wait_list: Waiting jobs in score order, a dict used as an ordered set.
+            job_wait_cache: The waiting jobs as a list, rebuilt by wait_list() after a change.
+            job_run_list: Running jobs in start order, a dict used as an ordered set.
+            wait_index: Keeps job_wait_list in score order (see Wait_index).
             line_number: The line number in the job file.
             job_counter: Counter for the jobs read.
             num_delete_jobs: ???
             job_skips: Counter for the number of jobs skipped (likely because mask was set to 0)
-            job_file_offset: offset in number of bytes in the job file for the next job.
+            job_file_offset: offset in number of bytes in the job file for the next job,
+                the row of the next job with job_cache.
+            trace_columns: Fields of the formatted trace stored in the job table.
+            trace_chunk: Block of the job file parsed ahead into numpy arrays (see read_trace_chunk).
+            job_inject_list: Jobs given by inject_job and not read yet, without job file.
+            job_inject_end: No more jobs will be given by inject_job (see end_injected_jobs).
         """
 
         self.myInfo = "Job Trace"
@@ -69,18 +95,27 @@ class Job_trace:
         self.max_lines = max_lines
         self.job_runtime_scale_factor = job_runtime_scale_factor
         self.job_walltime_scale_factor = job_walltime_scale_factor
-        self.jobTrace={}
+        self.jobTrace=Class_Job_table.Job_table()
         self.job_file_path = job_file_path
-        self.job_fd =  open(self.job_file_path,'r')
+        self.job_cache = job_cache
+        self.job_fd = None
+        if self.job_cache == None and self.job_file_path != None:
+            self.job_fd =  Class_Trace_reader.Trace_reader(self.job_file_path)
         self.job_wait_size = 0
-        self.job_submit_list=[]
-        self.job_wait_list=[]
-        self.job_run_list=[]
+        self.job_submit_list={}
+        self.job_wait_list={}
+        self.job_wait_cache=[]
+        self.wait_index = Class_Wait_index.Wait_index()
+        self.job_run_list={}
         self.line_number = 0
         self.job_counter = 0
         self.num_delete_jobs = 0
         self.job_skips = 0
         self.job_file_offest = 0
+        self.trace_columns = list(TRACE_COLUMNS)
+        self.trace_chunk = None
+        self.job_inject_list = []
+        self.job_inject_end = False
 
 
         # If the mask is not defnied, initialze the mask to read all jobs.
@@ -91,6 +126,58 @@ class Job_trace:
         if len(self.mask) > self.max_lines:
             self.mask = self.mask[:self.max_lines]
 
+    def clone(self):
+        """
+        Returns a copy of the job module for a copy of the simulator (see Cqsim_sim.clone).
+
+        The jobs in flight (job table, submit, wait and run lists) and the position in the job
+        file are copied, the job file gets its own reader. The parsed block of the job file
+        and job_cache are shared, they are not changed once read.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- clone",5)
+        temp_trace = copy.copy(self)
+        temp_trace.jobTrace = self.jobTrace.copy()
+        temp_trace.job_submit_list = dict(self.job_submit_list)
+        temp_trace.job_wait_list = dict(self.job_wait_list)
+        temp_trace.job_wait_cache = None
+        temp_trace.job_run_list = dict(self.job_run_list)
+        temp_trace.wait_index = self.wait_index.copy()
+        temp_trace.mask = list(self.mask)
+        temp_trace.job_inject_list = list(self.job_inject_list)
+        if self.job_fd != None:
+            temp_trace.job_fd = self.job_fd.copy()
+        if self.trace_chunk != None:
+            temp_trace.trace_chunk = dict(self.trace_chunk)
+        return temp_trace
+
+    def __getstate__(self):
+        # the parsed block of the job file is parsed again from job_file_offest (next_trace_row),
+        # the columns of job_cache mapped from the trace cache are kept as their file
+        temp_state = dict(self.__dict__)
+        temp_state['trace_chunk'] = None
+        if self.job_cache != None:
+            temp_cache = {}
+            for name, column in self.job_cache.items():
+                if isinstance(column, np.memmap) and column.filename != None:
+                    temp_cache[name] = ('npy', column.filename)
+                else:
+                    temp_cache[name] = column
+            temp_state['job_cache'] = temp_cache
+        return temp_state
+
+    def __copy__(self):
+        # __getstate__ is for pickling, a copy shares the parsed block and job_cache
+        temp_trace = self.__class__.__new__(self.__class__)
+        temp_trace.__dict__.update(self.__dict__)
+        return temp_trace
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.job_cache != None:
+            for name, column in self.job_cache.items():
+                if isinstance(column, tuple):
+                    self.job_cache[name] = np.load(column[1], mmap_mode='r')
+
     def update_max_lines(self, max_lines, default_bit = 1):
         self.max_lines = max_lines
 
@@ -120,11 +207,11 @@ class Job_trace:
         Returns:
             str: String of job data
         """
-        line = ""
-        with open(self.job_file_path, 'r') as f:
-            f.seek(self.job_file_offest)
-            line = f.readline()
-            self.job_file_offest = f.tell()
+        # job_file_offest stays the reference, setting it moves the reader.
+        if (self.job_fd.offset != self.job_file_offest):
+            self.job_fd.seek(self.job_file_offest)
+        line = self.job_fd.readline()
+        self.job_file_offest = self.job_fd.offset
         return line
 
 
@@ -134,11 +221,14 @@ class Job_trace:
         Reads the next line from the job file, skips lines accroding to the mask.
         The line is parsed for job data and added to the job trace.
         """
-        job_line = self.read_next_job()
+        if self.job_file_path == None:
+            return self.read_injected_job()
+
+        temp_row = self.next_trace_row()
 
         # Check for end of file.
-        if not job_line:
-            self.job_fd.close()
+        if temp_row == None:
+            self.close_file_job_file()
             return -1
         
         # Check for line number exceeding mask size.
@@ -150,50 +240,23 @@ class Job_trace:
             self.line_number += 1
             self.job_skips += 1
             return -2
-            
-
-        regex_str = "([^;\\n]*)[;\\n]"
-        job_data = re.findall(regex_str, job_line)
-        job_data = job_line.split(';')
 
+        chunk, row = temp_row
         
         # If the real start time is not given, use the submit time of the first job.
         if self.real_start_time == -1:
             # Store the submit time of the first job.
             if self.line_number == 0:
-                self.real_start_time = float(job_data[1])
-        job_info = {'id':int(job_data[0]),\
-                    'submit':self.density*(float(job_data[1])-self.real_start_time) + self.virtual_start_time,\
-                    'wait':float(job_data[2]),\
-                    'run':float(job_data[3]),\
-                    'usedProc':int(job_data[4]),\
-                    'usedAveCPU':float(job_data[5]),\
-                    'usedMem':float(job_data[6]),\
-                    'reqProc':int(job_data[7]),\
-                    'reqTime':float(job_data[8]),\
-                    'reqMem':float(job_data[9]),\
-                    'status':int(job_data[10]),\
-                    'userID':int(job_data[11]),\
-                    'groupID':int(job_data[12]),\
-                    'num_exe':int(job_data[13]),\
-                    'num_queue':int(job_data[14]),\
-                    'num_part':int(job_data[15]),\
-                    'num_pre':int(job_data[16]),\
-                    'thinkTime':int(job_data[17]),\
-                    'start':-1,\
-                    'end':-1,\
-                    'score':0,\
-                    'state':0,\
-                    'happy':-1,\
-                    'estStart':-1
-                }
-        
-        # Adjust the runtime and walltime according to the scaling factors.
-        job_info['run'] = job_info['run'] * self.job_runtime_scale_factor
-        job_info['reqTime'] = job_info['reqTime'] * self.job_walltime_scale_factor
+                self.real_start_time = float(chunk['raw']['submit'][row])
+
+        # Density, start times and scaling factors are applied to the whole chunk.
+        temp_values = self.trace_values(chunk)
+        job_info = {}
+        for name in self.trace_columns:
+            job_info[name] = temp_values[name][row]
 
         self.jobTrace[self.job_counter] = job_info
-        self.job_submit_list.append(self.job_counter)
+        self.job_submit_list[self.job_counter] = None
 
 
         self.line_number += 1
@@ -201,6 +264,218 @@ class Job_trace:
         return 0
 
 
+    def inject_job(self, job_record):
+        """
+        Gives the next job to a job trace without job file, it is read like a line of the job file.
+
+        Args:
+            job_record: dict of the fields of the job as in the formatted trace ('id', 'submit',
+                'run', 'reqProc', 'reqTime', optional 'wait'), before the density, the start
+                times and the scaling factors.
+        """
+        self.job_inject_list.append(job_record)
+
+    def end_injected_jobs(self):
+        """
+        No more jobs will be given by inject_job, the read after the last one ends the job input.
+        """
+        self.job_inject_end = True
+
+    def read_injected_job(self):
+        """
+        dynamic_read_job_file without job file: reads the next job given by inject_job.
+        Returns -3 when there is no job to read yet, the mask is not used.
+        """
+        if len(self.job_inject_list) == 0:
+            if self.job_inject_end:
+                return -1
+            return -3
+        job_record = self.job_inject_list.pop(0)
+
+        # If the real start time is not given, use the submit time of the first job.
+        if self.real_start_time == -1 and self.line_number == 0:
+            self.real_start_time = float(job_record['submit'])
+
+        self.jobTrace[self.job_counter] = self.job_values(job_record)
+        self.job_submit_list[self.job_counter] = None
+
+        self.line_number += 1
+        self.job_counter += 1
+        return 0
+
+    def job_values(self, job_record):
+        """
+        Returns the fields of trace_columns of job_record (see inject_job), with the density,
+        the start times and the scaling factors applied as trace_values does for a line.
+        """
+        job_info = {}
+        for name in self.trace_columns:
+            if (name == 'wait' and name not in job_record):
+                temp_value = -1.0
+            else:
+                temp_value = float(job_record[name])
+            if (name == 'submit'):
+                temp_value = self.density*(temp_value-self.real_start_time) + self.virtual_start_time
+            elif (name == 'run'):
+                temp_value = temp_value * self.job_runtime_scale_factor
+            elif (name == 'reqTime'):
+                temp_value = temp_value * self.job_walltime_scale_factor
+            if np.issubdtype(Class_Job_table.JOB_DTYPES[name], np.integer):
+                temp_value = int(temp_value)
+            job_info[name] = temp_value
+        return job_info
+
+    def peek_jobs(self, max_lines):
+        """
+        Returns the jobs dynamic_read_job_file would read up to the line max_lines
+        (excluded), without reading them. Lines skipped by the mask are left out.
+
+        Returns:
+            list: one dict per job, the fields of trace_columns with the density, the start
+            times and the scaling factors applied, in line order.
+        """
+        if self.job_file_path == None:
+            temp_jobs = self.job_inject_list[:max(max_lines - self.line_number, 0)]
+            temp_real_start_time = self.real_start_time
+            if (self.real_start_time == -1 and self.line_number == 0 and len(temp_jobs) > 0):
+                self.real_start_time = float(temp_jobs[0]['submit'])
+            job_list = [self.job_values(job_record) for job_record in temp_jobs]
+            self.real_start_time = temp_real_start_time
+            return job_list
+
+        temp_offset = self.job_file_offest
+        temp_chunk = self.trace_chunk
+        temp_real_start_time = self.real_start_time
+        if temp_chunk != None:
+            temp_pos = temp_chunk['pos']
+        job_list = []
+        line_number = self.line_number
+        while (line_number < max_lines and line_number < len(self.mask)):
+            temp_row = self.next_trace_row()
+            if temp_row == None:
+                break
+            if self.mask[line_number] == 1:
+                chunk, row = temp_row
+                if (self.real_start_time == -1 and line_number == 0):
+                    self.real_start_time = float(chunk['raw']['submit'][row])
+                temp_values = self.trace_values(chunk)
+                job_info = {}
+                for name in self.trace_columns:
+                    job_info[name] = temp_values[name][row]
+                job_list.append(job_info)
+            line_number += 1
+
+        # the next read takes the same lines again
+        self.job_file_offest = temp_offset
+        self.trace_chunk = temp_chunk
+        self.real_start_time = temp_real_start_time
+        if temp_chunk != None:
+            temp_chunk['pos'] = temp_pos
+        return job_list
+
+
+    def next_trace_row(self):
+        """
+        Moves to the next line of the job file.
+
+        Returns:
+            (chunk, row): the parsed chunk holding the line and its row in the chunk,
+            or None at the end of the file.
+        """
+        chunk = self.trace_chunk
+        if chunk != None:
+            if chunk['pos'] == 0:
+                temp_offset = chunk['begin']
+            else:
+                temp_offset = chunk['offsets'][chunk['pos']-1]
+            # job_file_offest was moved, or the chunk is used up
+            if (temp_offset != self.job_file_offest or chunk['pos'] >= len(chunk['offsets'])):
+                chunk = None
+        if chunk == None:
+            chunk = self.read_trace_chunk()
+            self.trace_chunk = chunk
+            if chunk == None:
+                return None
+        row = chunk['pos']
+        chunk['pos'] += 1
+        self.job_file_offest = chunk['offsets'][row]
+        return chunk, row
+
+    def read_trace_chunk(self):
+        """
+        Parses up to TRACE_CHUNK_LINES lines of the job file, from job_file_offest,
+        into one float array per field of trace_columns.
+
+        Returns:
+            dict: 'raw' the parsed columns, 'offsets' the offset after every line,
+            'begin' the offset of the first line, 'pos' the next row to hand out.
+            None at the end of the file.
+        """
+        if self.job_cache != None:
+            return self.read_cache_chunk()
+        if (self.job_fd.offset != self.job_file_offest):
+            self.job_fd.seek(self.job_file_offest)
+        lines = self.job_fd.read_lines(TRACE_CHUNK_LINES)
+        if not lines:
+            return None
+        usecols = [FMT_FIELDS.index(name) for name in self.trace_columns]
+        data = None
+        try:
+            data = np.loadtxt(io.BytesIO(b''.join(lines)), delimiter=';', usecols=usecols,\
+             comments=None, ndmin=2, dtype=float)
+        except ValueError:
+            data = None
+        if (data is None or len(data) != len(lines)):
+            # Blank or malformed lines, parse line by line so rows stay aligned with lines.
+            data = np.array([[float(line.split(b';')[k]) for k in usecols] for line in lines], dtype=float)
+        raw = {}
+        i = 0
+        while (i < len(self.trace_columns)):
+            raw[self.trace_columns[i]] = np.ascontiguousarray(data[:, i])
+            i += 1
+        offsets = (self.job_file_offest + np.cumsum([len(line) for line in lines])).tolist()
+        return {'raw':raw, 'offsets':offsets, 'begin':self.job_file_offest, 'pos':0, 'param':None, 'values':None}
+
+    def read_cache_chunk(self):
+        """
+        read_trace_chunk for job_cache, job_file_offest is a row of the columns.
+        """
+        begin = int(self.job_file_offest)
+        end = min(begin + TRACE_CHUNK_LINES, len(self.job_cache['id']))
+        if (begin >= end):
+            return None
+        raw = {}
+        for name in self.trace_columns:
+            raw[name] = np.asarray(self.job_cache[name][begin:end], dtype=float)
+        offsets = list(range(begin+1, end+1))
+        return {'raw':raw, 'offsets':offsets, 'begin':begin, 'pos':0, 'param':None, 'values':None}
+
+    def trace_values(self, chunk):
+        """
+        Returns the columns of a parsed chunk as lists, with the density, the start times
+        and the scaling factors applied. They are computed again when one of them changed.
+        """
+        param = (self.density, self.real_start_time, self.virtual_start_time,\
+         self.job_runtime_scale_factor, self.job_walltime_scale_factor)
+        if (chunk['param'] != param):
+            raw = chunk['raw']
+            values = {}
+            for name in self.trace_columns:
+                if (name == 'submit'):
+                    temp_col = self.density*(raw['submit']-self.real_start_time) + self.virtual_start_time
+                elif (name == 'run'):
+                    temp_col = raw['run'] * self.job_runtime_scale_factor
+                elif (name == 'reqTime'):
+                    temp_col = raw['reqTime'] * self.job_walltime_scale_factor
+                else:
+                    temp_col = raw[name]
+                if np.issubdtype(Class_Job_table.JOB_DTYPES[name], np.integer):
+                    temp_col = temp_col.astype(np.int64)
+                values[name] = temp_col.tolist()
+            chunk['values'] = values
+            chunk['param'] = param
+        return chunk['values']
+
     def dyn_import_job_file(self):
         """
         [DEPRECATED]
@@ -260,7 +535,7 @@ class Job_trace:
                             'estStart':-1}
                 #self.jobTrace.append(tempInfo)
                 self.jobTrace[self.i] = tempInfo
-                self.job_submit_list.append(self.i)
+                self.job_submit_list[self.i] = None
                 self.debug.debug(temp_dataList,4)
                 #self.debug.debug("* "+str(tempInfo),4)
                 self.i += 1      
@@ -289,15 +564,21 @@ class Job_trace:
     
     def submit_list (self):
         #self.debug.debug("* "+self.myInfo+" -- submit_list",6)
-        return self.job_submit_list
+        return list(self.job_submit_list)
     
     def wait_list (self):
+        """
+        Returns the waiting jobs in score order. The list is shared until the wait
+        queue changes, callers must not modify it.
+        """
         #self.debug.debug("* "+self.myInfo+" -- wait_list",6)
-        return self.job_wait_list
+        if (self.job_wait_cache is None):
+            self.job_wait_cache = list(self.job_wait_list)
+        return self.job_wait_cache
     
     def run_list (self):
         #self.debug.debug("* "+self.myInfo+" -- run_list",6)
-        return self.job_run_list
+        return list(self.job_run_list)
     
     '''
     def done_list (self):
@@ -309,18 +590,50 @@ class Job_trace:
         #self.debug.debug("* "+self.myInfo+" -- wait_size",6)
         return self.job_wait_size
     
-    def refresh_score (self, score, job_index=None):
+    def wait_columns (self):
+        """
+        Returns the submit, reqTime and reqProc columns of the waiting jobs
+        as numpy arrays, in wait list order.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- wait_columns",6)
+        submit, req_time, req_proc = self.jobTrace.columns(self.wait_list(), ('submit', 'reqTime', 'reqProc'), dtype=float)
+        return submit, req_time, req_proc
+    
+    def wait_info (self, job_list):
+        """
+        Returns the {"index", "proc", "node", "run", "score"} dicts the start window and
+        backfill modules work on, for the jobs of job_list.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- wait_info",6)
+        req_proc, run, score = self.jobTrace.columns(job_list, ('reqProc', 'run', 'score'))
+        req_proc = req_proc.tolist()
+        return [{"index":job_index, "proc":proc, "node":proc, "run":job_run, "score":job_score}\
+         for job_index, proc, job_run, job_score in zip(job_list, req_proc, run.tolist(), score.tolist())]
+    
+    def refresh_score (self, score, job_index=None, time=None, score_form=None, score_coef=None, columns=None):
+        """
+        Stores the scores of the waiting jobs and puts the wait list in score order.
+
+        Without score_form the wait list is sorted again. With the score form given by
+        Basic_algorithm (and time, score_coef and columns for a 'linear' score) the
+        order is kept by the wait index and only re-ranked when it can have changed.
+        """
         #self.debug.debug("* "+self.myInfo+" -- refresh_score",5)
+        temp_wait = self.wait_list()
         if job_index:
             self.jobTrace[job_index]['score'] = score
-        else:
-            i = 0
-            while (i < len(self.job_wait_list)):
-                self.jobTrace[self.job_wait_list[i]]['score'] = score[i]
-                i += 1
-        #self.job_wait_list.sort(self.scoreCmp)
-        # python 2 -> 3
-        self.job_wait_list.sort(key = cmp_to_key(self.scoreCmp))
+            #self.job_wait_list.sort(self.scoreCmp)
+            # python 2 -> 3
+            temp_wait = sorted(temp_wait, key = cmp_to_key(self.scoreCmp))
+            self.job_wait_list = dict.fromkeys(temp_wait)
+            self.job_wait_cache = temp_wait
+            self.wait_index.invalidate()
+            return
+        self.jobTrace.set_column(temp_wait, 'score', score)
+        temp_rank = self.wait_index.rank(temp_wait, score, time, score_form, score_coef, columns)
+        if temp_rank is not temp_wait:
+            self.job_wait_list = dict.fromkeys(temp_rank)
+            self.job_wait_cache = temp_rank
         #self.debug.debug("  Wait:"+str(self.job_wait_list),4)
 
     def scoreCmp(self,jobIndex_c1,jobIndex_c2):
@@ -340,6 +653,20 @@ class Job_trace:
             return self.jobTrace
         return self.jobTrace[job_index]
 
+    def job_column (self, name, job_list):
+        """
+        Returns the field name of the jobs of job_list as a numpy array.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- job_column",6)
+        return self.jobTrace.columns(job_list, (name,))[0]
+
+    def proc_list (self, job_list):
+        """
+        Returns the reqProc of the jobs of job_list as a list.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- proc_list",6)
+        return self.jobTrace.columns(job_list, ('reqProc',))[0].tolist()
+
     def job_info_len(self):
         return len(self.jobTrace)+self.num_delete_jobs
     
@@ -348,20 +675,25 @@ class Job_trace:
         self.jobTrace[job_index]["state"]=1
         self.jobTrace[job_index]["score"]=job_score
         self.jobTrace[job_index]["estStart"]=job_est_start
-        self.job_submit_list.remove(job_index)
-        self.job_wait_list.append(job_index)
+        del self.job_submit_list[job_index]
+        self.job_wait_list[job_index] = None
+        self.job_wait_cache = None
+        self.wait_index.job_added(job_index)
         self.job_wait_size += self.jobTrace[job_index]["reqProc"]
         return 1
     
     def job_start (self, job_index, time):
         #self.debug.debug("* "+self.myInfo+" -- job_start",5)
         self.debug.debug(" "+"["+str(job_index)+"]"+" Req:"+str(self.jobTrace[job_index]['reqProc'])+" Run:"+str(self.jobTrace[job_index]['run'])+" ",4)
-        self.jobTrace[job_index]["state"]=2
-        self.jobTrace[job_index]['start']=time
-        self.jobTrace[job_index]['wait']=time-self.jobTrace[job_index]['submit']
-        self.jobTrace[job_index]['end'] = time+self.jobTrace[job_index]['run']
-        self.job_wait_list.remove(job_index)
-        self.job_run_list.append(job_index)
+        temp_job = self.jobTrace[job_index]
+        temp_job["state"]=2
+        temp_job['start']=time
+        temp_job['wait']=time-temp_job['submit']
+        temp_job['end'] = time+temp_job['run']
+        del self.job_wait_list[job_index]
+        self.job_wait_cache = None
+        self.wait_index.job_removed(job_index)
+        self.job_run_list[job_index] = None
         self.job_wait_size -= self.jobTrace[job_index]["reqProc"]
         return 1
     
@@ -371,7 +703,7 @@ class Job_trace:
         self.jobTrace[job_index]["state"]=3
         if  time:
             self.jobTrace[job_index]['end'] = time
-        self.job_run_list.remove(job_index)
+        del self.job_run_list[job_index]
         #self.job_done_list.append(job_index)
         return 1
     
@@ -398,7 +730,8 @@ class Job_trace:
         #print('jobTrace.keys',self.jobTrace.keys())
 
     def close_file_job_file(self):
-        self.job_fd.close()
+        if self.job_fd != None:
+            self.job_fd.close()
     
     
     
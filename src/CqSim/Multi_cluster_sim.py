@@ -0,0 +1,156 @@
+import os
+import heapq
+import contextlib
+
+__metaclass__ = type
+
+def route_min_turnaround(msim, job_record):
+    """
+    Routing policy: the cluster with the lowest estimated turnaround for the job, the first
+    one of them on a tie. None when no cluster can run it.
+    """
+    turnarounds = msim.estimate_turnarounds(job_record)
+    if not turnarounds:
+        return None
+    return min(turnarounds, key=turnarounds.get)
+
+def route_round_robin(msim, job_record):
+    """
+    Routing policy: the clusters in turn, skipping the ones too small for the job.
+    """
+    i = 0
+    while (i < len(msim.ids)):
+        temp_id = msim.ids[(len(msim.routes) + i) % len(msim.ids)]
+        if (job_record['reqProc'] <= msim.cqp.sim_procs[temp_id]):
+            return temp_id
+        i += 1
+    return None
+
+class Multi_cluster_sim:
+    """
+    Meta-scheduling of one job stream on several clusters in a single event loop.
+
+    - The clusters are simulators of a Cqsim_plus set up without trace (single_cqsim with
+      trace_file None), each with its own node structure, wait queue and scheduling modules.
+      They share their start times and density (set_sim_times).
+    - The jobs arrive in submit order. At each arrival, the policy picks the cluster of the job
+      (policy(msim, job_record), None drops it) and the job is given to it with submit_job.
+      The other clusters are not touched by the job.
+    - One time ordered queue holds the next event of every cluster. Before an arrival, the
+      clusters with events before its submit time run them (Cqsim_sim.advance_before), the
+      policy sees every cluster at the arrival time. The events at the submit time of a job
+      wait for its routing, as in a single simulator.
+    - job_scale(id, job_record) gives the factor of the runtime and walltime of the job on the
+      cluster (e.g. a job of another machine), None for no scaling.
+    - The output of the clusters (debug prints) is dropped for the whole run, not step by step.
+    """
+    def __init__(self, cqp, ids, policy, job_scale = None):
+        self.myInfo = "Multi Cluster Sim"
+        self.cqp = cqp
+        self.ids = list(ids)
+        self.policy = policy
+        self.job_scale = job_scale
+        self.routes = []
+        self.event_heap = []
+        self.next_times = {}
+        for id in self.ids:
+            self.next_times[id] = None
+            self.push_cluster(id)
+
+    def push_cluster(self, id):
+        # queues the time of the next event of the cluster, the older entry is left in the heap
+        temp_event = self.cqp.sim_modules[id].event_seq.peek()
+        if temp_event == None:
+            self.next_times[id] = None
+            return
+        self.next_times[id] = temp_event['time']
+        heapq.heappush(self.event_heap, (temp_event['time'], id))
+
+    def arrival_time(self, job_record):
+        """
+        Returns the submit time of the job in the time of the clusters.
+        """
+        return self.cqp.sim_modules[self.ids[0]].module['job'].job_values(job_record)['submit']
+
+    def advance_clusters(self, time):
+        """
+        Runs the events of all the clusters before time, in the order of their next event.
+        """
+        while (len(self.event_heap) > 0 and self.event_heap[0][0] < time):
+            temp_time, id = heapq.heappop(self.event_heap)
+            if (temp_time != self.next_times[id]):
+                # the cluster was advanced since
+                continue
+            self.cqp.sim_modules[id].advance_before(time)
+            self.push_cluster(id)
+
+    def job_on(self, id, job_record):
+        """
+        Returns the job as run by the cluster id, scaled by job_scale.
+        """
+        if self.job_scale == None:
+            return job_record
+        temp_scale = self.job_scale(id, job_record)
+        if (temp_scale == None or temp_scale == 1.0):
+            return job_record
+        temp_job = dict(job_record)
+        temp_job['run'] = job_record['run']*temp_scale
+        temp_job['reqTime'] = job_record['reqTime']*temp_scale
+        return temp_job
+
+    def estimate_turnarounds(self, job_record):
+        """
+        Returns {cluster id: estimated turnaround} of the job on the clusters large enough to run
+        it (Cqsim_plus.estimate_job), for the policies.
+        """
+        turnarounds = {}
+        for id in self.ids:
+            if job_record['reqProc'] > self.cqp.sim_procs[id]:
+                continue
+            result = self.cqp.estimate_job(id, self.job_on(id, job_record))
+            if result == None:
+                continue
+            turnarounds[id] = float(result['turnaround'])
+        return turnarounds
+
+    def submit(self, job_record):
+        """
+        Routes one job, the jobs are submitted in submit order. Returns the cluster id, or None.
+        """
+        self.advance_clusters(self.arrival_time(job_record))
+        id = self.policy(self, job_record)
+        self.routes.append(id)
+        if id != None:
+            self.cqp.submit_job(id, self.job_on(id, job_record))
+            self.push_cluster(id)
+        return id
+
+    def finish(self):
+        """
+        Ends the job stream, every cluster runs to its end.
+        """
+        for id in self.ids:
+            self.cqp.end_submits(id)
+            self.cqp.advance(id)
+        self.event_heap = []
+
+    def run(self, job_records, quiet = True):
+        """
+        Routes all the jobs then runs the clusters to their end.
+
+        Returns:
+            dict: cluster id -> job results (Cqsim_plus.get_job_results).
+        """
+        with contextlib.ExitStack() as stack:
+            if quiet:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            for job_record in job_records:
+                self.submit(job_record)
+            self.finish()
+        return self.results()
+
+    def results(self):
+        temp_results = {}
+        for id in self.ids:
+            temp_results[id] = self.cqp.get_job_results(id)
+        return temp_results
@@ -1,17 +1,34 @@
 from datetime import datetime
 import time
 import re
+import copy
+import numpy as np
+import CqSim.Run_index as Class_Run_index
 
 __metaclass__ = type
 
 class Node_struc:
+    """
+    Node structure, one entry of nodeStruc per node.
+
+    - node_state holds the state of every node (-1: idle, else the index of the job running on it).
+    - node_free is the stack of idle nodes, the node on top (end of the list) is allocated first.
+      At import it holds the nodes in reverse order, nodes are taken from the lowest index.
+    - job_nodes maps a running job to its nodes.
+    - job_list holds the running jobs in end time order (see Run_index).
+    node_allocate and node_release cost O(k) for a job on k nodes, whatever the number of nodes.
+    """
     def __init__(self, debug=None):
         self.myInfo = "Node Structure"
         self.debug = debug
         self.nodeStruc = []
-        self.job_list = []
+        self.node_state = np.zeros(0, dtype=np.int64)
+        self.node_free = []
+        self.job_nodes = {}
+        self.job_list = Class_Run_index.Run_index()
         self.predict_node = []
         self.predict_job = []
+        self.predict_save = []
         self.tot = -1
         self.idle = -1
         self.avail = -1
@@ -25,12 +42,33 @@ class Node_struc:
         #self.debug.debug("* "+self.myInfo+" -- reset",5)
         self.debug = debug
         self.nodeStruc = []
-        self.job_list = []
+        self.node_state = np.zeros(0, dtype=np.int64)
+        self.node_free = []
+        self.job_nodes = {}
+        self.job_list = Class_Run_index.Run_index()
         self.predict_node = []
+        self.predict_save = []
         self.tot = -1
         self.idle = -1
         self.avail = -1
         
+    def clone(self):
+        """
+        Returns a copy of the node structure sharing the debug module: the nodes and the
+        running jobs are copied, the reservations (predict_node) start empty.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- clone",5)
+        temp_struc = copy.copy(self)
+        temp_struc.nodeStruc = [dict(temp_node) for temp_node in self.nodeStruc]
+        temp_struc.node_state = self.node_state.copy()
+        temp_struc.node_free = self.node_free[:]
+        temp_struc.job_nodes = dict(self.job_nodes)
+        temp_struc.job_list = self.job_list.copy()
+        temp_struc.predict_node = []
+        temp_struc.predict_job = []
+        temp_struc.predict_save = []
+        return temp_struc
+        
     def read_list(self,source_str):
         #self.debug.debug("* "+self.myInfo+" -- read_list",5)
         result_list=[]
@@ -65,9 +103,7 @@ class Node_struc:
             self.nodeStruc.append(tempInfo)
             i += 1
         nodeFile.close()
-        self.tot = len(self.nodeStruc)
-        self.idle = self.tot
-        self.avail = self.tot
+        self.node_state_build()
         self.debug.debug("  Tot:"+str(self.tot)+" Idle:"+str(self.idle)+" Avail:"+str(self.avail)+" ",4)
         return
         
@@ -107,9 +143,23 @@ class Node_struc:
                           "extend": None}
             self.nodeStruc.append(tempInfo)
             i += 1
+        self.node_state_build()
+
+    def node_state_build(self):
+        """
+        Builds node_state, node_free and job_nodes from the states of nodeStruc.
+        """
+        self.node_state = np.array([node['state'] for node in self.nodeStruc], dtype=np.int64)
+        self.node_free = np.flatnonzero(self.node_state < 0)[::-1].tolist()
+        self.job_nodes = {}
+        i = 0
+        while (i < len(self.nodeStruc)):
+            if (self.node_state[i] >= 0):
+                self.job_nodes.setdefault(int(self.node_state[i]), []).append(i)
+            i += 1
         self.tot = len(self.nodeStruc)
-        self.idle = self.tot
-        self.avail = self.tot
+        self.idle = len(self.node_free)
+        self.avail = self.idle
         
     def is_available(self, proc_num):
         #self.debug.debug("* "+self.myInfo+" -- is_available",6)
@@ -135,56 +185,42 @@ class Node_struc:
         #self.debug.debug("* "+self.myInfo+" -- node_allocate",5)
         if self.is_available(proc_num) == 0:
             return 0
-        i = 0
-        for node in self.nodeStruc:
-            if node['state'] <0:
-                node['state'] = job_index
-                node['start'] = start
-                node['end'] = end
-                i += 1
-            #self.debug.debug("  yyy: "+str(node['state'])+"   "+str(job_index),4)
-            if (i>=proc_num):
-                break
+        temp_nodes = self.node_free[len(self.node_free)-proc_num:]
+        temp_nodes.reverse()
+        del self.node_free[len(self.node_free)-proc_num:]
+        for i in temp_nodes:
+            node = self.nodeStruc[i]
+            node['state'] = job_index
+            node['start'] = start
+            node['end'] = end
+        self.node_state[temp_nodes] = job_index
+        self.job_nodes[job_index] = temp_nodes
         self.idle -= proc_num
         self.avail = self.idle
         temp_job_info = {'job':job_index, 'end': end, 'node': proc_num}
-        j = 0
-        is_done = 0
-        temp_num = len(self.job_list)
-        while (j<temp_num):
-            if (temp_job_info['end']<self.job_list[j]['end']):
-                self.job_list.insert(j,temp_job_info)
-                is_done = 1
-            j += 1
-            
-        if (is_done == 0):
-            self.job_list.append(temp_job_info)
+        self.job_list.add(temp_job_info)
             
         self.debug.debug("  Allocate"+"["+str(job_index)+"]"+" Req:"+str(proc_num)+" Avail:"+str(self.avail)+" ",4)
         return 1
         
     def node_release(self, job_index, end):
         #self.debug.debug("* "+self.myInfo+" -- node_release",5)
-        i = 0
-        for node in self.nodeStruc:
-            #self.debug.debug("  xxx: "+str(node['state'])+"   "+str(job_index),4)
-            if node['state'] == job_index:
-                node['state'] = -1
-                node['start'] = -1
-                node['end'] = -1
-                i += 1
+        temp_nodes = self.job_nodes.pop(job_index, [])
+        i = len(temp_nodes)
         if i <= 0:
             self.debug.debug("  Release Fail!",4)
             return 0
+        for k in temp_nodes:
+            node = self.nodeStruc[k]
+            node['state'] = -1
+            node['start'] = -1
+            node['end'] = -1
+        self.node_state[temp_nodes] = -1
+        # the nodes released go back in the same order, the lowest index on top
+        self.node_free.extend(temp_nodes[::-1])
         self.idle += i
         self.avail = self.idle
-        j = 0
-        temp_num = len(self.job_list)
-        while (j<temp_num):
-            if (job_index==self.job_list[j]['job']):
-                break
-            j += 1
-        self.job_list.pop(j)
+        self.job_list.remove(job_index)
         self.debug.debug("  Release"+"["+str(job_index)+"]"+" Req:"+str(i)+" Avail:"+str(self.avail)+" ",4)
         return 1
         
@@ -258,49 +294,30 @@ class Node_struc:
         start_index = j
         while (j < temp_max):
             if (self.predict_node[j]['time']<end):
-                k = 0
-                n = 0
-                while k< self.tot and n < proc_num:
-                    if (self.predict_node[j]['node'][k] == -1):
-                        self.predict_node[j]['node'][k] = job_index
-                        self.predict_node[j]['idle'] -= 1
-                        self.predict_node[j]['avail'] = self.predict_node[j]['idle']
-                        n += 1
-                    k += 1
+                # the first proc_num idle nodes
+                temp_nodes = np.flatnonzero(self.predict_node[j]['node'] == -1)[:proc_num]
+                self.predict_node[j]['node'][temp_nodes] = job_index
+                self.predict_node[j]['idle'] -= len(temp_nodes)
+                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
                 j += 1
             elif (self.predict_node[j]['time']==end):
                 is_done = 1
                 break
             else:
-                temp_list = []
-                k = 0
-                while k< self.tot:
-                    temp_list.append(self.predict_node[j-1]['node'][k])
-                    k += 1
-                self.predict_node.insert(j,{'time':end, 'node':temp_list,\
+                self.predict_node.insert(j,{'time':end, 'node':self.predict_node[j-1]['node'].copy(),\
                                     'idle':self.predict_node[j-1]['idle'], 'avail':self.predict_node[j-1]['avail']})
-                k = 0
-                n = 0
                 #self.debug.debug("xx   "+str(proc_num),4)
-                while k< self.tot and n < proc_num:
-                    if (self.predict_node[j]['node'][k] == job_index):
-                        self.predict_node[j]['node'][k] = -1
-                        self.predict_node[j]['idle'] += 1
-                        self.predict_node[j]['avail'] = self.predict_node[j]['idle']
-                        n += 1
-                    k += 1
+                temp_nodes = np.flatnonzero(self.predict_node[j]['node'] == job_index)[:proc_num]
+                self.predict_node[j]['node'][temp_nodes] = -1
+                self.predict_node[j]['idle'] += len(temp_nodes)
+                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
                 is_done = 1
                 
                 #self.debug.debug("xx   "+str(n)+"   "+str(k),4)
                 break
             
-        temp_list = []
         if (is_done != 1):
-            k = 0
-            while k< self.tot:
-                temp_list.append(-1)
-                k += 1
-            self.predict_node.append({'time':end, 'node':temp_list,\
+            self.predict_node.append({'time':end, 'node':np.full(self.tot, -1, dtype=np.int64),\
                                 'idle':self.tot, 'avail':self.tot})
                 
         self.predict_job.append({'job':job_index, 'start':start, 'end':end})
@@ -339,33 +356,20 @@ class Node_struc:
         #self.debug.debug("* "+self.myInfo+" -- pre_reset",5)  
         self.predict_node = []
         self.predict_job = []
-        temp_list = []
-        i = 0
-        while i< self.tot:
-            temp_list.append(self.nodeStruc[i]['state'])
-            i += 1
-        self.predict_node.append({'time':time, 'node':temp_list,\
+        self.predict_save = []
+        self.predict_node.append({'time':time, 'node':self.node_state.copy(),\
                             'idle':self.idle, 'avail':self.avail})
                             
-        temp_job_num = len(self.job_list)
         i = 0
         j = 0
-        while i< temp_job_num:
-            if (self.predict_node[j]['time']!=self.job_list[i]['end'] or i == 0):
-                temp_list = []
-                k = 0
-                while k< self.tot:
-                    temp_list.append(self.predict_node[j]['node'][k])
-                    k += 1
-                self.predict_node.append({'time':self.job_list[i]['end'], 'node':temp_list,\
+        for temp_job in self.job_list:
+            if (self.predict_node[j]['time']!=temp_job['end'] or i == 0):
+                self.predict_node.append({'time':temp_job['end'], 'node':self.predict_node[j]['node'].copy(),\
                                     'idle':self.predict_node[j]['idle'], 'avail':self.predict_node[j]['avail']})
                 j += 1
-            k=0
-            while k< self.tot:
-                if (self.predict_node[j]['node'][k] == self.job_list[i]['job']):
-                    self.predict_node[j]['node'][k] = -1
-                    self.predict_node[j]['idle'] += 1
-                k += 1
+            temp_nodes = self.job_nodes.get(temp_job['job'], [])
+            self.predict_node[j]['node'][temp_nodes] = -1
+            self.predict_node[j]['idle'] += len(temp_nodes)
             i += 1
             self.predict_node[j]['avail'] = self.predict_node[j]['idle']
         '''
@@ -379,6 +383,24 @@ class Node_struc:
         return 1
         
     
+    def pre_push(self):
+        """
+        Saves the reservations made since pre_reset, pre_pop brings them back.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- pre_push",6)  
+        temp_node = [dict(temp_point, node=temp_point['node'].copy()) for temp_point in self.predict_node]
+        self.predict_save.append((temp_node, len(self.predict_job)))
+        return 1
+        
+    def pre_pop(self):
+        """
+        Drops the reservations made since the matching pre_push.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- pre_pop",6)  
+        self.predict_node, temp_job_num = self.predict_save.pop()
+        del self.predict_job[temp_job_num:]
+        return 1
+        
     def find_res_place(self, proc_num, index, time):
         self.debug.debug("* "+self.myInfo+" -- find_res_place",5)  
         if index>=len(self.predict_node):
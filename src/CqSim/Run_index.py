@@ -0,0 +1,76 @@
+from bisect import bisect_left
+
+__metaclass__ = type
+
+class Run_index:
+    """
+    Running jobs of Node_struc in end time order, used as Node_struc.job_list.
+
+    - Holds the job entries {'job', 'end', 'node'} built by node_allocate. Iterating or indexing
+      gives them in end time order, a job goes after the jobs added before it with the same end
+      time (the order the old list walk gave).
+    - Entries are kept sorted on (end, add counter). add() finds its place with a binary search,
+      remove() finds the job with a dict lookup and a binary search.
+    - The entries list is never copied, pre_reset walks it directly.
+    """
+    def __init__(self):
+        self.myInfo = "Run Index"
+        self.keys = []
+        self.entries = []
+        self.job_key = {}
+        self.seq = 0
+
+    def add(self, job_info):
+        key = (job_info['end'], self.seq)
+        self.seq += 1
+        pos = bisect_left(self.keys, key)
+        self.keys.insert(pos, key)
+        self.entries.insert(pos, job_info)
+        self.job_key[job_info['job']] = key
+
+    def remove(self, job_index):
+        """
+        Removes the job and returns its entry, None when the job is not running.
+        """
+        key = self.job_key.pop(job_index, None)
+        if key == None:
+            return None
+        pos = bisect_left(self.keys, key)
+        del self.keys[pos]
+        return self.entries.pop(pos)
+
+    def copy(self):
+        """
+        Returns a copy holding the same entries.
+        """
+        temp_index = Run_index()
+        temp_index.keys = self.keys[:]
+        temp_index.entries = self.entries[:]
+        temp_index.job_key = dict(self.job_key)
+        temp_index.seq = self.seq
+        return temp_index
+
+    def get(self, job_index):
+        key = self.job_key.get(job_index)
+        if key == None:
+            return None
+        return self.entries[bisect_left(self.keys, key)]
+
+    def has_end(self, end):
+        """
+        Returns True when a running job ends at end.
+        """
+        pos = bisect_left(self.keys, (end,))
+        return (pos < len(self.keys) and self.keys[pos][0] == end)
+
+    def __contains__(self, job_index):
+        return job_index in self.job_key
+
+    def __getitem__(self, i):
+        return self.entries[i]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
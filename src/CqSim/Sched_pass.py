@@ -0,0 +1,168 @@
+
+__metaclass__ = type
+
+class Sched_pass:
+    """
+    Job events and scheduling passes of the simulator, shared by Cqsim_sim and
+    Turnaround_estimator: the estimate replays the passes of the simulator with this same code.
+
+    - The subclass gives self.module ('job', 'node', 'win', 'backfill', 'alg'), self.debug,
+      self.currentTime, self.current_event and self.event_seq (Event_queue), and the hooks
+      submit, finish, start, sys_collect, interface and insert_event_monitor.
+    - module['job'] is Job_trace in Cqsim_sim, the jobs of the estimate in Turnaround_estimator
+      (the same methods: wait_list, job_info, proc_list, wait_columns, wait_info, refresh_score).
+    - A pass only builds what the modules look at: the scores are computed when Wait_index can
+      reorder the queue (they only give the order), and the EASY backfill (modes 1 and 3) only
+      gets the first job and the jobs fitting in the idle processors, the others can not be
+      backfilled.
+    """
+    def event_job(self, para_in = None):
+        #self.debug.debug("# "+self.myInfo+" -- event_job",5)
+        '''
+        self.debug.line(2,"xxxxx")
+        i = 0
+        while (i<len(self.event_seq)):
+            self.debug.debug(self.event_seq[i],2)
+            i += 1
+
+        self.debug.line(2,"xxxxx")
+        self.debug.line(2," ")
+        self.debug.line(2," ")
+        '''
+        if (self.current_event['para'][0] == 1):
+            self.submit(self.current_event['para'][1])
+        elif (self.current_event['para'][0] == 2):
+            self.finish(self.current_event['para'][1])
+        self.score_calculate()
+        self.start_scan()
+        #if (self.event_pointer < len(self.event_seq)-1):
+        if (len(self.event_seq) > 0):
+            #self.insert_event_monitor(self.currentTime, self.event_seq[self.event_pointer+1]['time'])
+            self.insert_event_monitor(self.currentTime, self.event_seq.peek()['time'])
+        return
+
+    def event_job_batch(self, para_in = None):
+        #self.debug.debug("# "+self.myInfo+" -- event_job_batch",5)
+        # Every job event sharing the current time stamp is handled before the scheduling pass.
+        # Submit events are read before their time comes, so the whole batch is already queued.
+        # A pass inside the batch is only run when a waiting job fits in the available
+        # processors; otherwise it cannot start anything and skipping it changes no result.
+        while (1):
+            if (self.current_event['para'][0] == 1):
+                self.submit(self.current_event['para'][1])
+            elif (self.current_event['para'][0] == 2):
+                self.finish(self.current_event['para'][1])
+            temp_event = self.event_seq.peek()
+            if (temp_event == None or temp_event['type'] != 1 or temp_event['time'] != self.currentTime):
+                break
+            if (self.wait_job_startable()):
+                self.score_calculate()
+                self.start_scan()
+            else:
+                self.saved_passes += 1
+            self.sys_collect()
+            self.interface()
+            self.current_event = self.event_seq.pop()
+            self.debug.debug("   "+str(self.current_event),2)
+        self.score_calculate()
+        self.start_scan()
+        if (len(self.event_seq) > 0):
+            self.insert_event_monitor(self.currentTime, self.event_seq.peek()['time'])
+        return
+
+    def wait_job_startable(self):
+        #self.debug.debug("# "+self.myInfo+" -- wait_job_startable",5)
+        temp_avail = self.module['node'].get_avail()
+        temp_wait = self.module['job'].wait_list()
+        if not temp_wait:
+            return 0
+        if (min(self.module['job'].proc_list(temp_wait)) <= temp_avail):
+            return 1
+        return 0
+
+    def score_calculate(self):
+        #self.debug.debug("# "+self.myInfo+" -- score_calculate",5)
+        temp_form = self.module['alg'].wait_form
+        temp_index = self.module['job'].wait_index
+        if (len(temp_index.pending) == 0 and not temp_index.all_pending):
+            # Wait_index.rank would give back the same order
+            if (temp_form == 'fixed'):
+                return
+            if (temp_form == 'linear' and temp_index.next_check != None and self.currentTime < temp_index.next_check):
+                return
+        temp_submit, temp_req_time, temp_req_proc = self.module['job'].wait_columns()
+        score_list = self.module['alg'].get_score_columns(temp_submit, temp_req_time, temp_req_proc,\
+         self.currentTime - temp_submit)
+        self.module['job'].refresh_score(score_list, time=self.currentTime, score_form=temp_form,\
+         score_coef=self.module['alg'].get_score_coef, columns=(temp_submit, temp_req_time, temp_req_proc))
+        return
+
+    def start_scan(self):
+        #self.debug.debug("# "+self.myInfo+" -- start_scan",5)
+        start_max = self.module['win'].start_num()
+        temp_wait = self.module['job'].wait_list()
+        wait_num = len(temp_wait)
+        win_count = start_max
+
+        i = 0
+        while (i<wait_num):
+            if (win_count >= start_max):
+                win_count = 0
+                temp_wait = self.start_window(temp_wait)
+            #print "....  ", temp_wait[i]
+            temp_job = self.module['job'].job_info(temp_wait[i])
+            if (self.module['node'].is_available(temp_job['reqProc'])):
+                self.start(temp_wait[i])
+            else:
+                temp_wait = self.module['job'].wait_list()
+                self.backfill(temp_wait)
+                break
+            i += 1
+            win_count += 1
+        return
+
+    def start_window(self, temp_wait_B):
+        #self.debug.debug("# "+self.myInfo+" -- start_window",5)
+        win_size = self.module['win'].window_size()
+
+        if (len(temp_wait_B)>win_size):
+            temp_wait_A = temp_wait_B[0:win_size]
+            temp_wait_B = temp_wait_B[win_size:]
+        else:
+            temp_wait_A = temp_wait_B
+            temp_wait_B = []
+
+        temp_wait_info = self.module['job'].wait_info(temp_wait_A)
+
+        temp_wait_A = self.module['win'].start_window(temp_wait_info,{"time":self.currentTime})
+        temp_wait_B[0:0] = temp_wait_A
+        return temp_wait_B
+
+    def backfill(self, temp_wait):
+        #self.debug.debug("# "+self.myInfo+" -- backfill",5)
+        if (self.module['backfill'].mode == 1 or self.module['backfill'].mode == 3):
+            # a job needing more than the idle processors fails pre_avail and reserves nothing
+            temp_idle = self.module['node'].get_idle()
+            temp_proc = self.module['job'].proc_list(temp_wait[1:])
+            temp_wait = temp_wait[0:1] + [job_index for job_index, proc in zip(temp_wait[1:], temp_proc) if proc <= temp_idle]
+        temp_wait_info = self.module['job'].wait_info(temp_wait)
+        backfill_list = self.module['backfill'].backfill(temp_wait_info, {'time':self.currentTime})
+        #self.debug.debug("HHHHHHHHHHHHH "+str(backfill_list)+" -- backfill",2)
+        if not backfill_list:
+            return 0
+
+        for job in backfill_list:
+            self.start(job)
+        return 1
+
+    def allocate(self, job_index):
+        #self.debug.debug("# "+self.myInfo+" -- allocate",5)
+        # the processors of a job started by the pass, from now to its walltime
+        temp_job = self.module['job'].job_info(job_index)
+        if (self.module['node'].node_allocate(temp_job['reqProc'], job_index,\
+         self.currentTime, self.currentTime + temp_job['reqTime']) == 0):
+            # the scheduling modules picked a job the idle processors can not run
+            self.debug.debug("  Start Fail! ["+str(job_index)+"]",1)
+            raise RuntimeError("Job "+str(temp_job['id'])+" started on "+str(self.module['node'].get_idle())+\
+             " idle processors, "+str(temp_job['reqProc'])+" requested")
+        return
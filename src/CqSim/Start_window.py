@@ -1,6 +1,17 @@
 
 __metaclass__ = type
 class Start_window:
+    """
+    Start window: the order in which the first jobs of the wait list are started.
+
+    - mode 1 (window): the order of the first check_size jobs giving the earliest end of their
+      reservations, found by window_search (window_check, trying every order, for up to 3 jobs).
+      The other modes keep the wait list order.
+    - para_list: [window size, check size, max start size, beam width], 0 takes the default
+      (check size and max start size: the window size, beam width: no beam).
+    - search_node is the number of reservations tried by the last window_search,
+      search_node_tot the number since the start.
+    """
     def __init__(self, mode = 0, ad_mode = 0, node_module = None, debug = None, para_list = [6,0,0], para_list_ad = None):
         self.myInfo = "Start Window"
         self.mode = mode
@@ -22,11 +33,18 @@ class Start_window:
             self.max_start_size = int(self.para_list[2])
         else:
             self.max_start_size = self.win_size
+        if (len(self.para_list)>=4 and int(self.para_list[3]) > 0):
+            self.beam_width = int(self.para_list[3])
+        else:
+            self.beam_width = 0
             
         self.temp_check_len = self.check_size_in
         
         self.current_para = []
-        self.seq_list = []
+        self.seq_list = {}
+        self.search_best = None
+        self.search_node = 0
+        self.search_node_tot = 0
 
         self.debug.line(4," ")
         self.debug.line(4,"#")
@@ -59,12 +77,16 @@ class Start_window:
                 self.max_start_size = self.para_list[2]
             else:
                 self.max_start_size = self.win_size
+            if (len(self.para_list)>=4 and self.para_list[3] and int(self.para_list[3]) > 0):
+                self.beam_width = int(self.para_list[3])
+            else:
+                self.beam_width = 0
                 
         if para_list_ad:
             self.para_list_ad = para_list_ad
             
         self.current_para = []
-        self.seq_list = []
+        self.seq_list = {}
         self.reset_list()
     
     def start_window (self, wait_job, para_in = None):
@@ -86,8 +108,11 @@ class Start_window:
         #self.debug.debug("* "+self.myInfo+" -- main",5) 
         result = []
         if self.mode == 1:
-            # window
-            result = self.window_check()
+            # window, up to 3 jobs trying every order costs less than the search
+            if (self.temp_check_len <= 3 and self.beam_width == 0):
+                result = self.window_check()
+            else:
+                result = self.window_search()
             #print ">>>>>>>>>>. ",result
         else:
             # no window
@@ -117,31 +142,25 @@ class Start_window:
     
     def reset_list (self):
         #self.debug.debug("* "+self.myInfo+" -- reset_list",5) 
-        self.seq_list = []
+        # seq_list: number of jobs -> their permutations, built by window_check for the jobs
+        # waiting only (up to 3), not for the whole window
+        self.seq_list = {}
         self.temp_list=[]
         self.wait_job = []
-        temp_seq=[]
-        i = 0
-        ele = []
-        while (i<self.check_size_in):
-            ele.append(i)
-            self.temp_list.append(-1)
-            i += 1
-        self.build_seq_list(self.check_size_in, ele, self.check_size_in-1)
 
-    def build_seq_list(self, seq_len, ele_pool, temp_index):
+    def build_seq_list(self, seq_len, ele_pool, temp_index, seq_save):
         #self.debug.debug("* "+self.myInfo+" -- build_seq_list",6) 
         if (seq_len<=1):
             self.temp_list[temp_index]=ele_pool[0]
             temp_seq_save = self.temp_list[:]
-            self.seq_list.append(temp_seq_save)
+            seq_save.append(temp_seq_save)
         else:
             i = seq_len - 1
             while (i>=0):
                 self.temp_list[temp_index] = ele_pool[i]
                 temp_ele_pool = ele_pool[:]
                 temp_ele_pool.pop(i)
-                self.build_seq_list(seq_len-1,temp_ele_pool,temp_index-1)
+                self.build_seq_list(seq_len-1,temp_ele_pool,temp_index-1,seq_save)
                 i -= 1
     
     def window_check (self):
@@ -150,14 +169,22 @@ class Start_window:
         temp_wait_list = []
         temp_wait_listB = []
         temp_last = -1
-        temp_max = 1
         i = 1
         if (self.temp_check_len == 1):
             return [self.wait_job[0]['index']]
-        
-        while (i<=self.temp_check_len):
-            temp_max = temp_max * i
-            i += 1
+        if (self.temp_check_len not in self.seq_list):
+            # the temp_check_len! orders of the jobs waiting, in the order of the first ones of
+            # the whole window (the jobs after them do not move)
+            temp_ele = []
+            self.temp_list = []
+            while (i<=self.temp_check_len):
+                temp_ele.append(i-1)
+                self.temp_list.append(-1)
+                i += 1
+            self.seq_list[self.temp_check_len] = []
+            self.build_seq_list(self.temp_check_len, temp_ele, self.temp_check_len-1, self.seq_list[self.temp_check_len])
+        temp_seq_list = self.seq_list[self.temp_check_len]
+        temp_max = len(temp_seq_list)
             
         i = 0
         while (i<temp_max):
@@ -165,13 +192,13 @@ class Start_window:
             temp_index = 0
             self.node_module.pre_reset(self.current_para['time'])
             while (j < self.temp_check_len):
-                temp_index =self.node_module.reserve(self.wait_job[self.seq_list[i][j]]['proc'],\
-                             self.wait_job[self.seq_list[i][j]]['index'], self.wait_job[self.seq_list[i][j]]['run'], index = temp_index)
+                temp_index =self.node_module.reserve(self.wait_job[temp_seq_list[i][j]]['proc'],\
+                             self.wait_job[temp_seq_list[i][j]]['index'], self.wait_job[temp_seq_list[i][j]]['run'], index = temp_index)
                 j += 1
             
             if (temp_last == -1 or temp_last>self.node_module.pre_get_last()['end']):
                 temp_last = self.node_module.pre_get_last()['end']
-                temp_wait_list = self.seq_list[i]
+                temp_wait_list = temp_seq_list[i]
             i += 1
             
         i = 0
@@ -180,4 +207,102 @@ class Start_window:
             i += 1
         
         return temp_wait_listB
-        
\ No newline at end of file
+    
+    def window_search (self):
+        #self.debug.debug("* "+self.myInfo+" -- window_search",5) 
+        # Same order as window_check without trying every permutation: a depth first search over
+        # the order of the reservations, a prefix of reservations is kept (node_module.pre_push)
+        # while the jobs after it are tried. A prefix is dropped when its lower bound of the end
+        # can not beat the best order found, or with a beam width, when it is not among the
+        # beam_width children of its parent ending first (the order found may then be worse).
+        if (self.temp_check_len == 1):
+            return [self.wait_job[0]['index']]
+        
+        temp_pool = []
+        i = 0
+        while (i<self.temp_check_len):
+            temp_pool.append(i)
+            i += 1
+        self.search_best = None
+        self.search_node = 0
+        self.node_module.pre_reset(self.current_para['time'])
+        self.search_seq([], temp_pool, 0)
+        self.search_node_tot += self.search_node
+        self.debug.debug("  Window search: "+str(self.search_node)+" nodes",4)
+        
+        temp_wait_listB = []
+        for temp_job in self.search_best[2]:
+            temp_wait_listB.append(self.wait_job[temp_job]['index'])
+        return temp_wait_listB
+    
+    def search_seq (self, temp_seq, temp_pool, temp_index):
+        #self.debug.debug("* "+self.myInfo+" -- search_seq",6) 
+        # temp_seq: the jobs reserved, temp_pool: the jobs left, temp_index: the profile point of
+        # the last start
+        # every job left is tried next first: a job can not end before it does when reserved next
+        # (the jobs before it only take processors and its start does not move back)
+        temp_child = []
+        temp_bound = -1
+        for temp_job in temp_pool:
+            temp_pool_left = [temp_left for temp_left in temp_pool if temp_left != temp_job]
+            self.node_module.pre_push()
+            self.search_reserve(temp_job, temp_index)
+            temp_pre_last = self.node_module.pre_get_last()
+            self.node_module.pre_pop()
+            if (len(temp_pool_left) == 0):
+                self.search_leaf(temp_seq + [temp_job], temp_pre_last['end'])
+                return
+            if (temp_pre_last['end'] > temp_bound):
+                temp_bound = temp_pre_last['end']
+            temp_child.append((temp_pre_last['end'], self.seq_key(temp_seq + [temp_job] + temp_pool_left),\
+             temp_job, temp_pool_left, temp_pre_last['start']))
+        
+        # the children ending first go first, with a beam only the beam_width first ones
+        temp_child.sort()
+        if (self.beam_width > 0):
+            temp_child = temp_child[:self.beam_width]
+        for temp_end, temp_key, temp_job, temp_pool_left, temp_start in temp_child:
+            if (self.seq_pruned(self.seq_bound(temp_bound, temp_start, temp_pool_left), temp_key)):
+                continue
+            self.node_module.pre_push()
+            temp_child_index = self.search_reserve(temp_job, temp_index)
+            self.search_seq(temp_seq + [temp_job], temp_pool_left, temp_child_index)
+            self.node_module.pre_pop()
+        return
+    
+    def search_leaf (self, temp_seq, temp_last):
+        # temp_seq reserves all the jobs, temp_last: the last end
+        temp_key = self.seq_key(temp_seq)
+        if (self.search_best == None or temp_last < self.search_best[0] or \
+         (temp_last == self.search_best[0] and temp_key < self.search_best[1])):
+            self.search_best = (temp_last, temp_key, temp_seq)
+        return
+    
+    def search_reserve (self, temp_job, temp_index):
+        # reserve the job temp_job of the window from the start of the previous one, like window_check
+        self.search_node += 1
+        return self.node_module.reserve(self.wait_job[temp_job]['proc'], self.wait_job[temp_job]['index'],\
+         self.wait_job[temp_job]['run'], index = temp_index)
+    
+    def seq_bound (self, temp_bound, temp_start, temp_pool):
+        # lower bound of the last end, the jobs left start at the earliest with the last one
+        for temp_job in temp_pool:
+            if (temp_start + self.wait_job[temp_job]['run'] > temp_bound):
+                temp_bound = temp_start + self.wait_job[temp_job]['run']
+        return temp_bound
+    
+    def seq_key (self, temp_seq):
+        # position of the order in seq_list (build_seq_list), the last job varies slowest
+        temp_key = []
+        i = len(temp_seq) - 1
+        while (i >= 0):
+            temp_key.append(-temp_seq[i])
+            i -= 1
+        return temp_key
+    
+    def seq_pruned (self, temp_bound, temp_key):
+        # temp_key: the first order in seq_list after the prefix (the jobs left in order)
+        if (self.search_best == None):
+            return False
+        return (temp_bound > self.search_best[0] or \
+         (temp_bound == self.search_best[0] and temp_key > self.search_best[1]))
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import numpy as np
+
+__metaclass__ = type
+
+# Bumped when the layout of an entry or the output of the job filter changes.
+CACHE_VERSION = 1
+
+def default_cache_dir():
+    """
+    CQSIM_TRACE_CACHE if set, ~/.cache/cqsim/traces otherwise.
+    """
+    path = os.environ.get('CQSIM_TRACE_CACHE')
+    if not path:
+        path = os.path.join(os.path.expanduser('~'), '.cache', 'cqsim', 'traces')
+    return path
+
+class Trace_cache:
+    """
+    On-disk cache of filtered job traces, shared by all the runs using the same cache_dir.
+
+    - An entry holds the jobs kept by the job filter for one trace file, one .npy file per
+      job field, and the config values of the filter (StartTime, start_offset, ...).
+    - Entries are addressed by a hash of the content of the trace file and of the filter
+      parameters (start, density, anchor, rnum): a changed trace never hits an old entry.
+      The content hash of a trace is kept per (path, size, mtime), a trace is read once.
+    - An entry is written in a temporary directory and renamed, readers never see a partial entry.
+    - load() memory maps the columns, a hit costs a few file opens.
+    - evict() removes entries by age or down to a total size, least recently used first.
+      It is also available from the command line:
+          python -m CqSim.Trace_cache list
+          python -m CqSim.Trace_cache evict --max-size 2G --max-age 30
+    """
+    def __init__(self, cache_dir = None):
+        self.myInfo = "Trace Cache"
+        if cache_dir == None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = cache_dir
+        self.source_file = os.path.join(self.cache_dir, 'sources.json')
+
+    def trace_digest(self, trace):
+        """
+        Returns the sha256 of the content of the trace file.
+        """
+        temp_stat = os.stat(trace)
+        temp_id = [temp_stat.st_size, temp_stat.st_mtime_ns]
+        path = os.path.realpath(trace)
+        sources = self.read_json(self.source_file, {})
+        if (sources.get(path, [None])[:2] == temp_id):
+            return sources[path][2]
+        digest = hashlib.sha256()
+        with open(trace, 'rb') as f:
+            block = f.read(1 << 20)
+            while block:
+                digest.update(block)
+                block = f.read(1 << 20)
+        sources = self.read_json(self.source_file, {})
+        sources[path] = temp_id + [digest.hexdigest()]
+        self.write_json(self.source_file, sources)
+        return digest.hexdigest()
+
+    def key(self, trace, params):
+        temp_key = json.dumps({'trace':self.trace_digest(trace), 'params':params,\
+         'version':CACHE_VERSION}, sort_keys=True)
+        return hashlib.sha256(temp_key.encode()).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, trace, params):
+        """
+        Returns the path of the entry of trace filtered with params, None when it is not cached.
+        """
+        entry = self.entry_path(self.key(trace, params))
+        meta_file = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+        # the modification time of meta.json is the last use of the entry
+        os.utime(meta_file)
+        return entry
+
+    def store(self, trace, params, columns, config):
+        """
+        Adds the jobs of trace filtered with params to the cache.
+
+        columns: dict of numpy arrays, one per job field
+        config: dict of the config values of the filter
+        Returns the path of the entry.
+        """
+        entry = self.entry_path(self.key(trace, params))
+        temp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=self.cache_dir)
+        try:
+            for name in columns:
+                np.save(os.path.join(temp_dir, name+'.npy'), np.ascontiguousarray(columns[name]))
+            meta = {'trace':os.path.realpath(trace), 'params':params, 'config':config,\
+             'columns':list(columns), 'jobs':len(next(iter(columns.values()), [])),\
+             'version':CACHE_VERSION, 'created':time.time()}
+            self.write_json(os.path.join(temp_dir, 'meta.json'), meta)
+            os.rename(temp_dir, entry)
+        except OSError:
+            # stored by another run in the meantime
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.exists(os.path.join(entry, 'meta.json')):
+                raise
+        return entry
+
+    def load(self, entry):
+        """
+        Returns (columns, meta) of an entry, the columns are read only memory maps.
+        """
+        meta = self.read_json(os.path.join(entry, 'meta.json'), None)
+        columns = {}
+        for name in meta['columns']:
+            columns[name] = np.load(os.path.join(entry, name+'.npy'), mmap_mode='r')
+        return columns, meta
+
+    def entries(self):
+        """
+        Returns the entries as dicts {'key', 'path', 'size', 'used', 'meta'}, least recently used first.
+        """
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for key in os.listdir(self.cache_dir):
+            path = self.entry_path(key)
+            meta_file = os.path.join(path, 'meta.json')
+            if (key.startswith('.') or not os.path.exists(meta_file)):
+                continue
+            size = 0
+            for name in os.listdir(path):
+                size += os.path.getsize(os.path.join(path, name))
+            result.append({'key':key, 'path':path, 'size':size, 'used':os.path.getmtime(meta_file),\
+             'meta':self.read_json(meta_file, {})})
+        result.sort(key=lambda temp_entry: temp_entry['used'])
+        return result
+
+    def evict(self, max_size = None, max_age = None):
+        """
+        Removes the entries not used for max_age seconds, then the least recently used entries
+        until the cache holds at most max_size bytes. Removes every entry when both are None.
+        Left over temporary directories of interrupted runs are removed too.
+
+        Returns the removed entries.
+        """
+        removed = []
+        now = time.time()
+        entries = self.entries()
+        total = sum([temp_entry['size'] for temp_entry in entries])
+        for temp_entry in entries:
+            if (max_size == None and max_age == None):
+                temp_remove = True
+            else:
+                temp_remove = (max_age != None and now - temp_entry['used'] > max_age)
+                temp_remove = temp_remove or (max_size != None and total > max_size)
+            if temp_remove:
+                shutil.rmtree(temp_entry['path'], ignore_errors=True)
+                total -= temp_entry['size']
+                removed.append(temp_entry)
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if (name.startswith('.tmp_') and now - os.path.getmtime(path) > 3600):
+                    shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+    def read_json(self, path, default):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def write_json(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+def parse_size(text):
+    """
+    Size in bytes from '512', '300K', '20M' or '2G'.
+    """
+    units = {'K':1 << 10, 'M':1 << 20, 'G':1 << 30, 'T':1 << 40}
+    text = text.strip().upper().rstrip('B')
+    if (text and text[-1] in units):
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog='python -m CqSim.Trace_cache', description='Manage the cache of filtered job traces.')
+    parser.add_argument('--dir', default=None, help='cache directory (default: %s)' % default_cache_dir())
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('list', help='list the cached traces')
+    evict_parser = commands.add_parser('evict', help='remove cached traces')
+    evict_parser.add_argument('--max-size', default=None, help='keep at most this size, e.g. 2G')
+    evict_parser.add_argument('--max-age', type=float, default=None, help='remove the traces not used for this many days')
+    args = parser.parse_args(argv)
+
+    cache = Trace_cache(args.dir)
+    if (args.command == 'evict'):
+        max_size = None
+        max_age = None
+        if (args.max_size != None):
+            max_size = parse_size(args.max_size)
+        if (args.max_age != None):
+            max_age = args.max_age * 86400
+        removed = cache.evict(max_size=max_size, max_age=max_age)
+        print('Removed %d cached traces, %.1f MB' % (len(removed), sum([temp_entry['size'] for temp_entry in removed]) / 1e6))
+    elif (args.command == 'list'):
+        for temp_entry in cache.entries():
+            meta = temp_entry['meta']
+            print('%s  %8.1f MB  %8d jobs  %s  %s  %s' % (temp_entry['key'][:12], temp_entry['size'] / 1e6,\
+             meta.get('jobs', 0), time.strftime('%Y-%m-%d %H:%M', time.localtime(temp_entry['used'])),\
+             meta.get('trace'), meta.get('params')))
+    else:
+        parser.print_help()
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os
+import copy
+
+__metaclass__ = type
+
+class Trace_reader:
+    """
+    Buffered line reader for the formatted job trace.
+
+    - The file is opened once and read ahead in blocks of buf_size bytes.
+    - offset is the exact byte offset of the next line, like f.tell() after f.readline().
+      seek() moves it, inside the read-ahead block no data is read again.
+    - Blocks are read with os.pread at an explicit position, the descriptor offset is never
+      used. A simulator copied by fork (Cqsim_plus what-if runs) keeps reading from its own
+      offset, even while the parent or other copies read the same descriptor.
+    - readline() returns str with '\\n' line ends, "" at the end of the file.
+      read_lines() returns up to n raw lines (bytes, line ends as in the file).
+    """
+    def __init__(self, path, offset = 0, buf_size = 1 << 16):
+        self.myInfo = "Trace Reader"
+        self.path = path
+        self.buf_size = buf_size
+        self.fd = None
+        self.buf = b''
+        self.buf_start = offset
+        self.pos = 0
+        self.offset = offset
+        self.open()
+
+    def copy(self):
+        """
+        Returns a reader at the same offset, sharing the read-ahead block.
+        It opens its own descriptor on its first read, closing one does not close the other.
+        """
+        temp_reader = copy.copy(self)
+        temp_reader.fd = None
+        return temp_reader
+
+    def __getstate__(self):
+        # only the offset is kept, the reader opens the file again and reads ahead on its next read
+        temp_state = dict(self.__dict__)
+        temp_state['fd'] = None
+        temp_state['buf'] = b''
+        temp_state['buf_start'] = self.offset
+        temp_state['pos'] = 0
+        return temp_state
+
+    def __copy__(self):
+        # __getstate__ is for pickling, a copy shares the read-ahead block
+        temp_reader = self.__class__.__new__(self.__class__)
+        temp_reader.__dict__.update(self.__dict__)
+        return temp_reader
+
+    def open(self):
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def read_block(self, position):
+        self.open()
+        if hasattr(os, 'pread'):
+            return os.pread(self.fd, self.buf_size, position)
+        os.lseek(self.fd, position, os.SEEK_SET)
+        return os.read(self.fd, self.buf_size)
+
+    def seek(self, offset):
+        if (self.buf_start <= offset <= self.buf_start + len(self.buf)):
+            self.pos = offset - self.buf_start
+        else:
+            self.buf = b''
+            self.buf_start = offset
+            self.pos = 0
+        self.offset = offset
+
+    def readline(self):
+        line = self.readline_raw()
+        if line.endswith(b'\r\n'):
+            line = line[:-2] + b'\n'
+        return line.decode()
+
+    def read_lines(self, n):
+        lines = []
+        while (len(lines) < n):
+            line = self.readline_raw()
+            if not line:
+                break
+            lines.append(line)
+        return lines
+
+    def readline_raw(self):
+        end = self.buf.find(b'\n', self.pos)
+        while (end < 0):
+            # keep the unread tail and append the next block
+            temp_block = self.read_block(self.buf_start + len(self.buf))
+            if not temp_block:
+                break
+            self.buf = self.buf[self.pos:] + temp_block
+            self.buf_start += self.pos
+            self.pos = 0
+            end = self.buf.find(b'\n', self.pos)
+        if (end < 0):
+            end = len(self.buf) - 1
+        line = self.buf[self.pos:end+1]
+        self.pos = end + 1
+        self.offset += len(line)
+        return line
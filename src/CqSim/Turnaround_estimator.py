@@ -0,0 +1,190 @@
+import copy
+import heapq
+import numpy as np
+
+import CqSim.Event_queue as Class_Event_queue
+import CqSim.Sched_pass as Class_Sched_pass
+
+__metaclass__ = type
+
+class Estimate_jobs:
+    """
+    Jobs of a Turnaround_estimator: the part of Job_trace the scheduling passes use (Sched_pass)
+    on {job index: {'id', 'submit', 'reqProc', 'reqTime', 'run', 'score'}}, the wait list in
+    score order and a copy of the wait index of the simulator.
+    """
+    def __init__(self, jobs, wait, wait_index):
+        self.myInfo = "Estimate Jobs"
+        self.jobs = jobs
+        self.wait = wait
+        self.wait_index = wait_index
+
+    def wait_list(self):
+        return self.wait
+
+    def job_info(self, job_index):
+        return self.jobs[job_index]
+
+    def job_column(self, name, job_list):
+        return np.array([self.jobs[job_index][name] for job_index in job_list], dtype=float)
+
+    def proc_list(self, job_list):
+        return [self.jobs[job_index]['reqProc'] for job_index in job_list]
+
+    def wait_columns(self):
+        return self.job_column('submit', self.wait), self.job_column('reqTime', self.wait),\
+         self.job_column('reqProc', self.wait)
+
+    def wait_info(self, job_list):
+        return [{"index":job_index, "proc":self.jobs[job_index]['reqProc'], "node":self.jobs[job_index]['reqProc'],\
+         "run":self.jobs[job_index]['run'], "score":self.jobs[job_index]['score']} for job_index in job_list]
+
+    def refresh_score(self, score, time=None, score_form=None, score_coef=None, columns=None):
+        i = 0
+        for job_index in self.wait:
+            self.jobs[job_index]['score'] = score[i]
+            i += 1
+        self.wait = self.wait_index.rank(self.wait, score, time, score_form, score_coef, columns)
+
+    def job_submit(self, job_index):
+        self.jobs[job_index]['score'] = 0
+        self.wait.append(job_index)
+        self.wait_index.job_added(job_index)
+
+    def job_start(self, job_index, time):
+        self.wait.remove(job_index)
+        self.wait_index.job_removed(job_index)
+
+class Turnaround_estimator(Class_Sched_pass.Sched_pass):
+    """
+    Start and turnaround of a job not read yet by a simulator, computed in the current process
+    without running a copy of the simulator (see Cqsim_plus.estimate_next_job).
+
+    - The jobs read up to it (Job_trace.peek_jobs) are submitted to a copy of the wait queue,
+      of the running jobs (node_module.clone(), its availability profile is built again from
+      them) and of the pending job events, at the point Cqsim_sim.scan_event reads them.
+    - The job events and the scheduling passes are the ones of Cqsim_sim (Sched_pass), run on
+      the copies until the job starts. The start window (Start_window) and the backfill
+      (Backfill) are the simulator modules, given the copied node structure, the jobs and the
+      wait queue order are kept by Estimate_jobs.
+    - Only the job events are replayed, the monitor events do not change the schedule. Nothing
+      is collected or written.
+    - No other job is read, the start is the one line_step_what_if gives.
+    """
+    def __init__(self, sim):
+        self.myInfo = "Turnaround Estimator"
+        self.sim = sim
+        self.debug = sim.debug
+        self.batch_events = sim.batch_events
+        self.module = None
+        self.currentTime = 0
+        self.current_event = None
+        self.event_seq = None
+        self.saved_passes = 0
+        self.submit_list = []
+        self.previous_read_job_time = -1
+        self.watch_id = None
+        self.result = None
+
+    def estimate(self, job_list, job_id):
+        """
+        Reads the jobs of job_list (see Job_trace.peek_jobs), returns {'start', 'end', 'turnaround'}
+        of the job job_id (id in the trace) among them, None when it does not start.
+        """
+        temp_debug = self.sim.debug
+        temp_lvl = temp_debug.lvl
+        temp_debug.set_lvl(-1)
+        try:
+            self.reset_state()
+            self.watch_id = job_id
+            temp_jobs = self.module['job'].jobs
+            job_index = self.sim.module['job'].job_counter
+            for job_info in job_list:
+                temp_jobs[job_index] = {'id':job_info['id'], 'submit':job_info['submit'], 'reqProc':job_info['reqProc'],\
+                 'reqTime':job_info['reqTime'], 'run':job_info['run'], 'score':0}
+                self.submit_list.append(job_index)
+                job_index += 1
+            self.scan_event()
+        finally:
+            temp_debug.set_lvl(temp_lvl)
+        return self.result
+
+    def reset_state(self):
+        # copies of the simulator state, the modules deciding the schedule get the copied nodes
+        sim_module = self.sim.module
+        temp_node = sim_module['node'].clone()
+        temp_win = copy.copy(sim_module['win'])
+        temp_win.node_module = temp_node
+        temp_backfill = copy.copy(sim_module['backfill'])
+        temp_backfill.node_module = temp_node
+        self.currentTime = self.sim.currentTime
+        self.current_event = None
+        self.submit_list = []
+        self.previous_read_job_time = self.sim.previous_read_job_time
+        self.result = None
+
+        # job events in (time, prio, insertion order) order, the monitor events are left out
+        self.event_seq = Class_Event_queue.Event_queue()
+        self.event_seq.heap = [temp_event for temp_event in self.sim.event_seq.heap if temp_event[3]['type'] == 1]
+        heapq.heapify(self.event_seq.heap)
+        self.event_seq.seq = self.sim.event_seq.seq
+
+        job_module = sim_module['job']
+        temp_wait_index = copy.copy(job_module.wait_index)
+        temp_wait_index.pending = set(job_module.wait_index.pending)
+        temp_wait = list(job_module.wait_list())
+        temp_jobs = {}
+        temp_index = temp_wait + [temp_event[3]['para'][1] for temp_event in self.event_seq.heap]
+        for job_index in temp_index:
+            temp_job = job_module.job_info(job_index)
+            temp_jobs[job_index] = {'id':temp_job['id'], 'submit':temp_job['submit'], 'reqProc':temp_job['reqProc'],\
+             'reqTime':temp_job['reqTime'], 'run':temp_job['run'], 'score':temp_job['score']}
+
+        self.module = {'job':Estimate_jobs(temp_jobs, temp_wait, temp_wait_index), 'node':temp_node,\
+         'win':temp_win, 'backfill':temp_backfill, 'alg':sim_module['alg']}
+
+    def insert_event(self, type, time, priority, para = None):
+        self.event_seq.push({"type":type, "time":time, "prio":priority, "para":para})
+
+    def scan_event(self):
+        # Cqsim_sim.advance and scan_event for the job events, until the job starts
+        while ((len(self.event_seq) > 0 or len(self.submit_list) > 0) and self.result == None):
+            temp_event = self.event_seq.peek()
+            if (len(self.submit_list) > 0 and (temp_event == None or temp_event['time'] >= self.previous_read_job_time)):
+                # Cqsim_sim.import_submit_events, one job at a time
+                job_index = self.submit_list.pop(0)
+                self.previous_read_job_time = self.module['job'].jobs[job_index]['submit']
+                self.insert_event(1, self.previous_read_job_time, 2, [1, job_index])
+                continue
+            self.current_event = self.event_seq.pop()
+            self.currentTime = self.current_event['time']
+            if (self.batch_events):
+                self.event_job_batch(self.current_event['para'])
+            else:
+                self.event_job(self.current_event['para'])
+        return
+
+    def submit(self, job_index):
+        self.module['job'].job_submit(job_index)
+
+    def finish(self, job_index):
+        self.module['node'].node_release(job_index, self.currentTime)
+
+    def start(self, job_index):
+        self.allocate(job_index)
+        self.module['job'].job_start(job_index, self.currentTime)
+        temp_job = self.module['job'].jobs[job_index]
+        self.insert_event(1, self.currentTime + temp_job['run'], 1, [2, job_index])
+        if (temp_job['id'] == self.watch_id):
+            temp_end = self.currentTime + temp_job['run']
+            self.result = {'start':self.currentTime, 'end':temp_end, 'turnaround':temp_end - temp_job['submit']}
+        return
+
+    def sys_collect(self):
+        return
+
+    def interface(self):
+        return
+
+    def insert_event_monitor(self, start, end):
+        return
@@ -0,0 +1,164 @@
+from bisect import bisect_right
+import numpy as np
+
+__metaclass__ = type
+
+class Wait_index:
+    """
+    Keeps the wait queue in score order without re-sorting it on every event.
+
+    - The wait list is kept in the order a stable sort on descending score gives: a job goes
+      after every job with a score not smaller than its own, and equal scores keep the old order.
+    - The jobs appended by Job_trace.job_submit since the last refresh are tracked, they sit
+      behind the part of the wait list already in order and are merged in with a binary search.
+      Removing a job keeps the rest in order.
+    - The score form comes from Basic_algorithm.wait_form:
+        'fixed'  : a*w+c with constant a >= 0 and c (e.g. the default w+2). The relative order of the
+                   waiting jobs never changes, only arrivals are merged.
+        'linear' : a*w+b where a and b depend on the job. For each pair of neighbours the time at
+                   which their order may change is computed, and the order is only checked again
+                   once the earliest of these crossing times has passed.
+        None     : the score cannot be analysed, the whole list is sorted on every refresh.
+    - w is truncated to whole seconds, the crossing times use a bound of the truncated score so
+      they are never later than the real crossing.
+    """
+    def __init__(self):
+        self.myInfo = "Wait Index"
+        self.reset()
+
+    def reset(self):
+        self.pending = set()
+        self.all_pending = False
+        self.next_check = None
+        self.resort_num = 0
+        self.check_num = 0
+
+    def copy(self):
+        """
+        Returns a copy of the index, for a copy of the wait list.
+        """
+        temp_index = Wait_index()
+        temp_index.pending = set(self.pending)
+        temp_index.all_pending = self.all_pending
+        temp_index.next_check = self.next_check
+        temp_index.resort_num = self.resort_num
+        temp_index.check_num = self.check_num
+        return temp_index
+
+    def job_added(self, job_index):
+        self.pending.add(job_index)
+
+    def job_removed(self, job_index):
+        self.pending.discard(job_index)
+        # the removed job leaves a new pair of neighbours
+        self.next_check = None
+
+    def invalidate(self):
+        # the whole list is merged again on the next refresh
+        self.all_pending = True
+        self.next_check = None
+
+    def rank(self, wait_list, score, time=None, form=None, score_coef=None, columns=None):
+        """
+        Returns wait_list in score order.
+
+        score: the scores of the jobs, in wait_list order
+        time: current time, the crossing times are compared against it
+        form: the score form, see the class description
+        score_coef: function (submit, reqTime, reqProc) -> (a, b), score = a*w+b ('linear' only)
+        columns: (submit, reqTime, reqProc) numpy arrays in wait_list order ('linear' only)
+        """
+        wait_num = len(wait_list)
+        score = np.asarray(score, dtype=float)
+        if (form == 'linear' and (time is None or score_coef is None or columns is None)):
+            form = None
+        if (form != 'fixed' and form != 'linear'):
+            return self.resort(wait_list, score)
+
+        if (self.all_pending):
+            sorted_len = 0
+        else:
+            sorted_len = max(wait_num - len(self.pending), 0)
+        self.pending.clear()
+        self.all_pending = False
+        coef = None
+        if (form == 'linear' and sorted_len > 1):
+            if (self.next_check is None or time >= self.next_check):
+                coef = score_coef(columns[0], columns[1], columns[2])
+                if not self.certify(np.arange(sorted_len), time, coef, columns):
+                    # some neighbours cannot be told apart by the bound, compare the scores
+                    self.check_num += 1
+                    if (np.any(score[1:sorted_len] > score[:sorted_len-1])):
+                        order = np.argsort(-score, kind='stable')
+                        new_list = self.resort(wait_list, score, order)
+                        self.certify(order, time, coef, columns)
+                        return new_list
+
+        if (sorted_len == wait_num):
+            return wait_list
+
+        # merge the new jobs, in arrival order, into the part already in order
+        order = list(range(sorted_len))
+        neg_score = (-score[:sorted_len]).tolist()
+        i = sorted_len
+        while (i < wait_num):
+            pos = bisect_right(neg_score, -score[i])
+            neg_score.insert(pos, -score[i])
+            order.insert(pos, i)
+            i += 1
+        new_list = [wait_list[i] for i in order]
+        if (form == 'linear'):
+            if (coef is None):
+                coef = score_coef(columns[0], columns[1], columns[2])
+            self.certify(np.asarray(order), time, coef, columns)
+        return new_list
+
+    def resort(self, wait_list, score, order=None):
+        self.resort_num += 1
+        if (order is None):
+            order = np.argsort(-score, kind='stable')
+        self.pending.clear()
+        self.all_pending = False
+        self.next_check = None
+        return [wait_list[i] for i in order]
+
+    def certify(self, order, time, coef, columns):
+        """
+        Sets the earliest time at which two neighbours may swap, for the jobs of columns
+        taken in the given order. Returns 1 when every pair of neighbours is in order now,
+        0 when the order has to be checked on the scores (it is then checked on every refresh).
+        """
+        self.next_check = time
+        if (len(order) < 2):
+            self.next_check = float('inf')
+            return 1
+        if (coef is None):
+            return 0
+        submit = columns[0][order]
+        slope = coef[0][order]
+        inter = coef[1][order]
+        # Job i is ahead of job j. With F = floor(time), the truncated wait is F-submit for a
+        # whole second submit time and within 1 of it otherwise, so
+        #   score_i-score_j >= (a_i-a_j)*(F-submit_i) + K
+        # K holds the terms that do not change with time.
+        elapse = np.floor(time) - submit[:-1]
+        frac = (submit != np.floor(submit))
+        a_i = slope[:-1]
+        a_j = slope[1:]
+        gap = submit[1:] - submit[:-1]
+        bound_k = a_j*gap + inter[:-1] - inter[1:] - np.abs(a_i)*frac[:-1] - np.abs(a_j)*frac[1:]
+        bound_slope = a_i - a_j
+        tol = 1e-9*(np.abs(bound_slope*elapse) + np.abs(a_j*gap) + np.abs(inter[:-1]) + np.abs(inter[1:]) + 1)
+        margin = bound_slope*elapse + bound_k - tol
+        # Jobs with the same coefficients tie as long as their waits are the same, and the one
+        # submitted first never falls behind when the score does not decrease with w.
+        same = (a_i == a_j) & (inter[:-1] == inter[1:]) & ((gap == 0) | ((gap > 0) & (a_i >= 0)))
+        if (np.any((margin < 0) & ~same)):
+            return 0
+        falling = (bound_slope < 0) & ~same
+        if (np.any(falling)):
+            self.next_check = float(np.min(submit[:-1][falling]\
+             + (tol[falling] - bound_k[falling])/bound_slope[falling]))
+        else:
+            self.next_check = float('inf')
+        return 1
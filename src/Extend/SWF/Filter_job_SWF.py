@@ -1,12 +1,21 @@
 from datetime import datetime
 import time
 import re
+import numpy as np
 import pandas as pd
 
 import Filter.Filter_job as filter_job
 
 __metaclass__ = type
 
+# Fields of an SWF job line, in line order, and their type in the formatted trace.
+SWF_FIELDS = [('id', int), ('submit', float), ('wait', float), ('run', float), ('usedProc', int),\
+ ('usedAveCPU', float), ('usedMem', float), ('reqProc', int), ('reqTime', float), ('reqMem', float),\
+ ('status', int), ('userID', int), ('groupID', int), ('num_exe', int), ('num_queue', int),\
+ ('num_part', int), ('num_pre', int), ('thinkTime', int)]
+# Size hint in bytes of the blocks of lines read from the SWF trace.
+SWF_CHUNK_BYTES = 1 << 20
+
 class Filter_job_SWF(filter_job.Filter_job):
 
     def __init__(self, trace, save=None, config=None, sdate=None, start=-1, density=1, anchor=0, rnum=0, debug=None):
@@ -55,509 +64,214 @@ class Filter_job_SWF(filter_job.Filter_job):
             print("Save file not set!")
             return
         
-        sep_sign = ";"
         f2=open(self.save,"w")
-
-        nr_sign =';'    # Not read sign. Mark the line not the job data
-        sept_sign =' '   # The sign seperate data in a line
-        
-        jobFile = open(self.trace,'r')
-        min_sub = -1
         temp_readNum=0
-        temp_start=0
-        #job_num = 0
-        while (temp_readNum<=mask_max_i):
-            #print temp_readNum,")(",temp_start
-            tempStr = jobFile.readline()
-            if not tempStr :    # break when no more line
-                break
-            if tempStr[0] != nr_sign:   # The job trace line
-                if (temp_start>=self.anchor):
-                    strNum = len(tempStr)
-                    newWord = 1
-                    k = 0
-                    ID = ""     # 1
-                    submit = ""    # 2
-                    wait = ""    # 3
-                    run = ""    # 4
-                    usedProc = ""    # 5
-                    usedAveCPU = ""    # 6
-                    usedMem = ""    # 7
-                    reqProc = ""    # 8
-                    reqTime = ""    # 9
-                    reqMem = ""    # 10
-                    status = ""    # 11
-                    userID = ""    # 12
-                    groupID = ""    # 13
-                    num_exe = ""    # 14
-                    num_queue = ""    # 15
-                    num_part = ""    # 16
-                    num_pre = ""    # 17
-                    thinkTime = ""    # 18
-                    
-                    for i in range(strNum):
-                        if (tempStr[i] == '\n'):
-                            break
-                        if (tempStr[i] == sept_sign):
-                            if (newWord == 0):
-                                newWord = 1
-                                k = k+1
-                        else:
-                            newWord = 0
-                            if k == 0:
-                                ID=ID+ tempStr[i] 
-                            elif k == 1:
-                                submit = submit + tempStr[i] 
-                            elif k == 2:
-                                wait = wait + tempStr[i] 
-                            elif k == 3:
-                                run = run + tempStr[i] 
-                            elif k == 4:
-                                usedProc = usedProc + tempStr[i] 
-                            elif k == 5:
-                                usedAveCPU = usedAveCPU + tempStr[i] 
-                            elif k == 6:
-                                usedMem = usedMem + tempStr[i] 
-                            elif k == 7:
-                                reqProc = reqProc + tempStr[i] 
-                            elif k == 8:
-                                reqTime = reqTime + tempStr[i] 
-                            elif k == 9:
-                                reqMem = reqMem + tempStr[i] 
-                            elif k == 10:
-                                status = status + tempStr[i] 
-                            elif k == 11:
-                                userID = userID + tempStr[i] 
-                            elif k == 12:
-                                groupID = groupID + tempStr[i] 
-                            elif k == 13:
-                                num_exe = num_exe + tempStr[i] 
-                            elif k == 14:
-                                num_queue = num_queue + tempStr[i] 
-                            elif k == 15:
-                                num_part = num_part + tempStr[i] 
-                            elif k == 16:
-                                num_pre = num_pre + tempStr[i] 
-                            elif k == 17:
-                                thinkTime = thinkTime + tempStr[i] 
-                            
-                    if (min_sub<0):
-                        min_sub=float(submit)
-                        if (self.start < 0):
-                            self.start = min_sub
-                        for con_data in self.config_data:
-                            if not con_data['name'] and con_data['name_config'] == 'start_offset':
-                                con_data['value'] = min_sub-self.start
-                                break
-                            
-                    tempInfo = {'id':int(ID),\
-                                'submit':self.density*(float(submit)-min_sub)+self.start,\
-                                'wait':float(wait),\
-                                'run':float(run)*speed,\
-                                'usedProc':int(usedProc),\
-                                'usedAveCPU':float(usedAveCPU),\
-                                'usedMem':float(usedMem),\
-                                'reqProc':int(reqProc),\
-                                'reqTime':float(reqTime),\
-                                'reqMem':float(reqMem),\
-                                'status':int(status),\
-                                'userID':int(userID),\
-                                'groupID':int(groupID),\
-                                'num_exe':int(num_exe),\
-                                'num_queue':int(num_queue),\
-                                'num_part':int(num_part),\
-                                'num_pre':int(num_pre),\
-                                'thinkTime':int(thinkTime),\
-                                'start':-1,\
-                                'end':-1,\
-                                'score':0,\
-                                'state':0,\
-                                'happy':-1,\
-                                'estStart':-1}
-                    # state: 0: not submit  1: waiting  2: running  3: done
-                                        
-                    if (self.input_check(tempInfo)>=0):
-
-                        # Only write if the the mask set
-                        if mask[temp_readNum] == 1:
-                            f2.write(str(tempInfo['id']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['submit']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['wait']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['run']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['usedProc']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['usedAveCPU']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['usedMem']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['reqProc']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['reqTime']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['reqMem']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['status']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['userID']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['groupID']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['num_exe']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['num_queue']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['num_part']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['num_pre']))
-                            f2.write(sep_sign)
-                            f2.write(str(tempInfo['thinkTime']))
-                            f2.write("\n")
-                        #self.jobList.append(tempInfo)
-                        temp_readNum+=1
-                        #job_num += 1
-                temp_start += 1
-            else:
-                for con_data in self.config_data:
-                    if con_data['name']:
-                        con_ex = con_data['name']+self.config_equal+"([^"+self.config_sep+"]*)"+self.config_sep
-                        temp_con_List=re.findall(con_ex,tempStr)
-                        if (len(temp_con_List)>=1):
-                            con_data['value'] = temp_con_List[0]
-                            break
-                    
-                
-        jobFile.close()
+        if (mask_max_i >= 0):
+            for block in self.swf_blocks(mask_max_i+1, speed):
+                temp_num = len(block['id'])
+                # Only write if the the mask set
+                temp_sel = (np.asarray(mask[temp_readNum:temp_readNum+temp_num]) == 1)
+                f2.write(self.format_jobs(block, temp_sel))
+                temp_readNum += temp_num
         f2.close()
         self.jobNum = temp_readNum
 
-    def feed_job_trace(self):
+    def feed_job_trace(self, blocks=None):
         if not self.save:
             print("Save file not set!")
             return
         
-        sep_sign = ";"
         f2=open(self.save,"w")
-
-        nr_sign =''    # Not read sign. Mark the line not the job data
-        sept_sign =' '   # The sign seperate data in a line
-        
-        jobFile = open(self.trace,'r')
-        min_sub = -1
-        temp_readNum=0
-        temp_start=0
-        #job_num = 0
         count = 0
-        while (temp_readNum<self.rnum or self.rnum<=0):
-            #print temp_readNum,")(",temp_start
-            tempStr = jobFile.readline()
-            if not tempStr :    # break when no more line
-                break
-            if tempStr[0] != nr_sign:   # The job trace line
-                if (temp_start>=self.anchor):
-                    strNum = len(tempStr)
-                    newWord = 1
-                    k = 0
-                    ID = ""     # 1
-                    submit = ""    # 2
-                    wait = ""    # 3
-                    run = ""    # 4
-                    usedProc = ""    # 5
-                    usedAveCPU = ""    # 6
-                    usedMem = ""    # 7
-                    reqProc = ""    # 8
-                    reqTime = ""    # 9
-                    reqMem = ""    # 10
-                    status = ""    # 11
-                    userID = ""    # 12
-                    groupID = ""    # 13
-                    num_exe = ""    # 14
-                    num_queue = ""    # 15
-                    num_part = ""    # 16
-                    num_pre = ""    # 17
-                    thinkTime = ""    # 18
-                    
-                    for i in range(strNum):
-                        if (tempStr[i] == '\n'):
-                            break
-                        if (tempStr[i] == sept_sign):
-                            if (newWord == 0):
-                                newWord = 1
-                                k = k+1
-                        else:
-                            newWord = 0
-                            if k == 0:
-                                ID=ID+ tempStr[i] 
-                            elif k == 1:
-                                submit = submit + tempStr[i] 
-                            elif k == 2:
-                                wait = wait + tempStr[i] 
-                            elif k == 3:
-                                run = run + tempStr[i] 
-                            elif k == 4:
-                                usedProc = usedProc + tempStr[i] 
-                            elif k == 5:
-                                usedAveCPU = usedAveCPU + tempStr[i] 
-                            elif k == 6:
-                                usedMem = usedMem + tempStr[i] 
-                            elif k == 7:
-                                reqProc = reqProc + tempStr[i] 
-                            elif k == 8:
-                                reqTime = reqTime + tempStr[i] 
-                            elif k == 9:
-                                reqMem = reqMem + tempStr[i] 
-                            elif k == 10:
-                                status = status + tempStr[i] 
-                            elif k == 11:
-                                userID = userID + tempStr[i] 
-                            elif k == 12:
-                                groupID = groupID + tempStr[i] 
-                            elif k == 13:
-                                num_exe = num_exe + tempStr[i] 
-                            elif k == 14:
-                                num_queue = num_queue + tempStr[i] 
-                            elif k == 15:
-                                num_part = num_part + tempStr[i] 
-                            elif k == 16:
-                                num_pre = num_pre + tempStr[i] 
-                            elif k == 17:
-                                thinkTime = thinkTime + tempStr[i] 
-                            
-                    if (min_sub<0):
-                        min_sub=float(submit)
-                        if (self.start < 0):
-                            self.start = min_sub
-                        for con_data in self.config_data:
-                            if not con_data['name'] and con_data['name_config'] == 'start_offset':
-                                con_data['value'] = min_sub-self.start
-                                break
-                            
-                    tempInfo = {'id':int(ID),\
-                                'submit':self.density*(float(submit)-min_sub)+self.start,\
-                                'wait':float(wait),\
-                                'run':float(run),\
-                                'usedProc':int(usedProc),\
-                                'usedAveCPU':float(usedAveCPU),\
-                                'usedMem':float(usedMem),\
-                                'reqProc':int(reqProc),\
-                                'reqTime':float(reqTime),\
-                                'reqMem':float(reqMem),\
-                                'status':int(status),\
-                                'userID':int(userID),\
-                                'groupID':int(groupID),\
-                                'num_exe':int(num_exe),\
-                                'num_queue':int(num_queue),\
-                                'num_part':int(num_part),\
-                                'num_pre':int(num_pre),\
-                                'thinkTime':int(thinkTime),\
-                                'start':-1,\
-                                'end':-1,\
-                                'score':0,\
-                                'state':0,\
-                                'happy':-1,\
-                                'estStart':-1}
-                    # state: 0: not submit  1: waiting  2: running  3: done
-                                        
-                    if (self.input_check(tempInfo)>=0):
-                        f2.write(str(tempInfo['id']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['submit']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['wait']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['run']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['usedProc']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['usedAveCPU']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['usedMem']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['reqProc']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['reqTime']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['reqMem']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['status']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['userID']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['groupID']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['num_exe']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['num_queue']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['num_part']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['num_pre']))
-                        f2.write(sep_sign)
-                        f2.write(str(tempInfo['thinkTime']))
-                        f2.write("\n")
-                        self.job_ids.append(tempInfo['id'])
-                        self.job_procs.append(tempInfo['usedProc'])
-                        self.job_submits.append(tempInfo['submit'])
-                        self.cluster_ids.append(tempInfo['userID'])
-                        self.gpu_req.append(tempInfo['num_queue'])
-                        #self.jobList.append(tempInfo)
-                        temp_readNum+=1
-                        count += 1
-                        #job_num += 1
-                temp_start += 1
-            else:
-                for con_data in self.config_data:
-                    if con_data['name']:
-                        con_ex = con_data['name']+self.config_equal+"([^"+self.config_sep+"]*)"+self.config_sep
-                        temp_con_List=re.findall(con_ex,tempStr)
-                        if (len(temp_con_List)>=1):
-                            con_data['value'] = temp_con_List[0]
-                            break
-                    
-                
-        jobFile.close()
+        for block in self.swf_blocks(self.rnum):
+            f2.write(self.format_jobs(block))
+            if blocks != None:
+                blocks.append(block)
+            self.job_ids.extend(block['id'].tolist())
+            self.job_procs.extend(block['usedProc'].tolist())
+            self.job_submits.extend(block['submit'].tolist())
+            self.cluster_ids.extend(block['userID'].tolist())
+            self.gpu_req.extend(block['num_queue'].tolist())
+            count += len(block['id'])
         f2.close()
-        self.jobNum = temp_readNum
+        self.jobNum = count
         return count
         #self.jobNum = len(self.jobList)
     
+    def feed_job_trace_cached(self, cache):
+        """
+        feed_job_trace through a Trace_cache.
+
+        On a hit the trace is not read and the formatted trace file is not written: the jobs,
+        the config values and the job_ids / job_procs / ... lists come from the cache entry.
+        On a miss the trace is fed as usual and the jobs are added to the cache.
+
+        Returns:
+            dict: The columns of the jobs kept (memory mapped numpy arrays), see Job_trace job_cache.
+        """
+        params = {'start':self.start, 'density':self.density, 'anchor':self.anchor, 'rnum':self.rnum}
+        entry = cache.lookup(self.trace, params)
+        if entry == None:
+            blocks = []
+            self.feed_job_trace(blocks)
+            columns = {}
+            for name, dtype in SWF_FIELDS:
+                if blocks:
+                    columns[name] = np.concatenate([block[name] for block in blocks])
+                else:
+                    columns[name] = np.zeros(0, dtype=np.int64 if dtype == int else float)
+            config = {'start':self.start}
+            for con_data in self.config_data:
+                config[con_data['name_config']] = con_data['value']
+            entry = cache.store(self.trace, params, columns, config)
+            columns, meta = cache.load(entry)
+            return columns
+
+        columns, meta = cache.load(entry)
+        self.start = meta['config']['start']
+        for con_data in self.config_data:
+            con_data['value'] = meta['config'].get(con_data['name_config'], con_data['value'])
+        self.job_ids = columns['id'].tolist()
+        self.job_procs = columns['usedProc'].tolist()
+        self.job_submits = columns['submit'].tolist()
+        self.cluster_ids = columns['userID'].tolist()
+        self.gpu_req = columns['num_queue'].tolist()
+        self.jobNum = len(self.job_ids)
+        return columns
+
     def read_job_trace(self):
+        temp_names = [name for name, dtype in SWF_FIELDS]
+        for block in self.swf_blocks(self.rnum):
+            temp_cols = [block[name].tolist() for name in temp_names]
+            for temp_row in zip(*temp_cols):
+                tempInfo = dict(zip(temp_names, temp_row))
+                tempInfo.update({'start':-1, 'end':-1, 'score':0, 'state':0, 'happy':-1, 'estStart':-1})
+                # state: 0: not submit  1: waiting  2: running  3: done
+                self.jobList.append(tempInfo)
+        self.jobNum = len(self.jobList)
+
+    def swf_blocks(self, rnum, speed=1):
+        """
+        Reads the SWF trace in blocks of about SWF_CHUNK_BYTES bytes of lines.
+
+        - Lines starting with ';' are header lines, the fields of config_data are read from them.
+        - The first anchor job lines are skipped. The submit time of the first job line read
+          sets start_offset, the submit times are moved by it and scaled by density.
+        - The runtimes are scaled by speed and the jobs are filtered with input_check_columns.
+        - At most rnum jobs are returned, all of them when rnum <= 0.
+
+        Yields a dict of numpy arrays, one per field of SWF_FIELDS, for the jobs kept in a block.
+        """
         nr_sign =';'    # Not read sign. Mark the line not the job data
-        sep_sign =' '   # The sign seperate data in a line
-        
-        jobFile = open(self.trace,'r')
+        if (rnum <= 0):
+            rnum = -1
         min_sub = -1
         temp_readNum=0
         temp_start=0
-        while (temp_readNum<self.rnum or self.rnum<=0):
-            #print temp_readNum,")(",temp_start
-            tempStr = jobFile.readline()
-            if not tempStr :    # break when no more line
+        jobFile = open(self.trace,'r')
+        while (temp_readNum<rnum or rnum<0):
+            lines = jobFile.readlines(SWF_CHUNK_BYTES)
+            if not lines:    # break when no more line
                 break
-            if tempStr[0] != nr_sign:   # The job trace line
-                if (temp_start>=self.anchor):
-                    strNum = len(tempStr)
-                    newWord = 1
-                    k = 0
-                    ID = ""     # 1
-                    submit = ""    # 2
-                    wait = ""    # 3
-                    run = ""    # 4
-                    usedProc = ""    # 5
-                    usedAveCPU = ""    # 6
-                    usedMem = ""    # 7
-                    reqProc = ""    # 8
-                    reqTime = ""    # 9
-                    reqMem = ""    # 10
-                    status = ""    # 11
-                    userID = ""    # 12
-                    groupID = ""    # 13
-                    num_exe = ""    # 14
-                    num_queue = ""    # 15
-                    num_part = ""    # 16
-                    num_pre = ""    # 17
-                    thinkTime = ""    # 18
-                    
-                    for i in range(strNum):
-                        if (tempStr[i] == '\n'):
-                            break
-                        if (tempStr[i] == sep_sign):
-                            if (newWord == 0):
-                                newWord = 1
-                                k = k+1
-                        else:
-                            newWord = 0
-                            if k == 0:
-                                ID=ID+ tempStr[i] 
-                            elif k == 1:
-                                submit = submit + tempStr[i] 
-                            elif k == 2:
-                                wait = wait + tempStr[i] 
-                            elif k == 3:
-                                run = run + tempStr[i] 
-                            elif k == 4:
-                                usedProc = usedProc + tempStr[i] 
-                            elif k == 5:
-                                usedAveCPU = usedAveCPU + tempStr[i] 
-                            elif k == 6:
-                                usedMem = usedMem + tempStr[i] 
-                            elif k == 7:
-                                reqProc = reqProc + tempStr[i] 
-                            elif k == 8:
-                                reqTime = reqTime + tempStr[i] 
-                            elif k == 9:
-                                reqMem = reqMem + tempStr[i] 
-                            elif k == 10:
-                                status = status + tempStr[i] 
-                            elif k == 11:
-                                userID = userID + tempStr[i] 
-                            elif k == 12:
-                                groupID = groupID + tempStr[i] 
-                            elif k == 13:
-                                num_exe = num_exe + tempStr[i] 
-                            elif k == 14:
-                                num_queue = num_queue + tempStr[i] 
-                            elif k == 15:
-                                num_part = num_part + tempStr[i] 
-                            elif k == 16:
-                                num_pre = num_pre + tempStr[i] 
-                            elif k == 17:
-                                thinkTime = thinkTime + tempStr[i] 
-                            
-                    if (min_sub<0):
-                        min_sub=float(submit)
-                        if (self.start < 0):
-                            self.start = min_sub
-                        for con_data in self.config_data:
-                            if not con_data['name'] and con_data['name_config'] == 'start_offset':
-                                con_data['value'] = min_sub-self.start
-                                break
-                            
-                    tempInfo = {'id':int(ID),\
-                                'submit':self.density*(float(submit)-min_sub)+self.start,\
-                                'wait':float(wait),\
-                                'run':float(run),\
-                                'usedProc':int(usedProc),\
-                                'usedAveCPU':float(usedAveCPU),\
-                                'usedMem':float(usedMem),\
-                                'reqProc':int(reqProc),\
-                                'reqTime':float(reqTime),\
-                                'reqMem':float(reqMem),\
-                                'status':int(status),\
-                                'userID':int(userID),\
-                                'groupID':int(groupID),\
-                                'num_exe':int(num_exe),\
-                                'num_queue':int(num_queue),\
-                                'num_part':int(num_part),\
-                                'num_pre':int(num_pre),\
-                                'thinkTime':int(thinkTime),\
-                                'start':-1,\
-                                'end':-1,\
-                                'score':0,\
-                                'state':0,\
-                                'happy':-1,\
-                                'estStart':-1}
-                    # state: 0: not submit  1: waiting  2: running  3: done
-                                        
-                    if (self.input_check(tempInfo)>=0):
-                        self.jobList.append(tempInfo)
-                        temp_readNum+=1
-                temp_start += 1
-            else:
+            # line index of the job lines past the anchor, and of the header lines
+            job_pos = []
+            con_pos = []
+            i = 0
+            while (i < len(lines)):
+                tempStr = lines[i]
+                if (tempStr[0] == nr_sign):
+                    con_pos.append(i)
+                elif tempStr.strip():
+                    if (temp_start>=self.anchor):
+                        job_pos.append(i)
+                    temp_start += 1
+                i += 1
+            if not job_pos:
+                for i in con_pos:
+                    self.read_config_line(lines[i])
+                continue
+
+            data = self.parse_swf_lines([lines[i] for i in job_pos])
+            # min_sub: submit time of the first job line (of the first one not negative)
+            temp_min = np.empty(len(job_pos))
+            temp_base = np.empty(len(job_pos))
+            i = 0
+            while (min_sub<0 and i < len(job_pos)):
+                min_sub=float(data[i, 1])
+                if (self.start < 0):
+                    self.start = min_sub
                 for con_data in self.config_data:
-                    if con_data['name']:
-                        con_ex = con_data['name']+self.config_equal+"([^"+self.config_sep+"]*)"+self.config_sep
-                        temp_con_List=re.findall(con_ex,tempStr)
-                        if (len(temp_con_List)>=1):
-                            con_data['value'] = temp_con_List[0]
-                            break
-                    
-                
+                    if not con_data['name'] and con_data['name_config'] == 'start_offset':
+                        con_data['value'] = min_sub-self.start
+                        break
+                temp_min[i] = min_sub
+                temp_base[i] = self.start
+                i += 1
+            temp_min[i:] = min_sub
+            temp_base[i:] = self.start
+
+            block = {}
+            k = 0
+            while (k < len(SWF_FIELDS)):
+                name, dtype = SWF_FIELDS[k]
+                if (dtype == int):
+                    block[name] = data[:, k].astype(np.int64)
+                else:
+                    block[name] = data[:, k]
+                k += 1
+            block['submit'] = self.density*(block['submit']-temp_min)+temp_base
+            block['run'] = block['run']*speed
+            temp_sel = self.input_check_columns(block)
+
+            temp_last = len(lines)
+            temp_valid = np.flatnonzero(temp_sel)
+            if (rnum>0 and temp_readNum+len(temp_valid) >= rnum):
+                # the last job is in this block, the lines after it are not read
+                temp_valid = temp_valid[:rnum-temp_readNum]
+                temp_last = job_pos[temp_valid[-1]]
+            for i in con_pos:
+                if (i < temp_last):
+                    self.read_config_line(lines[i])
+            temp_readNum += len(temp_valid)
+            for name in block:
+                block[name] = block[name][temp_valid]
+            yield block
         jobFile.close()
-        self.jobNum = len(self.jobList)
+
+    def parse_swf_lines(self, lines):
+        """
+        Returns the first 18 fields of the SWF job lines as an array of floats, one row per line.
+        """
+        try:
+            return np.loadtxt(lines, usecols=range(len(SWF_FIELDS)), comments=None, ndmin=2, dtype=float)
+        except ValueError:
+            # report the malformed line
+            return np.array([[float(x) for x in line.split()[:len(SWF_FIELDS)]] for line in lines], dtype=float)
+
+    def read_config_line(self, tempStr):
+        for con_data in self.config_data:
+            if con_data['name']:
+                con_ex = con_data['name']+self.config_equal+"([^"+self.config_sep+"]*)"+self.config_sep
+                temp_con_List=re.findall(con_ex,tempStr)
+                if (len(temp_con_List)>=1):
+                    con_data['value'] = temp_con_List[0]
+                    break
+
+    def format_jobs(self, block, sel=None):
+        """
+        Returns the jobs of a block as lines of the formatted trace.
+        """
+        sep_sign = ";"
+        temp_cols = []
+        for name, dtype in SWF_FIELDS:
+            temp_col = block[name]
+            if sel is not None:
+                temp_col = temp_col[sel]
+            temp_cols.append(map(str, temp_col.tolist()))
+        temp_lines = [sep_sign.join(temp_row) for temp_row in zip(*temp_cols)]
+        if not temp_lines:
+            return ''
+        return '\n'.join(temp_lines)+'\n'
     
     def input_check(self,jobInfo):
         if (int(jobInfo['run'])>int(jobInfo['reqTime'])):
@@ -574,6 +288,16 @@ class Filter_job_SWF(filter_job.Filter_job):
             return -6
         return 1
 
+    def input_check_columns(self,jobs):
+        """
+        input_check for the columns of a block of jobs. Caps the runtimes in place and
+        returns the boolean array of the jobs kept.
+        """
+        temp_over = (np.trunc(jobs['run']) > np.trunc(jobs['reqTime']))
+        jobs['run'] = np.where(temp_over, jobs['reqTime'], jobs['run'])
+        return (jobs['id'] > 0) & (np.trunc(jobs['submit']) >= 0) & (np.trunc(jobs['run']) > 0)\
+         & (np.trunc(jobs['reqTime']) > 0) & (jobs['reqProc'] > 0)
+
     def output_job_data(self):
         if not self.save:
             print("Save file not set!")
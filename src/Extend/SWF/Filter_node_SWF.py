@@ -12,6 +12,15 @@ class Filter_node_SWF(filter_node.Filter_node):
         self.config_data.append({'name_config':'MaxProcs','name':'MaxProcs','value':''})
         
     def read_node_struc(self):
+        node_info = self.read_node_info()
+        self.node_data_build(node_info)
+        self.nodeNum = len(self.nodeList)
+
+    def read_node_info(self):
+        """
+        Reads MaxNodes and MaxProcs from the header of the SWF trace.
+        Returns {'node': MaxNodes, 'proc': MaxProcs}, a field is missing when the header does not give it.
+        """
         nr_sign =';'    # Not read sign. Mark the line not the job data
         sep_sign =' '   # The sign seperate data in a line
         sep_sign2 =':'   # The sign seperate data in a line
@@ -45,8 +54,7 @@ class Filter_node_SWF(filter_node.Filter_node):
             else:
                 break
         nodeFile.close()
-        self.node_data_build(node_info)
-        self.nodeNum = len(self.nodeList)
+        return node_info
     
     def static_node_struc(self, num_proc):
         nr_sign =';'    # Not read sign. Mark the line not the job data
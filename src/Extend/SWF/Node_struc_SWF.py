@@ -1,12 +1,72 @@
 from datetime import datetime
 import time
 import re
+import copy
 
 import CqSim.Node_struc as Class_Node_struc
+import CqSim.Avail_profile as Class_Avail_profile
 
 __metaclass__ = type
 
 class Node_struc_SWF(Class_Node_struc.Node_struc):        
+    """
+    Node structure of the SWF traces, only the processor counts are tracked.
+
+    - predict_node is the availability profile (Avail_profile), the points {'time', 'idle', 'avail'}:
+      the first point is the current time (time of the last pre_reset) with the idle processors,
+      then one point per end time of the running jobs with the processors idle from that time.
+      It is kept up to date by node_allocate and node_release, pre_reset does not rebuild it.
+    - A job running past its end (its run longer than its walltime) keeps its processors until
+      it is released, it is expected to end at any time: pre_reset moves the points before the
+      current time to it, merged in one point after the first one. The times stay in order.
+    - The reservations of a scheduling pass (reserve) go on an overlay of predict_node started
+      by pre_reset. pre_discard drops it, it is called by pre_reset and before node_allocate
+      or node_release change the profile.
+    - pre_push / pre_pop nest an overlay in it, pre_pop drops the reservations made since the
+      matching pre_push.
+    """
+    def __init__(self, debug=None):
+        Class_Node_struc.Node_struc.__init__(self, debug)
+        self.predict_node = Class_Avail_profile.Avail_profile()
+        
+    def reset(self, debug=None):
+        Class_Node_struc.Node_struc.reset(self, debug)
+        self.predict_node = Class_Avail_profile.Avail_profile()
+        self.predict_job = []
+        self.predict_save = []
+
+    def clone(self):
+        #self.debug.debug("* "+self.myInfo+" -- clone",5)
+        temp_struc = copy.copy(self)
+        temp_struc.job_list = self.job_list.copy()
+        # the profile of the running jobs, without the reservations of the current pass
+        temp_struc.predict_node = self.predict_node.copy()
+        temp_struc.predict_job = []
+        temp_struc.predict_save = []
+        return temp_struc
+
+    @classmethod
+    def from_proc_count(cls, proc_count, debug):
+        """
+        Returns a node structure of proc_count processors, without node file (see import_proc_count).
+        """
+        node_struc = cls(debug=debug)
+        node_struc.import_proc_count(proc_count)
+        return node_struc
+
+    def import_proc_count(self, proc_count):
+        """
+        Sets up proc_count identical processors, like import_node_file on the node file
+        written by Filter_node_SWF.static_node_struc(proc_count).
+        Only the counts (tot, idle, avail) are used here, the per node list stays empty.
+        """
+        #self.debug.debug("* "+self.myInfo+" -- import_proc_count",5)
+        self.nodeStruc = []
+        self.tot = int(proc_count)
+        self.idle = self.tot
+        self.avail = self.tot
+        self.debug.debug("  Tot:"+str(self.tot)+" Idle:"+str(self.idle)+" Avail:"+str(self.avail)+" ",4)
+        return
         
     def node_allocate(self, proc_num, job_index, start, end):
         #self.debug.debug("* "+self.myInfo+" -- node_allocate",5)
@@ -15,18 +75,8 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         self.idle -= proc_num
         self.avail = self.idle
         temp_job_info = {'job':job_index, 'end': end, 'node': proc_num}
-        j = 0
-        is_done = 0
-        temp_num = len(self.job_list)
-        while (j<temp_num):
-            if (temp_job_info['end']<self.job_list[j]['end']):
-                self.job_list.insert(j,temp_job_info)
-                is_done = 1
-                break
-            j += 1
-            
-        if (is_done == 0):
-            self.job_list.append(temp_job_info)
+        self.job_list.add(temp_job_info)
+        self.profile_allocate(proc_num, end)
         '''
         self.debug.line(2,"...")
         for job in self.job_list:
@@ -45,17 +95,14 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         self.debug.line(2,"...")
         '''
             
-        temp_node = 0
-        j = 0
-        temp_num = len(self.job_list)
-        while (j<temp_num):
-            if (job_index==self.job_list[j]['job']):
-                temp_node = self.job_list[j]['node']
-                break
-            j += 1
+        temp_job_info = self.job_list.remove(job_index)
+        if temp_job_info == None:
+            self.debug.debug("  Release Fail!",4)
+            return 0
+        temp_node = temp_job_info['node']
         self.idle += temp_node
         self.avail = self.idle
-        self.job_list.pop(j)
+        self.profile_release(temp_node, temp_job_info['end'])
         self.debug.debug("  Release"+"["+str(job_index)+"]"+" Req:"+str(temp_node)+" Avail:"+str(self.avail)+" ",4)
         return 1
         
@@ -65,14 +112,9 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         if not end or end < start:
             end = start
              
-        i = 0
-        temp_job_num = len(self.predict_node)
-        while (i < temp_job_num):
-            if (self.predict_node[i]['time']>=start and self.predict_node[i]['time']<end):
-                if (proc_num>self.predict_node[i]['avail']):
-                    return 0
-            i += 1
-        return 1
+        if (self.predict_node.fits(proc_num, start, end)):
+            return 1
+        return 0
         
     def reserve(self, proc_num, job_index, time, start = None, index = -1 ):
         #self.debug.debug("* "+self.myInfo+" -- reserve",5)
@@ -81,51 +123,22 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         if (start):
             if (self.pre_avail(proc_num,start,start+time)==0):
                 return -1
+            i = self.predict_node.bisect(start)
         else:
             i = 0
-            j = 0
             if (index >= 0 and index < temp_max):
                 i = index
             elif(index >= temp_max):
                 return -1
             
-            while (i<temp_max): 
-                if (proc_num<=self.predict_node[i]['avail']):
-                    j = self.find_res_place(proc_num,i,time)
-                    if (j == -1):
-                        start = self.predict_node[i]['time']
-                        break
-                    else:
-                        i = j + 1
-                else:
-                    i += 1
+            # first point with proc_num processors up to its time + time (see find_res_place)
+            i = self.predict_node.earliest_fit(proc_num, i, time)
+            if (i < temp_max):
+                start = self.predict_node.time(i)
 
         end = start + time
-        j = i
-                
-        is_done = 0
-        start_index = j
-        while (j < temp_max):
-            if (self.predict_node[j]['time']<end):
-                self.predict_node[j]['idle'] -= proc_num
-                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
-                j += 1
-            elif (self.predict_node[j]['time']==end):
-                is_done = 1
-                break
-            else:
-                self.predict_node.insert(j,{'time':end,\
-                 'idle':self.predict_node[j-1]['idle'], 'avail':self.predict_node[j-1]['avail']})
-                #self.debug.debug("xx   "+str(proc_num),4)
-                self.predict_node[j]['idle'] += proc_num
-                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
-                is_done = 1
-                
-                #self.debug.debug("xx   "+str(n)+"   "+str(k),4)
-                break
-            
-        if (is_done != 1):
-            self.predict_node.append({'time':end,'idle':self.tot,'avail':self.tot})
+        start_index = i
+        self.predict_node.take(proc_num, i, end, self.tot)
                 
         self.predict_job.append({'job':job_index, 'start':start, 'end':end})
         '''
@@ -161,30 +174,66 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         
     def pre_reset(self, time):
         #self.debug.debug("* "+self.myInfo+" -- pre_reset",5)  
-        self.predict_node = []
+        self.pre_discard()
+        if (len(self.predict_node) == 0):
+            self.profile_build()
+        self.predict_node.set_time(0, time)
+        if (len(self.predict_node) > 1 and self.predict_node.time(1) < time):
+            # ends of the jobs running past them, the last of these points counts all of them
+            i = self.predict_node.bisect(time, 1)
+            if (i == len(self.predict_node) or self.predict_node.time(i) != time):
+                i -= 1
+                self.predict_node.set_time(i, time)
+            while (i > 1):
+                self.predict_node.delete(1)
+                i -= 1
+        self.predict_node.begin()
         self.predict_job = []
-        self.predict_node.append({'time':time, 'idle':self.idle, 'avail':self.avail})
-                            
-                            
-        temp_job_num = len(self.job_list)
+        self.predict_save = []
+        return 1
+        
+    def pre_discard(self):
+        #self.debug.debug("* "+self.myInfo+" -- pre_discard",5)  
+        self.predict_node.discard()
+        return 1
+        
+    def pre_push(self):
+        #self.debug.debug("* "+self.myInfo+" -- pre_push",6)  
+        self.predict_node.begin()
+        self.predict_save.append(len(self.predict_job))
+        return 1
+        
+    def pre_pop(self):
+        #self.debug.debug("* "+self.myInfo+" -- pre_pop",6)  
+        self.predict_node.rollback()
+        del self.predict_job[self.predict_save.pop():]
+        return 1
+        
+    def profile_build(self):
+        #self.debug.debug("* "+self.myInfo+" -- profile_build",5)  
+        self.predict_node = Class_Avail_profile.Avail_profile()
+        self.predict_node.insert(0, 0, self.idle)
         '''
         i = 0
         self.debug.line(2,'==')
+        temp_job_num = len(self.job_list)
         while (i<temp_job_num):
             self.debug.debug("[] "+str(self.job_list[i]),2)
             i += 1
         self.debug.line(2,'==')
         '''
         
+        # one point per end time, the first job always gets its own point
         i = 0
-        j = 0
-        while i< temp_job_num:
-            if (self.predict_node[j]['time']!=self.job_list[i]['end'] or i == 0):
-                self.predict_node.append({'time':self.job_list[i]['end'],\
-                                    'idle':self.predict_node[j]['idle'], 'avail':self.predict_node[j]['avail']})
-                j += 1
-            self.predict_node[j]['idle'] += self.job_list[i]['node']
-            self.predict_node[j]['avail'] = self.predict_node[j]['idle']
+        temp_time = None
+        temp_idle = self.idle
+        for temp_job in self.job_list:
+            temp_idle += temp_job['node']
+            if (temp_time != temp_job['end'] or i == 0):
+                self.predict_node.insert(len(self.predict_node), temp_job['end'], temp_idle)
+                temp_time = temp_job['end']
+            else:
+                self.predict_node.add(len(self.predict_node) - 1, len(self.predict_node), temp_job['node'])
             i += 1
         ''' 
         i = 0
@@ -197,20 +246,42 @@ class Node_struc_SWF(Class_Node_struc.Node_struc):
         '''
         return 1
         
+    def profile_allocate(self, proc_num, end):
+        #self.debug.debug("* "+self.myInfo+" -- profile_allocate",5)  
+        if (len(self.predict_node) == 0):
+            return 1
+        self.pre_discard()
+        # proc_num processors less until end, the first point (the last pre_reset) is not after
+        # the start of the job
+        i = self.predict_node.bisect(end, 1)
+        self.predict_node.add(0, i, -proc_num)
+        if (i == len(self.predict_node) or self.predict_node.time(i) != end):
+            self.predict_node.insert(i, end, self.predict_node.avail(i-1) + proc_num)
+        return 1
+        
+    def profile_release(self, proc_num, end):
+        #self.debug.debug("* "+self.myInfo+" -- profile_release",5)  
+        if (len(self.predict_node) == 0):
+            return 1
+        self.pre_discard()
+        i = self.predict_node.bisect(end, 1)
+        self.predict_node.add(0, i, proc_num)
+        # the point of end goes with the last job ending then, it stays while it counts jobs
+        # running past their end (moved to it by pre_reset)
+        if (i < len(self.predict_node) and self.predict_node.time(i) == end and not self.job_list.has_end(end)\
+         and self.predict_node.avail(i) == self.predict_node.avail(i-1)):
+            self.predict_node.delete(i)
+        return 1
+        
     
     def find_res_place(self, proc_num, index, time):
         #self.debug.debug("* "+self.myInfo+" -- find_res_place",5)  
         if index>=len(self.predict_node):
             index = len(self.predict_node) - 1
              
-        i = index
-        end = self.predict_node[index]['time']+time
-        temp_node_num = len(self.predict_node)
-        
-        while (i < temp_node_num):
-            if (self.predict_node[i]['time']<end):
-                if (proc_num>self.predict_node[i]['avail']):
-                    #print "xxxxx   ",temp_node_num,proc_num,self.predict_node[i]
-                    return i
-            i += 1
-        return -1
\ No newline at end of file
+        end = self.predict_node.time(index)+time
+        i = self.predict_node.first_short(proc_num, index, end)
+        if (i < len(self.predict_node)):
+            #print "xxxxx   ",len(self.predict_node),proc_num,self.predict_node[i]
+            return i
+        return -1
@@ -1,3 +1,4 @@
+import copy
 import IOModule.Log_print as Log_print
 
 __metaclass__ = type
@@ -17,6 +18,18 @@ class Debug_log:
     def disable(self):
         self.debugFile.disable()
 
+    def log_files(self):
+        return [self.debugFile]
+
+    def clone(self):
+        # silent copy, for a copy of the simulator (Cqsim_sim.clone)
+        temp_log = copy.copy(self)
+        temp_log.debugFile = copy.copy(self.debugFile)
+        temp_log.debugFile.disable()
+        temp_log.debug_log_buf = []
+        temp_log.lvl = -1
+        return temp_log
+
     def reset(self, lvl=None, path=None, log_freq = 1):
         if lvl:
             self.lvl = lvl
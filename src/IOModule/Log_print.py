@@ -11,6 +11,12 @@ class Log_print:
         self.logFile=None
         self.disabled = False
     
+    def __getstate__(self):
+        # the file is only open during a write, the closed file object is not kept
+        temp_state = dict(self.__dict__)
+        temp_state['logFile'] = None
+        return temp_state
+    
     def reset(self, filePath=None, mode=None):
         if self.disabled:
             return
@@ -42,6 +48,19 @@ class Log_print:
     def disable(self):
         self.disabled = True
 
+    def file_size(self):
+        # size of the file written so far (Checkpoint), -1 when it is not written
+        if self.disabled or not os.path.exists(self.filePath):
+            return -1
+        return os.path.getsize(self.filePath)
+
+    def file_truncate(self, size):
+        # cuts the file back to size, the lines written after a checkpoint (Checkpoint)
+        if self.disabled or size < 0 or not os.path.exists(self.filePath):
+            return
+        with open(self.filePath, 'r+') as temp_file:
+            temp_file.truncate(size)
+
     
             
         
\ No newline at end of file
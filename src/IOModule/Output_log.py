@@ -1,3 +1,4 @@
+import copy
 import pandas as pd
 import IOModule.Log_print as Log_print
 
@@ -30,6 +31,22 @@ class Output_log:
         self.adapt_info.disable()
         self.job_result.disable()
     
+    def log_files(self):
+        return [self.sys_info, self.adapt_info, self.job_result]
+
+    def clone(self):
+        # copy keeping the results so far in memory only, for a copy of the simulator (Cqsim_sim.clone)
+        temp_log = copy.copy(self)
+        temp_log.sys_info = copy.copy(self.sys_info)
+        temp_log.adapt_info = copy.copy(self.adapt_info)
+        temp_log.job_result = copy.copy(self.job_result)
+        temp_log.disable()
+        temp_log.sys_info_buf = list(self.sys_info_buf)
+        temp_log.job_buf = list(self.job_buf)
+        temp_log.job_turnarounds = dict(self.job_turnarounds)
+        temp_log.results = list(self.results)
+        return temp_log
+
     def reset(self, output = None, log_freq = 1):
         if output:
             self.output_path = output
@@ -234,7 +234,7 @@ if __name__ == "__main__":
         help="sign of the algorithm element in the list")
     p.add_option("-b", "--bf", dest="backfill", type="int",\
         #default=0, \
-        help="backfill mode")
+        help="backfill mode (1: EASY, 2: conservative, 3: EASY from the shadow time)")
     p.add_option("-B", "--bf_para", dest="bf_para", type="string",\
         action="callback", callback=callback_bf_para,\
         help="backfill parameter list")
@@ -245,7 +245,7 @@ if __name__ == "__main__":
     # 31
     p.add_option("-W", "--win_para", dest="win_para", type="string",\
         action="callback", callback=callback_win_para,\
-        help="window parameter list")
+        help="window parameter list (window size, check size, max start size, beam width)")
     p.add_option("-l", "--ad_bf", dest="ad_bf", type="int",\
         #default=0, \
         help="backfill adapt mode")
@@ -284,6 +284,18 @@ if __name__ == "__main__":
     
     #42
     p.add_option("--stream", action="store_true", dest="stream", help="Enable streaming mode")
+    p.add_option("--batch", action="store_true", dest="batch_events", \
+        help="run one scheduling pass per batch of job events sharing a time stamp")
+
+    #43
+    p.add_option("--checkpoint", dest="checkpoint", type="string",\
+        help="checkpoint file of the simulation")
+    p.add_option("--checkpoint_events", dest="checkpoint_events", type="int",\
+        help="events between two checkpoints")
+    p.add_option("--checkpoint_minutes", dest="checkpoint_minutes", type="float",\
+        help="minutes between two checkpoints")
+    p.add_option("--resume", action="store_true", dest="resume",\
+        help="resume the simulation from its checkpoint")
         
     opts, args = p.parse_args()
 
@@ -361,6 +373,8 @@ if __name__ == "__main__":
         opts.log_freq = 1
     if not opts.read_input_freq:
         opts.read_input_freq = 1000
+    if opts.checkpoint and not opts.checkpoint_events and not opts.checkpoint_minutes:
+        opts.checkpoint_minutes = 10.0
     '''
     if not opts.job_save:
         print "Error: Please specify at least one node structure!"
@@ -410,6 +424,11 @@ if __name__ == "__main__":
     inputPara['monitor']=opts.monitor
     inputPara['log_freq']=opts.log_freq
     inputPara['read_input_freq']=opts.read_input_freq
+    inputPara['batch_events']=opts.batch_events
+    inputPara['checkpoint']=opts.checkpoint
+    inputPara['checkpoint_events']=opts.checkpoint_events
+    inputPara['checkpoint_minutes']=opts.checkpoint_minutes
+    inputPara['resume']=opts.resume
 
     for item in inputPara_name:
         if not inputPara[item]:
@@ -453,5 +472,7 @@ if __name__ == "__main__":
     inputPara['path_out']=cqsim_path.path_data+inputPara['path_out']
     inputPara['path_fmt']=cqsim_path.path_data+inputPara['path_fmt']
     inputPara['path_debug']=cqsim_path.path_data+inputPara['path_debug']
+    if inputPara['checkpoint']:
+        inputPara['checkpoint']=cqsim_path.path_data+inputPara['checkpoint']
     inputPara['alg_sign']=alg_sign_check(inputPara['alg_sign'],len(inputPara['alg']))
     cqsim_main.cqsim_main(inputPara)
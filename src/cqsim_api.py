@@ -57,7 +57,12 @@ def simulate(
         config_sys = "config_sys.set",
         monitor = 500,
         log_freq = 1,
-        read_input_freq = 1000)
+        read_input_freq = 1000,
+        batch_events = False,
+        checkpoint = None,
+        checkpoint_events = None,
+        checkpoint_minutes = None,
+        resume = False)
     
     module_list = cqsim_main(para_list)
     if module_list is None:
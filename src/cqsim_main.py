@@ -10,12 +10,28 @@ import CqSim.Start_window as Class_Start_window
 import CqSim.Basic_algorithm as Class_Basic_algorithm
 import CqSim.Info_collect as Class_Info_collect
 import CqSim.Cqsim_sim as Class_Cqsim_sim
+import CqSim.Checkpoint as Class_Checkpoint
 
 import Extend.SWF.Filter_job_SWF as filter_job_ext
 import Extend.SWF.Filter_node_SWF as filter_node_ext
 import Extend.SWF.Node_struc_SWF as node_struc_ext
 
 
+def cqsim_run(module_sim, module_checkpoint):
+    # runs the simulator to the end, writes the checkpoint every time it is due and once
+    # at the end (a resume after the end must not cut the output files)
+    if module_checkpoint == None:
+        module_sim.advance()
+        return
+    temp_max_events = 1000
+    if module_checkpoint.every_events != None:
+        temp_max_events = min(temp_max_events, module_checkpoint.every_events)
+    while (module_sim.sim_phase != Class_Cqsim_sim.PHASE_DONE):
+        module_sim.advance(max_events=temp_max_events)
+        if (module_checkpoint.due(module_sim.event_num)):
+            module_checkpoint.save([module_sim], event_num=module_sim.event_num)
+    module_checkpoint.save([module_sim], event_num=module_sim.event_num)
+
 def  cqsim_main(para_list):
     print("....................")
     for item in para_list :
@@ -44,6 +60,20 @@ def  cqsim_main(para_list):
 
     if not os.path.exists(para_list['path_debug']):
         os.makedirs(para_list['path_debug'])
+
+    # Checkpoint
+    # Notes: 
+    # with resume, the simulator of the checkpoint goes on where it stopped, its output
+    # files are cut back to the checkpoint and the traces are not read again
+    module_checkpoint = None
+    if para_list['checkpoint']:
+        module_checkpoint = Class_Checkpoint.Checkpoint(para_list['checkpoint'],\
+         every_events=para_list['checkpoint_events'], every_minutes=para_list['checkpoint_minutes'])
+        if para_list['resume'] and module_checkpoint.exists():
+            print(".................... Resume")
+            temp_sims, temp_extra = module_checkpoint.load()
+            cqsim_run(temp_sims[0], module_checkpoint)
+            return Class_Cqsim_sim.time_stamps
     
     # Debug
     print(".................... Debug")
@@ -64,25 +94,35 @@ def  cqsim_main(para_list):
     
     # Node Filter
     # Notes: 
-    # creates file data/Fmt/test_node.csv -- later used by the Node Structure module
+    # reads the processor count (MaxProcs) from the header of the trace, the SWF nodes are
+    # identical so no node file is written (see Node_struc_SWF.from_proc_count)
     print(".................... Node Filter")
     module_filter_node = filter_node_ext.Filter_node_SWF(struc=struc_name, save=save_name_n, config=config_name_n, debug=module_debug)
-    module_filter_node.read_node_struc()
-    module_filter_node.output_node_data()
-    module_filter_node.output_node_config()
+    node_info = module_filter_node.read_node_info()
     
     # Job Trace
+    # Notes: 
+    # reads read_num jobs of the formatted job data from the line anchor, the lines
+    # before it are masked, the trace starts at the submit time of the first job read
     print(".................... Job Trace")
-    module_job_trace = Class_Job_trace.Job_trace(start=para_list['start'],num=para_list['read_num'],anchor=para_list['anchor'],density=para_list['cluster_fraction'],read_input_freq=para_list['read_input_freq'],debug=module_debug)
-    module_job_trace.initial_import_job_file(save_name_j)
+    job_submits = module_filter_job.job_submits
+    temp_anchor = para_list['anchor'] or 0
+    temp_max_lines = len(job_submits)
+    if para_list['read_num'] and para_list['read_num'] > 0:
+        temp_max_lines = min(temp_max_lines, temp_anchor + para_list['read_num'])
+    temp_mask = [0 for _ in range(temp_anchor)] + [1 for _ in range(temp_anchor, temp_max_lines)]
+    temp_real_start_time = -1
+    if temp_anchor < len(job_submits):
+        temp_real_start_time = job_submits[temp_anchor]
+    module_job_trace = Class_Job_trace.Job_trace(save_name_j, module_debug, real_start_time=temp_real_start_time,\
+     virtual_start_time=para_list['start'] or 0.0, density=para_list['cluster_fraction'] or 1.0,\
+     mask=temp_mask, max_lines=temp_max_lines)
     #module_job_trace.import_job_file(save_name_j)
     module_job_trace.import_job_config(config_name_j)
     
     # Node Structure
     print(".................... Node Structure")
-    module_node_struc = node_struc_ext.Node_struc_SWF(debug=module_debug)
-    module_node_struc.import_node_file(save_name_n)
-    module_node_struc.import_node_config(config_name_n)
+    module_node_struc = node_struc_ext.Node_struc_SWF.from_proc_count(node_info['proc'], debug=module_debug)
     
     # Backfill
     print(".................... Backfill")
@@ -108,8 +148,8 @@ def  cqsim_main(para_list):
     print(".................... Cqsim Simulator")
     module_list = {'job':module_job_trace,'node':module_node_struc,'backfill':module_backfill,\
                    'win':module_win,'alg':module_alg,'info':module_info_collect, 'output':module_output_log}
-    module_sim = Class_Cqsim_sim.Cqsim_sim(module=module_list, debug=module_debug, monitor = para_list['monitor'])
-    module_sim.cqsim_sim()
+    module_sim = Class_Cqsim_sim.Cqsim_sim(module=module_list, debug=module_debug, monitor = para_list['monitor'], batch_events = para_list['batch_events'])
+    cqsim_run(module_sim, module_checkpoint)
     #module_debug.end_debug()
     
     return Class_Cqsim_sim.time_stamps
\ No newline at end of file
@@ -132,11 +132,12 @@ def exp_cori(tqdm_pos, tqdm_lock):
         "cori" : cqp.get_job_results(sim)
     }
 
-def exp_theta_cori_merged(tqdm_pos, tqdm_lock):
+def exp_theta_cori_merged(tqdm_pos, tqdm_lock, resume=False):
     """
     Experiment Cori Theta Merged
 
     Simulates Cori + Theta jobs on Cori and Theta merged system.
+    Writes a checkpoint every 10 minutes, with resume the run goes on from it.
     """
     tag = f'exp_theta_cori_merged'
     trace_dir = '../data/InputFiles'
@@ -145,17 +146,21 @@ def exp_theta_cori_merged(tqdm_pos, tqdm_lock):
 
 
     cqp = Cqsim_plus(tag = tag)
+    cqp.set_checkpoint(f'{cqp.exp_directory}/checkpoint.ckp', every_minutes=10)
     
 
     job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file, parsed_trace=True)
 
 
-    sim = cqp.single_cqsim(trace_dir = trace_dir, trace_file = trace_file, proc_count= cluster_proc, parsed_trace=True)
+    if resume and cqp.resume_checkpoint() != None:
+        sim = 0
+    else:
+        sim = cqp.single_cqsim(trace_dir = trace_dir, trace_file = trace_file, proc_count= cluster_proc, parsed_trace=True)
 
-    # Configure sims to read all jobs
-    cqp.set_max_lines(sim, len(job_ids))
-    cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
-    cqp.disable_debug_module(sim)
+        # Configure sims to read all jobs
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
 
 
     tqdm_text = tag
@@ -163,13 +168,15 @@ def exp_theta_cori_merged(tqdm_pos, tqdm_lock):
         bar = tqdm(
             desc=tqdm_text,
             total=len(job_ids),
+            initial=cqp.line_counters[sim],
             position=tqdm_pos,
             leave=False)
 
-    for _ in job_ids:
+    while cqp.line_counters[sim] < len(job_ids) and not cqp.check_sim_ended(sim):
 
         with disable_print():
             cqp.line_step(sim, write_results=True)
+        cqp.save_checkpoint()
 
         with tqdm_lock:
             bar.update(1)
@@ -177,6 +184,7 @@ def exp_theta_cori_merged(tqdm_pos, tqdm_lock):
     while not cqp.check_sim_ended(sim):
         with disable_print():
             cqp.line_step(sim, write_results=True)
+        cqp.save_checkpoint()
 
     with tqdm_lock:
         bar.close()
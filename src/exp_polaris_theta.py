@@ -1,8 +1,10 @@
 """
 Polaris and Theta experiments
 """
+import os
 import datetime
 from CqSim.Cqsim_plus import Cqsim_plus
+from CqSim.Multi_cluster_sim import Multi_cluster_sim
 from tqdm.auto import tqdm
 from utils import probabilistic_true, disable_print
 import pandas as pd
@@ -388,6 +390,83 @@ def exp_polaris_theta_opt_turn(tqdm_pos, tqdm_lock):
     }
 
 
+def exp_polaris_theta_opt_turn_engine(tqdm_pos, tqdm_lock):
+    """
+    Theta and Polaris Metascheduled using OPT turnaround, in one event loop (Multi_cluster_sim).
+    The simulators have no trace, every job is submitted to its cluster only. The turnarounds
+    are estimated (Cqsim_plus.estimate_job) and each job is scaled by its own cluster of origin.
+    """
+    master_exp_directory = f'../data/Results/exp_polaris_theta/'
+
+    trace_dir = '../data/InputFiles'
+    trace_file = 'theta_polaris_23_24.swf'
+    theta_proc = 4360
+    polaris_proc = 552
+
+    tag = f'polaris_theta_opt_turn_engine'
+    cqp = Cqsim_plus()
+    exp_out = f'{master_exp_directory}'
+    cqp.set_exp_directory(exp_out)
+
+    # Cluster 1 is Theta, cluster 2 is Polaris
+    theta = cqp.single_cqsim(None, None, proc_count=theta_proc, sim_tag='theta_engine')
+    polaris = cqp.single_cqsim(None, None, proc_count=polaris_proc, sim_tag='polaris_engine')
+    sims = [theta, polaris]
+
+    # Get job stats
+    job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file, parsed_trace=False)
+    job_records = cqp.get_job_records(trace_dir, trace_file)
+    for sim in sims:
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+    # Polaris jobs run 4 times slower on Theta, Theta jobs 4 times faster on Polaris.
+    def job_scale(sim, job_record):
+        if sim == theta and job_record['userID'] == 1:
+            return 1.0*4.0
+        if sim == polaris and job_record['userID'] == 0:
+            return 1.0/4.0
+        return None
+
+    tqdm_text = tag
+    with tqdm_lock:
+        bar = tqdm(
+            desc=tqdm_text,
+            total=len(job_records),
+            position=tqdm_pos,
+            leave=False)
+
+    def route_opt_turn(msim, job_record):
+        with tqdm_lock:
+            bar.update(1)
+        if job_record['num_queue'] == 1:
+            return polaris
+        turnarounds = msim.estimate_turnarounds(job_record)
+        assert(len(turnarounds) != 0)
+
+        # Get the cluster with the lowest turnaround.
+        lowest_turnaround = min(turnarounds.values())
+        sims_with_lowest_turnaround = [key for key, value in turnarounds.items() if value == lowest_turnaround]
+        return random.choice(sims_with_lowest_turnaround)
+
+    msim = Multi_cluster_sim(cqp, sims, route_opt_turn, job_scale=job_scale)
+    results = msim.run(job_records)
+
+    with tqdm_lock:
+        bar.close()
+
+    for sim in sims:
+        dest_dir = f'{cqp.exp_directory}/plus/sim_{cqp.sim_tags[sim]}'
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        cqp.rst_to_df(results[sim]).to_csv(f'{dest_dir}/result.csv', index=False)
+
+    return {
+        "theta" : results[theta],
+        "polaris" : results[polaris]
+    }
+
+
 
 if __name__ == '__main__':
 
@@ -429,6 +508,10 @@ if __name__ == '__main__':
         # Theta Polaris random
     #    p.append(multiprocessing.Process(target=exp_polaris_theta_random, args=(1, lock,)))
 
+    if selector == 4:
+        # Theta Polaris opt turn, single event loop
+        p.append(multiprocessing.Process(target=exp_polaris_theta_opt_turn_engine, args=(1, lock,)))
+
 
     for proc in p:
         proc.start()
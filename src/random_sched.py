@@ -211,7 +211,7 @@ def run_simulation(
             debug=module_debug, 
             monitor = 500
         )
-        module_sim.cqsim_sim()
+        module_sim.advance()
         return module_output_log.job_turnarounds
 
 job_count, job_ids, job_procs = get_job_data()
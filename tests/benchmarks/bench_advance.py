@@ -0,0 +1,79 @@
+"""
+Benchmark for driving a simulator of Cqsim_plus one line or many events at a time.
+
+Runs a whole trace with:
+
+- line_step: one call per line of the job file (Cqsim_sim.step)
+- generator: next() on the generator of Cqsim_plus.sims, as drivers did before
+- advance: Cqsim_plus.advance with max_events events per call
+- run: a single Cqsim_plus.advance call
+
+Every mode must give the same job results. Reports the calls made and the run time.
+
+Usage (from this directory):
+    python bench_advance.py --trace theta_1000.swf --events 1000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+
+def run(mode, trace_dir, trace_file, proc_count, event_num):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cqp = Cqsim_plus()
+        cqp.set_exp_directory(tmp)
+        cqp.set_trace_cache_directory(None)
+        sim = cqp.single_cqsim(trace_dir, trace_file, proc_count=proc_count)
+        job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file)
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+        call_num = 0
+        start = time.perf_counter()
+        with disable_print():
+            if (mode == 'generator'):
+                for _ in cqp.sims[sim]:
+                    call_num += 1
+            else:
+                while not cqp.check_sim_ended(sim):
+                    if (mode == 'line_step'):
+                        cqp.line_step(sim)
+                    elif (mode == 'advance'):
+                        cqp.advance(sim, max_events=event_num)
+                    else:
+                        cqp.advance(sim)
+                    call_num += 1
+        elapsed = time.perf_counter() - start
+        results = list(cqp.get_job_results(sim))
+
+    print(f'{mode:>10}: {call_num:>8} calls  {elapsed:8.3f} s')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--procs', type=int, default=4360)
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--modes', nargs='+', default=['line_step', 'generator', 'advance', 'run'])
+    args = parser.parse_args()
+    trace_dir = os.path.abspath(args.trace_dir)
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    results = None
+    for mode in args.modes:
+        temp_results = run(mode, trace_dir, args.trace, args.procs, args.events)
+        if results != None:
+            assert(temp_results == results)
+        results = temp_results
@@ -0,0 +1,171 @@
+"""
+Benchmark for the availability profile of Node_struc_SWF.
+
+Starts R running jobs on a machine, then runs P conservative backfill passes over
+W waiting jobs: every pass reserves all the waiting jobs (earliest fit, reserve) and
+checks pre_avail for each of them, like Backfill.backfill_cons. Between two passes a
+running job finishes and a new one starts.
+
+Reports the time of the passes for:
+
+- the list of points previously used by Node_struc_SWF (rebuilt by pre_reset, linear
+  scans in pre_avail / find_res_place / reserve, list.insert to split intervals)
+- CqSim.Avail_profile through Node_struc_SWF (updated on node_allocate / node_release,
+  blocked points, queries and reservations skip whole blocks)
+
+Both must give the same reservations.
+
+Usage (from this directory):
+    python bench_avail_profile.py --running 5000 --waiting 200 --passes 50
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+import Extend.SWF.Node_struc_SWF as Class_Node_struc_SWF
+import IOModule.Debug_log as Class_Debug_log
+
+
+class List_node_struc(Class_Node_struc_SWF.Node_struc_SWF):
+    """
+    The list profile previously used by Node_struc_SWF.pre_reset / pre_avail / reserve.
+    """
+    def profile_allocate(self, proc_num, end):
+        return 1
+
+    def profile_release(self, proc_num, end):
+        return 1
+
+    def pre_reset(self, time):
+        self.predict_node = [{'time':time, 'idle':self.idle, 'avail':self.avail}]
+        self.predict_job = []
+        i = 0
+        j = 0
+        for temp_job in self.job_list:
+            if (self.predict_node[j]['time']!=temp_job['end'] or i == 0):
+                self.predict_node.append({'time':temp_job['end'],\
+                 'idle':self.predict_node[j]['idle'], 'avail':self.predict_node[j]['avail']})
+                j += 1
+            self.predict_node[j]['idle'] += temp_job['node']
+            self.predict_node[j]['avail'] = self.predict_node[j]['idle']
+            i += 1
+        return 1
+
+    def pre_avail(self, proc_num, start, end = None):
+        if not end or end < start:
+            end = start
+        i = 0
+        temp_job_num = len(self.predict_node)
+        while (i < temp_job_num):
+            if (self.predict_node[i]['time']>=start and self.predict_node[i]['time']<end):
+                if (proc_num>self.predict_node[i]['avail']):
+                    return 0
+            i += 1
+        return 1
+
+    def reserve(self, proc_num, job_index, time, start = None, index = -1):
+        temp_max = len(self.predict_node)
+        i = 0
+        if (index >= 0 and index < temp_max):
+            i = index
+        elif (index >= temp_max):
+            return -1
+        while (i<temp_max):
+            if (proc_num<=self.predict_node[i]['avail']):
+                j = self.find_res_place(proc_num,i,time)
+                if (j == -1):
+                    start = self.predict_node[i]['time']
+                    break
+                else:
+                    i = j + 1
+            else:
+                i += 1
+
+        end = start + time
+        j = i
+        is_done = 0
+        start_index = j
+        while (j < temp_max):
+            if (self.predict_node[j]['time']<end):
+                self.predict_node[j]['idle'] -= proc_num
+                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
+                j += 1
+            elif (self.predict_node[j]['time']==end):
+                is_done = 1
+                break
+            else:
+                self.predict_node.insert(j,{'time':end,\
+                 'idle':self.predict_node[j-1]['idle'], 'avail':self.predict_node[j-1]['avail']})
+                self.predict_node[j]['idle'] += proc_num
+                self.predict_node[j]['avail'] = self.predict_node[j]['idle']
+                is_done = 1
+                break
+        if (is_done != 1):
+            self.predict_node.append({'time':end,'idle':self.tot,'avail':self.tot})
+        self.predict_job.append({'job':job_index, 'start':start, 'end':end})
+        return start_index
+
+    def find_res_place(self, proc_num, index, time):
+        if index>=len(self.predict_node):
+            index = len(self.predict_node) - 1
+        i = index
+        end = self.predict_node[index]['time']+time
+        temp_node_num = len(self.predict_node)
+        while (i < temp_node_num):
+            if (self.predict_node[i]['time']<end):
+                if (proc_num>self.predict_node[i]['avail']):
+                    return i
+            i += 1
+        return -1
+
+
+def run(name, node, running, waiting, passes, seed):
+    rnd = random.Random(seed)
+    now = 0
+    job_id = 0
+    for proc_num, run_time in running:
+        node.node_allocate(proc_num, job_id, now, now + run_time)
+        job_id += 1
+    result = []
+    start = time.perf_counter()
+    for k in range(passes):
+        node.pre_reset(now)
+        for job_index, (proc_num, run_time) in enumerate(waiting):
+            result.append(node.pre_avail(proc_num, now, now + run_time))
+            result.append(node.reserve(proc_num, job_index, run_time))
+        result.append(node.pre_get_last()['end'])
+        # the first running job to end finishes, a new job takes its processors
+        now = node.job_list[0]['end']
+        temp_job = node.job_list[0]
+        node.node_release(temp_job['job'], now)
+        node.node_allocate(temp_job['node'], job_id, now, now + rnd.randint(60, 86400))
+        job_id += 1
+    elapsed = time.perf_counter() - start
+    print(f'{name:>10}: {len(running):>6} running  {len(waiting):>5} waiting  {passes:>5} passes  {elapsed:8.3f} s')
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--running', type=int, default=5000)
+    parser.add_argument('--waiting', type=int, default=200)
+    parser.add_argument('--passes', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    running = [(rnd.randint(1, 16), rnd.randint(60, 86400)) for i in range(args.running)]
+    waiting = [(rnd.randint(1, 64), rnd.randint(60, 86400)) for i in range(args.waiting)]
+    proc_count = sum([proc_num for proc_num, run_time in running]) + 64
+
+    with tempfile.TemporaryDirectory() as tmp:
+        debug = Class_Debug_log.Debug_log(lvl=0, show=10, path=os.path.join(tmp, 'debug.log'))
+        new_result = run('profile', Class_Node_struc_SWF.Node_struc_SWF.from_proc_count(proc_count, debug),\
+         running, waiting, args.passes, args.seed)
+        old_result = run('list', List_node_struc.from_proc_count(proc_count, debug),\
+         running, waiting, args.passes, args.seed)
+        assert(new_result == old_result)
@@ -0,0 +1,91 @@
+"""
+Benchmark for the on-disk checkpoint of the simulators of Cqsim_plus (Checkpoint).
+
+Runs a trace on one simulator and writes a checkpoint every --every lines of the job file.
+Reports the size of the checkpoint file and the time to write and to read it. Then a second
+Cqsim_plus resumes from the checkpoint written halfway through the trace and runs to the end,
+it must give the same job results as the run without interruption.
+
+Usage (from this directory):
+    python bench_checkpoint.py --trace theta_1000.swf --every 100
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+
+def new_cqsim_plus(tmp):
+    from CqSim.Cqsim_plus import Cqsim_plus
+
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    cqp.set_checkpoint(f'{tmp}/checkpoint.ckp')
+    return cqp
+
+
+def run_to_end(cqp, sim):
+    from utils import disable_print
+
+    with disable_print():
+        while not cqp.check_sim_ended(sim):
+            cqp.line_step(sim)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--procs', type=int, default=4360)
+    parser.add_argument('--every', type=int, default=100)
+    args = parser.parse_args()
+    trace_dir = os.path.abspath(args.trace_dir)
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    from utils import disable_print
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cqp = new_cqsim_plus(tmp)
+        sim = cqp.single_cqsim(trace_dir, args.trace, proc_count=args.procs)
+        job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, args.trace)
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+        save_times = []
+        sizes = []
+        half = len(job_ids) // 2
+        i = 0
+        while (i < len(job_ids)):
+            with disable_print():
+                cqp.line_step(sim)
+            i += 1
+            if (i % args.every == 0 or i == half):
+                start = time.perf_counter()
+                cqp.save_checkpoint({'line': i}, force=True)
+                save_times.append(time.perf_counter() - start)
+                sizes.append(os.path.getsize(f'{tmp}/checkpoint.ckp'))
+            if (i == half):
+                shutil.copy(f'{tmp}/checkpoint.ckp', f'{tmp}/half.ckp')
+        run_to_end(cqp, sim)
+        results = list(cqp.get_job_results(sim))
+
+        print(f'{len(save_times)} checkpoints: {sum(save_times)/len(save_times)*1000:8.2f} ms per save, '
+              f'{min(sizes)/1024:.1f} to {max(sizes)/1024:.1f} KiB')
+
+        # output files of the resumed run are cut back to the checkpoint
+        shutil.copy(f'{tmp}/half.ckp', f'{tmp}/checkpoint.ckp')
+        resumed = new_cqsim_plus(tmp)
+        start = time.perf_counter()
+        extra = resumed.resume_checkpoint()
+        load_time = time.perf_counter() - start
+        print(f'resume at line {extra["line"]}: {load_time*1000:8.2f} ms')
+        run_to_end(resumed, sim)
+        assert(list(resumed.get_job_results(sim)) == results)
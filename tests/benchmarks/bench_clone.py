@@ -0,0 +1,122 @@
+"""
+Benchmark for copying a simulator in the current process (Cqsim_sim.clone) instead of forking.
+
+Builds a synthetic trace with a backlog: N jobs submitted at once, each needing the whole
+machine, then a tail of jobs one hour apart. The simulator reads the trace up to the first
+tail job, leaving N - 1 jobs waiting. The copy of the simulator at that point is timed for:
+
+- clone: Cqsim_sim.clone(), the scheduling state is copied, the parsed trace is shared
+- fork: os.fork() of the current process, the child exits at once (waitpid)
+- process: multiprocessing.Process start and join, like line_step_what_if
+
+Then a copy (Cqsim_plus.clone_cqsim) and the original are both advanced through the rest
+of the tail, they must give the same wait queue and the same job results.
+
+Usage (from this directory):
+    python bench_clone.py --jobs 10000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from multiprocessing import Process
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+START_TIME = 1641021254
+
+
+def write_trace(path, job_num, tail_num, proc_count):
+    with open(path, 'w') as f:
+        i = 0
+        while (i < job_num + tail_num):
+            if (i < job_num):
+                submit = START_TIME
+            else:
+                submit = START_TIME + 3600 * (i - job_num + 1)
+            f.write(f'{i+1} {submit} 0 3000 {proc_count} -1 -1 {proc_count} 3600 -1 1 -1 -1 -1 -1 -1 -1 0\n')
+            i += 1
+
+
+def noop():
+    return
+
+
+def time_repeat(func, repeat):
+    start = time.perf_counter()
+    i = 0
+    while (i < repeat):
+        func()
+        i += 1
+    return (time.perf_counter() - start) / repeat
+
+
+def fork_wait():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+
+def process_join():
+    p = Process(target=noop)
+    p.start()
+    p.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--tail', type=int, default=20)
+    parser.add_argument('--procs', type=int, default=128)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_trace(f'{tmp}/backlog.swf', args.jobs, args.tail, args.procs)
+        cqp = Cqsim_plus()
+        cqp.set_exp_directory(tmp)
+        cqp.set_trace_cache_directory(None)
+        sim = cqp.single_cqsim(tmp, 'backlog.swf', proc_count=args.procs, batch_events=True)
+        job_ids, job_procs, job_submits = cqp.get_job_data(tmp, 'backlog.swf')
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+        # the backlog is scheduled once the first tail job is read
+        start = time.perf_counter()
+        with disable_print():
+            i = 0
+            while (i < args.jobs + 2):
+                cqp.line_step(sim)
+                i += 1
+        build_time = time.perf_counter() - start
+        module_sim = cqp.sim_modules[sim]
+        print(f'backlog: {len(module_sim.module["job"].wait_list())} waiting jobs, '
+              f'{len(module_sim.event_seq)} events, built in {build_time:.2f} s')
+
+        results = [
+            ('clone', time_repeat(module_sim.clone, args.repeat)),
+            ('fork', time_repeat(fork_wait, args.repeat)),
+            ('process', time_repeat(process_join, args.repeat)),
+        ]
+        for name, elapsed in results:
+            print(f'{name:>10}: {elapsed*1000:10.3f} ms per copy')
+
+        # the rest of the tail, not the whole backlog (one backfill pass over it per job)
+        copy_sim = cqp.clone_cqsim(sim)
+        with disable_print():
+            for id in (sim, copy_sim):
+                i = 0
+                while (i < args.tail - 1):
+                    cqp.line_step(id)
+                    i += 1
+        assert(cqp.sim_modules[copy_sim].module['job'].wait_list() == module_sim.module['job'].wait_list())
+        assert(cqp.get_job_results(copy_sim) == cqp.get_job_results(sim))
@@ -0,0 +1,137 @@
+"""
+Benchmark for the simulator event queue.
+
+Replays the submit/finish event pattern of theta_1000.swf, tiled in time until
+the requested number of jobs is reached, through:
+
+- the sorted list the simulator used before (linear insert walk, delete at index 0)
+- CqSim.Event_queue (heap keyed on time, priority and insertion sequence)
+
+and reports events/sec for both. Both queues must pop the events in the same order.
+
+Usage (from this directory):
+    python bench_event_queue.py --jobs 1000000 --legacy-jobs 100000 --density 0.05
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+import CqSim.Event_queue as Class_Event_queue
+
+
+class List_event_queue:
+    """
+    The sorted list previously used by Cqsim_sim.insert_event / scan_event.
+    """
+    def __init__(self):
+        self.event_seq = []
+
+    def push(self, event):
+        temp_index = -1
+        i = 0
+        while (i<len(self.event_seq)):
+            if (self.event_seq[i]['time']==event['time']):
+                if (self.event_seq[i]['prio']>event['prio']):
+                    temp_index = i
+                    break
+            elif (self.event_seq[i]['time']>event['time']):
+                temp_index = i
+                break
+            i += 1
+        if (temp_index == -1):
+            self.event_seq.append(event)
+        else:
+            self.event_seq.insert(temp_index, event)
+
+    def pop(self):
+        event = self.event_seq[0]
+        del self.event_seq[0]
+        return event
+
+    def peek(self):
+        if not self.event_seq:
+            return None
+        return self.event_seq[0]
+
+    def __len__(self):
+        return len(self.event_seq)
+
+
+def load_jobs(trace, num_jobs, density=1.0):
+    """
+    Reads (submit, wait, run) from an SWF trace and tiles it in time until num_jobs jobs exist.
+    density scales the submit intervals like Job_trace does, a smaller value means more jobs in flight.
+    """
+    base = []
+    with open(trace, 'r') as f:
+        for line in f:
+            if not line.strip() or line[0] == ';':
+                continue
+            data = line.split()
+            base.append((float(data[1]), max(float(data[2]), 0.0), max(float(data[3]), 1.0)))
+    first = base[0][0]
+    span = base[-1][0] - first + 1
+    jobs = []
+    copy = 0
+    while len(jobs) < num_jobs:
+        for submit, wait, run in base:
+            jobs.append((density*(submit - first + copy*span), wait, run))
+            if len(jobs) >= num_jobs:
+                break
+        copy += 1
+    return jobs
+
+
+def replay(queue, jobs):
+    """
+    Drives the queue the way Cqsim_sim.scan_event does: submit events are read one job ahead,
+    and processing a submit schedules the matching finish event at submit + wait + run.
+    Returns the number of events processed, the largest queue length and the pop order.
+    """
+    order = []
+    peak = 0
+    read = 0
+    last_read = -1
+    events = 0
+    while len(queue) > 0 or read < len(jobs):
+        head = queue.peek()
+        if read < len(jobs) and (head is None or head['time'] >= last_read):
+            queue.push({"type":1, "time":jobs[read][0], "prio":2, "para":[1, read]})
+            last_read = jobs[read][0]
+            read += 1
+            continue
+        peak = max(peak, len(queue))
+        event = queue.pop()
+        events += 1
+        order.append(event['para'][1]*2 + event['para'][0] - 1)
+        if event['para'][0] == 1:
+            submit, wait, run = jobs[event['para'][1]]
+            queue.push({"type":1, "time":submit+wait+run, "prio":1, "para":[2, event['para'][1]]})
+    return events, peak, order
+
+
+def run(name, queue, jobs):
+    start = time.perf_counter()
+    events, peak, order = replay(queue, jobs)
+    elapsed = time.perf_counter() - start
+    print(f'{name:>10}: {len(jobs):>8} jobs  {events:>8} events  {peak:>7} in flight  {elapsed:8.2f} s  {events/elapsed:12.0f} events/s')
+    return order
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/InputFiles/theta_1000.swf'))
+    parser.add_argument('--jobs', type=int, default=1000000)
+    parser.add_argument('--density', type=float, default=1.0)
+    parser.add_argument('--legacy-jobs', type=int, default=100000, help='the list queue is quadratic, cap its run')
+    args = parser.parse_args()
+
+    sizes = sorted(set([n for n in [1000, 10000, 100000, args.jobs] if n <= args.jobs]))
+    for n in sizes:
+        jobs = load_jobs(args.trace, n, args.density)
+        heap_order = run('heap', Class_Event_queue.Event_queue(), jobs)
+        if n <= args.legacy_jobs:
+            list_order = run('list', List_event_queue(), jobs)
+            assert(heap_order == list_order)
@@ -0,0 +1,113 @@
+"""
+Benchmark for the job state transitions of Job_trace.
+
+Queues N jobs, then pushes all of them through submit, start and finish:
+
+- submit: every job is submitted, the wait queue grows to N jobs
+- start: jobs are started in a random order, like backfill picking jobs out of the queue
+- finish: the running jobs finish in a random order
+
+and reports the time of each phase for:
+
+- the lists Job_trace used before (list.remove on every transition)
+- CqSim.Job_trace (dicts used as ordered sets, O(1) transitions)
+
+Both must leave the jobs in the same order in every state.
+
+Usage (from this directory):
+    python bench_job_states.py --jobs 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+import CqSim.Job_trace as Class_Job_trace
+import IOModule.Debug_log as Class_Debug_log
+
+
+class List_job_states:
+    """
+    The state lists previously used by Job_trace.job_submit / job_start / job_finish.
+    """
+    def __init__(self, job_num):
+        self.job_submit_list = list(range(job_num))
+        self.job_wait_list = []
+        self.job_run_list = []
+
+    def job_submit(self, job_index):
+        self.job_submit_list.remove(job_index)
+        self.job_wait_list.append(job_index)
+
+    def job_start(self, job_index, time):
+        self.job_wait_list.remove(job_index)
+        self.job_run_list.append(job_index)
+
+    def job_finish(self, job_index, time=None):
+        self.job_run_list.remove(job_index)
+
+    def wait_list(self):
+        return self.job_wait_list
+
+    def run_list(self):
+        return self.job_run_list
+
+
+def build_job_trace(job_num, path, debug):
+    job = Class_Job_trace.Job_trace(path, debug)
+    i = 0
+    while (i < job_num):
+        job.jobTrace[i] = {'id':i, 'submit':float(i), 'run':100.0, 'reqProc':1, 'reqTime':100.0,\
+         'start':-1, 'end':-1, 'score':0, 'state':0}
+        job.job_submit_list[i] = None
+        i += 1
+    return job
+
+
+def run(name, job, submit_order, start_order, finish_order):
+    result = [name]
+    start = time.perf_counter()
+    for job_index in submit_order:
+        job.job_submit(job_index)
+    result.append(time.perf_counter() - start)
+    wait_order = list(job.wait_list())
+
+    start = time.perf_counter()
+    for job_index in start_order:
+        job.job_start(job_index, 0.0)
+    result.append(time.perf_counter() - start)
+    run_order = list(job.run_list())
+
+    start = time.perf_counter()
+    for job_index in finish_order:
+        job.job_finish(job_index, 100.0)
+    result.append(time.perf_counter() - start)
+    print(f'{name:>10}: {len(submit_order):>8} jobs  submit {result[1]:8.3f} s  start {result[2]:8.3f} s  finish {result[3]:8.3f} s')
+    return wait_order, run_order
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    submit_order = list(range(args.jobs))
+    start_order = submit_order[:]
+    rnd.shuffle(start_order)
+    finish_order = start_order[:]
+    rnd.shuffle(finish_order)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'empty.csv')
+        open(path, 'w').close()
+        debug = Class_Debug_log.Debug_log(lvl=0, show=10, path=os.path.join(tmp, 'debug.log'))
+        job = build_job_trace(args.jobs, path, debug)
+        new_orders = run('indexed', job, submit_order, start_order, finish_order)
+        job.close_file_job_file()
+        old_orders = run('list', List_job_states(args.jobs), submit_order, start_order, finish_order)
+        assert(new_orders == old_orders)
@@ -0,0 +1,199 @@
+"""
+Benchmark for the single event loop of Multi_cluster_sim against the loop of
+exp_polaris_theta_opt_turn (exp_polaris_theta.py).
+
+Builds a Theta + Polaris trace from a Theta trace: every fourth job comes from Polaris (field
+12, cluster id 1), half of them need its GPUs (field 15). GPU jobs go to Polaris, the other
+jobs to the cluster with the lowest predicted turnaround (random choice on a tie), a Polaris
+job runs --scale times slower on Theta and a Theta job --scale times faster on Polaris. It
+runs with:
+
+- loop: the loop of exp_polaris_theta_opt_turn, both simulators read the whole trace, masks
+  and scale factors are set around every line_step, disable_print() around every step. The
+  turnarounds come from predict_next_job_turnarounds (--predict fork, as the experiment) or
+  estimate_next_job_turnarounds (--predict estimate). Results are not written at every step
+  (write_results) and there is no progress bar.
+- engine: Multi_cluster_sim over two simulators without trace, the same routing as a policy.
+
+With --scale 1 both must route the jobs the same way and give the same job results. With
+another scale the loop differs: a simulator reads the line of a job at the line_step of the
+next job, with the scale factors set for the next job, the engine scales every job by its own
+cluster. The routes differing are then counted. Reports the run time.
+
+Usage (from this directory):
+    python bench_multi_cluster.py --trace theta_1000.swf --predict estimate
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+THETA_PROC = 4360
+POLARIS_PROC = 552
+SCALE = 4.0
+
+
+def write_trace(source, path, job_num):
+    with open(source) as f_in, open(path, 'w') as f_out:
+        i = 0
+        for line in f_in:
+            if line[0] == ';' or not line.strip():
+                continue
+            if i >= job_num:
+                break
+            fields = line.split()
+            cluster_id = 1 if i % 4 == 3 else 0
+            gpu = 1 if (cluster_id == 1 and i % 8 == 7 and int(fields[7]) <= POLARIS_PROC) else 0
+            fields[11] = str(cluster_id)
+            fields[14] = str(gpu)
+            f_out.write(' '.join(fields) + '\n')
+            i += 1
+
+
+def run_loop(tmp, trace_dir, trace_file, predict, seed):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    random.seed(seed)
+    start = time.perf_counter()
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    with disable_print():
+        theta = cqp.single_cqsim(trace_dir, trace_file, proc_count=THETA_PROC, sim_tag='theta')
+        polaris = cqp.single_cqsim(trace_dir, trace_file, proc_count=POLARIS_PROC, sim_tag='polaris')
+    sims = [theta, polaris]
+    job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file)
+    records = cqp.get_job_records(trace_dir, trace_file)
+    cluster_ids = [record['userID'] for record in records]
+    gpu_req = [record['num_queue'] for record in records]
+    for sim in sims:
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+    routes = []
+    for i in range(len(job_ids)):
+        if gpu_req[i] == 1:
+            selected_sim = polaris
+        else:
+            if cluster_ids[i] == 1:
+                cqp.set_job_run_scale_factor(sims[0], SCALE)
+                cqp.set_job_walltime_scale_factor(sims[0], SCALE)
+            elif cluster_ids[i] == 0:
+                cqp.set_job_run_scale_factor(sims[1], 1.0/SCALE)
+                cqp.set_job_walltime_scale_factor(sims[1], 1.0/SCALE)
+
+            if predict == 'fork':
+                turnarounds = cqp.predict_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            else:
+                turnarounds = cqp.estimate_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+
+            cqp.set_job_run_scale_factor(sims[0], 1.0)
+            cqp.set_job_walltime_scale_factor(sims[0], 1.0)
+            cqp.set_job_run_scale_factor(sims[1], 1.0)
+            cqp.set_job_walltime_scale_factor(sims[1], 1.0)
+
+            assert(len(turnarounds) != 0)
+            lowest_turnaround = min(turnarounds.values())
+            sims_with_lowest_turnaround = [key for key, value in turnarounds.items() if value == lowest_turnaround]
+            selected_sim = random.choice(sims_with_lowest_turnaround)
+        routes.append(selected_sim)
+
+        for sim in sims:
+            if sim == selected_sim:
+                if sim == sims[0] and cluster_ids[i] == 1:
+                    cqp.set_job_run_scale_factor(sim, SCALE)
+                    cqp.set_job_walltime_scale_factor(sim, SCALE)
+                elif sim == sims[1] and cluster_ids[i] == 0:
+                    cqp.set_job_run_scale_factor(sim, 1.0/SCALE)
+                    cqp.set_job_walltime_scale_factor(sim, 1.0/SCALE)
+                cqp.enable_next_job(sim)
+            else:
+                cqp.disable_next_job(sim)
+            with disable_print():
+                cqp.line_step(sim)
+
+        cqp.set_job_run_scale_factor(sims[0], 1.0)
+        cqp.set_job_walltime_scale_factor(sims[0], 1.0)
+        cqp.set_job_run_scale_factor(sims[1], 1.0)
+        cqp.set_job_walltime_scale_factor(sims[1], 1.0)
+
+    while not cqp.check_all_sim_ended(sims):
+        for sim in sims:
+            with disable_print():
+                cqp.line_step(sim)
+    elapsed = time.perf_counter() - start
+    return elapsed, routes, [cqp.get_job_results(sim) for sim in sims]
+
+
+def run_engine(tmp, trace_dir, trace_file, seed):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from CqSim.Multi_cluster_sim import Multi_cluster_sim
+
+    random.seed(seed)
+    start = time.perf_counter()
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    theta = cqp.single_cqsim(None, None, proc_count=THETA_PROC, sim_tag='theta')
+    polaris = cqp.single_cqsim(None, None, proc_count=POLARIS_PROC, sim_tag='polaris')
+    sims = [theta, polaris]
+    job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file)
+    records = cqp.get_job_records(trace_dir, trace_file)
+    for sim in sims:
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+    def job_scale(sim, job_record):
+        if sim == theta and job_record['userID'] == 1:
+            return SCALE
+        if sim == polaris and job_record['userID'] == 0:
+            return 1.0/SCALE
+        return None
+
+    def route_opt_turn(msim, job_record):
+        if job_record['num_queue'] == 1:
+            return polaris
+        turnarounds = msim.estimate_turnarounds(job_record)
+        assert(len(turnarounds) != 0)
+        lowest_turnaround = min(turnarounds.values())
+        return random.choice([key for key, value in turnarounds.items() if value == lowest_turnaround])
+
+    msim = Multi_cluster_sim(cqp, sims, route_opt_turn, job_scale=job_scale)
+    results = msim.run(records)
+    elapsed = time.perf_counter() - start
+    return elapsed, msim.routes, [results[sim] for sim in sims]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--predict', choices=['fork', 'estimate'], default='estimate')
+    parser.add_argument('--scale', type=float, default=SCALE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    SCALE = args.scale
+    trace_path = os.path.abspath(os.path.join(args.trace_dir, args.trace))
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_trace(trace_path, f'{tmp}/polaris_theta.swf', args.jobs)
+        with tempfile.TemporaryDirectory() as tmp_loop, tempfile.TemporaryDirectory() as tmp_engine:
+            loop_time, loop_routes, loop_results = run_loop(tmp_loop, tmp, 'polaris_theta.swf', args.predict, args.seed)
+            engine_time, engine_routes, engine_results = run_engine(tmp_engine, tmp, 'polaris_theta.swf', args.seed)
+    if SCALE == 1.0:
+        assert(engine_routes == loop_routes)
+        assert(engine_results == loop_results)
+    temp_diff = len([i for i in range(len(loop_routes)) if loop_routes[i] != engine_routes[i]])
+    print(f'{len(loop_routes)} jobs, {engine_routes.count(1)} on Polaris, {temp_diff} routed differently by the loop')
+    print(f'{"loop (" + args.predict + ")":>18}: {loop_time:8.3f} s')
+    print(f'{"engine":>18}: {engine_time:8.3f} s  ({loop_time/engine_time:5.1f}x)')
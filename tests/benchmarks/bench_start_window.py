@@ -0,0 +1,87 @@
+"""
+Benchmark for the start window search (Start_window, mode 1).
+
+Starts R running jobs on a machine, then orders windows of W waiting jobs with:
+
+- window_check: every permutation of the window, the reservations rebuilt from pre_reset
+  for each of them (W! * W reservations)
+- window_search: depth first search keeping the reservations of a prefix, pruned with a
+  lower bound of the last end, optionally limited to a beam width
+
+The exact search must give the same order as window_check. Reports the time, the
+reservations tried (nodes) and, with a beam, how far its last end is from the exact one.
+
+Usage (from this directory):
+    python bench_start_window.py --running 200 --window 6 --passes 20
+    python bench_start_window.py --running 200 --window 9 --passes 5 --beam 2 --no-check
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+import Extend.SWF.Node_struc_SWF as Class_Node_struc_SWF
+import CqSim.Start_window as Class_Start_window
+import IOModule.Debug_log as Class_Debug_log
+
+
+def run(name, node, debug, windows, now, beam, check):
+    win_size = len(windows[0])
+    start_window = Class_Start_window.Start_window(mode=1, node_module=node, debug=debug,\
+     para_list=[str(win_size), '0', '0', str(beam)])
+    result = []
+    last_end = []
+    start = time.perf_counter()
+    for wait_job in windows:
+        start_window.current_para = {'time': now}
+        start_window.wait_job = wait_job
+        start_window.temp_check_len = win_size
+        if check:
+            result.append(start_window.window_check())
+        else:
+            result.append(start_window.window_search())
+            last_end.append(start_window.search_best[0])
+    elapsed = time.perf_counter() - start
+    if check:
+        nodes = len(windows) * win_size * len(start_window.seq_list[win_size])
+    else:
+        nodes = start_window.search_node_tot
+    print(f'{name:>14}: window {win_size:>2}  {len(windows):>4} passes  {elapsed:8.3f} s  {nodes:>10} nodes')
+    return result, last_end
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--running', type=int, default=200)
+    parser.add_argument('--window', type=int, default=6)
+    parser.add_argument('--passes', type=int, default=20)
+    parser.add_argument('--beam', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-check', action='store_true', help='skip window_check (large windows)')
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    running = [(rnd.randint(1, 64), rnd.randint(60, 86400)) for i in range(args.running)]
+    proc_count = sum([proc_num for proc_num, run_time in running]) + 64
+    windows = [[{'index': i * args.window + j, 'proc': rnd.randint(1, proc_count // 4),\
+     'run': rnd.randint(60, 86400)} for j in range(args.window)] for i in range(args.passes)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        debug = Class_Debug_log.Debug_log(lvl=0, show=10, path=os.path.join(tmp, 'debug.log'))
+        node = Class_Node_struc_SWF.Node_struc_SWF.from_proc_count(proc_count, debug)
+        job_id = 0
+        for proc_num, run_time in running:
+            node.node_allocate(proc_num, job_id, 0, run_time)
+            job_id += 1
+        exact_result, exact_end = run('search', node, debug, windows, 0, 0, False)
+        if args.beam > 0:
+            beam_result, beam_end = run(f'search beam {args.beam}', node, debug, windows, 0, args.beam, False)
+            diff = sum([1 for a, b in zip(exact_result, beam_result) if a != b])
+            gap = sum([(b - a) / a for a, b in zip(exact_end, beam_end)]) / len(windows)
+            print(f'{"":>14}  beam: {diff}/{len(windows)} orders differ, last end {gap:+.2%} on average')
+        if not args.no_check:
+            check_result, check_end = run('check', node, debug, windows, 0, 0, True)
+            assert(check_result == exact_result)
@@ -0,0 +1,112 @@
+"""
+Benchmark for routing jobs to N clusters by submitting them (Cqsim_plus.submit_job) instead of
+masking a shared trace.
+
+Replays the first --jobs jobs of a trace on N clusters of --procs processors, job i goes to
+cluster i % N (the routing itself costs nothing). The clusters are driven with:
+
+- masked: every simulator reads the whole trace, enable_next_job / disable_next_job and one
+  line_step per simulator and per job, like the metascheduling experiments
+- submit: simulators without trace (single_cqsim with trace_file None), each job is given to
+  its cluster only with submit_job
+
+Every cluster must give the same job results in both modes. Reports the time to set up and run
+the clusters, and the lines read by all the simulators (jobs and skipped lines).
+
+Usage (from this directory):
+    python bench_submit_job.py --trace theta_1000.swf --clusters 2 4 8 16
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+
+def run_masked(tmp, trace_dir, trace_file, proc_count, cluster_num, job_num):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    start = time.perf_counter()
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    with disable_print():
+        sims = [cqp.single_cqsim(trace_dir, trace_file, proc_count=proc_count, sim_tag=f'cluster_{k}') for k in range(cluster_num)]
+    job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file)
+    job_num = min(job_num, len(job_ids))
+    for sim in sims:
+        cqp.set_max_lines(sim, job_num)
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+    with disable_print():
+        for i in range(job_num):
+            for sim in sims:
+                if sim == sims[i % cluster_num]:
+                    cqp.enable_next_job(sim)
+                else:
+                    cqp.disable_next_job(sim)
+                cqp.line_step(sim)
+        for sim in sims:
+            while not cqp.check_sim_ended(sim):
+                cqp.line_step(sim)
+    elapsed = time.perf_counter() - start
+    line_num = sum([cqp.sim_modules[sim].module['job'].line_number for sim in sims])
+
+    # the jobs as filtered for the simulators, given to submit_job by the other mode
+    from CqSim.Job_trace import FMT_FIELDS
+    fmt_file = f'{tmp}/cluster_0/Fmt/{trace_file.split(".")[0]}.csv'
+    jobs = pd.read_csv(fmt_file, sep=';', header=None, names=FMT_FIELDS).iloc[:job_num]
+    return elapsed, line_num, [cqp.get_job_results(sim) for sim in sims], jobs.to_dict('records'), job_submits[0]
+
+
+def run_submit(tmp, jobs, real_start_time, proc_count, cluster_num):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    start = time.perf_counter()
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    sims = [cqp.single_cqsim(None, None, proc_count=proc_count, sim_tag=f'cluster_{k}') for k in range(cluster_num)]
+    for sim in sims:
+        cqp.set_sim_times(sim, real_start_time=real_start_time, virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+
+    with disable_print():
+        for i, job_record in enumerate(jobs):
+            cqp.submit_job(sims[i % cluster_num], job_record)
+        for sim in sims:
+            cqp.end_submits(sim)
+            while not cqp.check_sim_ended(sim):
+                cqp.line_step(sim)
+    elapsed = time.perf_counter() - start
+    line_num = sum([cqp.sim_modules[sim].module['job'].line_number for sim in sims])
+    return elapsed, line_num, [cqp.get_job_results(sim) for sim in sims]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--procs', type=int, default=4360)
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--clusters', type=int, nargs='+', default=[2, 4, 8, 16])
+    args = parser.parse_args()
+    trace_dir = os.path.abspath(args.trace_dir)
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    for cluster_num in args.clusters:
+        with tempfile.TemporaryDirectory() as tmp_masked, tempfile.TemporaryDirectory() as tmp_submit:
+            masked_time, masked_lines, masked_results, jobs, real_start_time = run_masked(tmp_masked, trace_dir,\
+             args.trace, args.procs, cluster_num, args.jobs)
+            submit_time, submit_lines, submit_results = run_submit(tmp_submit, jobs, real_start_time, args.procs, cluster_num)
+        assert(submit_results == masked_results)
+        print(f'{cluster_num:>3} clusters, {len(jobs)} jobs:  masked {masked_time:8.3f} s {masked_lines:>8} lines  '
+              f'submit {submit_time:8.3f} s {submit_lines:>8} lines')
@@ -0,0 +1,76 @@
+"""
+Benchmark for the turnaround predictions of Cqsim_plus used to route jobs between clusters.
+
+Sets up two simulators on the same trace (like exp_polaris_theta) and routes the first N jobs:
+before each job is added to one of them, its turnaround on both clusters is predicted with
+
+- predict_next_job_turnarounds: the simulators are copied in a child process (fork) and run
+  until the job starts
+- estimate_next_job_turnarounds: Turnaround_estimator replays the scheduling passes on copies
+  of the wait queue and of the running jobs, in the current process
+
+Both must give the same turnarounds. The job goes to the cluster with the lowest one, the
+other simulator skips it (disable_next_job). Reports the time spent in each prediction.
+
+Usage (from this directory):
+    python bench_turnaround_estimator.py --trace theta_1000.swf --procs 4360 1090 --jobs 300
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--procs', type=int, nargs=2, default=[4360, 1090])
+    parser.add_argument('--jobs', type=int, default=300)
+    args = parser.parse_args()
+    trace_dir = os.path.abspath(args.trace_dir)
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cqp = Cqsim_plus()
+        cqp.set_exp_directory(tmp)
+        cqp.set_trace_cache_directory(None)
+        sims = [cqp.single_cqsim(trace_dir, args.trace, proc_count=proc_count, sim_tag=f'sim_{proc_count}')\
+         for proc_count in args.procs]
+        job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, args.trace)
+        for sim in sims:
+            cqp.set_max_lines(sim, len(job_ids))
+            cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+            cqp.disable_debug_module(sim)
+
+        fork_time = 0
+        estimate_time = 0
+        job_num = min(args.jobs, len(job_ids))
+        for i in range(job_num):
+            start = time.perf_counter()
+            turnarounds = cqp.predict_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            fork_time += time.perf_counter() - start
+            start = time.perf_counter()
+            estimates = cqp.estimate_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            estimate_time += time.perf_counter() - start
+            assert(turnarounds == estimates), (job_ids[i], turnarounds, estimates)
+
+            selected_sim = min(estimates, key=estimates.get)
+            for sim in sims:
+                if sim == selected_sim:
+                    cqp.enable_next_job(sim)
+                else:
+                    cqp.disable_next_job(sim)
+                with disable_print():
+                    cqp.line_step(sim)
+
+    print(f'{"fork":>10}: {job_num:>6} jobs  {fork_time:8.3f} s  {job_num/fork_time:10.1f} jobs/s')
+    print(f'{"estimate":>10}: {job_num:>6} jobs  {estimate_time:8.3f} s  {job_num/estimate_time:10.1f} jobs/s')
@@ -0,0 +1,100 @@
+"""
+Benchmark for routing jobs between clusters on their predicted turnarounds (Cqsim_plus).
+
+Replays the first N jobs of a Theta trace on two clusters of half the Theta processors, the
+second one running the jobs scaled by --scale (like exp_theta_two_parts). Every job goes to
+the cluster with the lowest predicted turnaround, the other simulator skips it. The
+turnarounds are predicted with:
+
+- fork: predict_next_job_turnarounds, the simulators are copied in a new process per job
+- estimate: estimate_next_job_turnarounds, in the current process (Turnaround_estimator)
+- clone: clone_next_job_turnarounds, the simulators are copied and run in the current process
+- pool: pool_next_job_turnarounds, one what-if worker per cluster started once, kept in
+  step with the calls made since its last query (start_what_if_pool), running the copies
+  of the clusters at the same time
+
+Every mode must route the jobs the same way. Reports the jobs routed per second.
+
+Usage (from this directory):
+    python bench_what_if_pool.py --trace theta_1000.swf --jobs 500
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src')
+sys.path.insert(0, SRC_DIR)
+
+
+def run(mode, trace_dir, trace_file, proc_count, scale, job_num):
+    from CqSim.Cqsim_plus import Cqsim_plus
+    from utils import disable_print
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cqp = Cqsim_plus()
+        cqp.set_exp_directory(tmp)
+        cqp.set_trace_cache_directory(None)
+        sims = [cqp.single_cqsim(trace_dir, trace_file, proc_count=proc_count, sim_tag=f'cluster_{k}') for k in range(2)]
+        job_ids, job_procs, job_submits = cqp.get_job_data(trace_dir, trace_file)
+        for sim in sims:
+            cqp.set_max_lines(sim, len(job_ids))
+            cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+            cqp.disable_debug_module(sim)
+        cqp.set_job_run_scale_factor(sims[1], scale)
+        cqp.set_job_walltime_scale_factor(sims[1], scale)
+        if (mode == 'pool'):
+            cqp.start_what_if_pool(sims)
+
+        routes = []
+        job_num = min(job_num, len(job_ids))
+        start = time.perf_counter()
+        for i in range(job_num):
+            if (mode == 'fork'):
+                turnarounds = cqp.predict_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            elif (mode == 'estimate'):
+                turnarounds = cqp.estimate_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            elif (mode == 'clone'):
+                turnarounds = cqp.clone_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            else:
+                turnarounds = cqp.pool_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+            if turnarounds:
+                selected_sim = min(turnarounds, key=turnarounds.get)
+            else:
+                selected_sim = None
+            routes.append(selected_sim)
+            for sim in sims:
+                if sim == selected_sim:
+                    cqp.enable_next_job(sim)
+                else:
+                    cqp.disable_next_job(sim)
+                with disable_print():
+                    cqp.line_step(sim)
+        elapsed = time.perf_counter() - start
+        if (mode == 'pool'):
+            cqp.stop_what_if_pool()
+
+    print(f'{mode:>10}: {job_num:>6} jobs  {elapsed:8.3f} s  {job_num/elapsed:10.1f} jobs routed/s')
+    return routes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace-dir', default=os.path.join(SRC_DIR, '../data/InputFiles'))
+    parser.add_argument('--trace', default='theta_1000.swf')
+    parser.add_argument('--procs', type=int, default=2180)
+    parser.add_argument('--scale', type=float, default=2.0)
+    parser.add_argument('--jobs', type=int, default=500)
+    parser.add_argument('--modes', nargs='+', default=['fork', 'estimate', 'clone', 'pool'])
+    args = parser.parse_args()
+    trace_dir = os.path.abspath(args.trace_dir)
+
+    # Cqsim_plus and its modules use paths relative to src
+    os.chdir(SRC_DIR)
+    routes = None
+    for mode in args.modes:
+        temp_routes = run(mode, trace_dir, args.trace, args.procs, args.scale, args.jobs)
+        if routes != None:
+            assert(temp_routes == routes)
+        routes = temp_routes
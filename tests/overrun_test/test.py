@@ -0,0 +1,71 @@
+"""
+This test checks the availability profile of Node_struc_SWF when jobs run past
+their end (a run longer than the walltime, e.g. with a run scale factor).
+
+- profile: the end of a job passed, the backfill check (pre_avail) at the current
+  time must only count the idle processors.
+- simulation: theta_1000.swf on 4360 processors with the runs scaled by 1.5. Every
+  job must be started on idle processors (Cqsim_sim.start raises otherwise) and the
+  processors in use must never exceed 4360.
+
+Run from this directory.
+"""
+import os
+import sys
+import tempfile
+
+os.chdir('../../src')
+sys.path.insert(0, os.getcwd())
+
+import IOModule.Debug_log as Class_Debug_log
+import Extend.SWF.Node_struc_SWF as Class_Node_struc_SWF
+from CqSim.Cqsim_plus import Cqsim_plus
+from utils import disable_print
+
+proc_count = 4360
+
+with tempfile.TemporaryDirectory() as tmp:
+    debug = Class_Debug_log.Debug_log(lvl=0, show=10, path=os.path.join(tmp, 'debug.log'))
+    node = Class_Node_struc_SWF.Node_struc_SWF.from_proc_count(300, debug)
+    node.node_allocate(200, 0, 0, 100)
+    node.node_allocate(50, 1, 0, 1000)
+    node.node_allocate(20, 2, 0, 2000)
+    # job 0 runs past its end (100)
+    node.pre_reset(150)
+    times = [point['time'] for point in node.predict_node]
+    assert(times == sorted(times))
+    assert(node.pre_avail(250, 150, 160) == 0)
+    assert(node.pre_avail(30, 150, 160) == 1)
+    node.node_release(0, 100)
+    node.pre_reset(200)
+    assert(node.pre_avail(230, 200, 210) == 1)
+
+with tempfile.TemporaryDirectory() as tmp:
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    with disable_print():
+        sim = cqp.single_cqsim('../data/InputFiles', 'theta_1000.swf', proc_count=proc_count)
+    job_ids, job_procs, job_submits = cqp.get_job_data('../data/InputFiles', 'theta_1000.swf')
+    cqp.set_max_lines(sim, len(job_ids))
+    cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+    cqp.disable_debug_module(sim)
+    cqp.set_job_run_scale_factor(sim, 1.5)
+    with disable_print():
+        while not cqp.check_sim_ended(sim):
+            cqp.line_step(sim)
+    results = cqp.get_job_results(sim)
+
+# id;reqProc;reqProc;walltime;run;wait;submit;start;end
+events = []
+for result in results:
+    fields = [float(value) for value in result.split(';')]
+    events.append((fields[7], fields[1]))
+    events.append((fields[8], -fields[1]))
+events.sort(key=lambda event: (event[0], event[1]))
+used = 0
+for event_time, proc_num in events:
+    used += proc_num
+    assert(used <= proc_count)
+
+assert(len(results) == len(job_ids))
@@ -0,0 +1,65 @@
+"""
+This test checks Cqsim_plus.estimate_next_job against Cqsim_plus.what_if_clone
+(a copy of the simulator run until the job starts) on theta_1000.swf.
+
+- backfill: modes 1 (EASY), 2 (conservative) and 3.
+- window: the start window (Start_window mode 1) and a beam over it.
+- batch_events: on and off.
+
+Every 25 jobs read, the start and turnaround given by the estimate of the next
+job must be the ones of the clone.
+
+Run from this directory.
+"""
+import os
+import sys
+import tempfile
+
+os.chdir('../../src')
+sys.path.insert(0, os.getcwd())
+
+from CqSim.Cqsim_plus import Cqsim_plus
+from utils import disable_print
+
+proc_count = 4360
+step = 25
+
+configs = [
+    {'backfill':1, 'win':None, 'batch':False},
+    {'backfill':2, 'win':None, 'batch':False},
+    {'backfill':3, 'win':None, 'batch':True},
+    {'backfill':1, 'win':[4, 0, 0], 'batch':False},
+    {'backfill':1, 'win':[4, 0, 0], 'batch':True},
+    {'backfill':1, 'win':[6, 0, 0, 3], 'batch':False},
+]
+
+with tempfile.TemporaryDirectory() as tmp:
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    job_ids, job_procs, job_submits = cqp.get_job_data('../data/InputFiles', 'theta_1000.swf')
+
+    for config in configs:
+        with disable_print():
+            sim = cqp.single_cqsim('../data/InputFiles', 'theta_1000.swf', proc_count=proc_count,\
+             batch_events=config['batch'])
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+        module = cqp.sim_modules[sim].module
+        module['backfill'].reset(mode=config['backfill'])
+        if config['win'] != None:
+            module['win'].reset(mode=1, para_list=config['win'])
+
+        checks = 0
+        line = 0
+        with disable_print():
+            while not cqp.check_sim_ended(sim):
+                cqp.line_step(sim)
+                line += 1
+                if (line % step == 0 and line < len(job_ids)):
+                    estimate = cqp.estimate_next_job(sim, job_ids[line])
+                    clone = cqp.what_if_clone(sim, job_ids[line])
+                    assert estimate == clone, (config, line, estimate, clone)
+                    checks += 1
+        assert(checks == (len(job_ids) - 1) // step)
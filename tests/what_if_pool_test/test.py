@@ -0,0 +1,62 @@
+"""
+This test checks the what-if workers of Cqsim_plus (start_what_if_pool) on
+theta_1000.swf, two clusters of 2180 processors.
+
+- pool_next_job_turnarounds must give the turnarounds of clone_next_job_turnarounds.
+- a worker killed between two queries: the query does not block, the worker is
+  removed from the pool and its turnaround is computed in the current process.
+- a worker stopped (SIGSTOP) during a query: same, after the timeout.
+
+Run from this directory.
+"""
+import os
+import sys
+import signal
+import tempfile
+
+os.chdir('../../src')
+sys.path.insert(0, os.getcwd())
+
+from CqSim.Cqsim_plus import Cqsim_plus
+from utils import disable_print
+
+job_num = 60
+
+with tempfile.TemporaryDirectory() as tmp:
+    cqp = Cqsim_plus()
+    cqp.set_exp_directory(tmp)
+    cqp.set_trace_cache_directory(None)
+    with disable_print():
+        sims = [cqp.single_cqsim('../data/InputFiles', 'theta_1000.swf', proc_count=2180, sim_tag=f'cluster_{k}') for k in range(2)]
+    job_ids, job_procs, job_submits = cqp.get_job_data('../data/InputFiles', 'theta_1000.swf')
+    for sim in sims:
+        cqp.set_max_lines(sim, len(job_ids))
+        cqp.set_sim_times(sim, real_start_time=job_submits[0], virtual_start_time=0)
+        cqp.disable_debug_module(sim)
+    cqp.set_job_run_scale_factor(sims[1], 2.0)
+    cqp.start_what_if_pool(sims)
+
+    for i in range(job_num):
+        if (i == 20):
+            cqp.what_if_pool[sims[0]][0].kill()
+            cqp.what_if_pool[sims[0]][0].join()
+        if (i == 40):
+            os.kill(cqp.what_if_pool[sims[1]][0].pid, signal.SIGSTOP)
+        expected = cqp.clone_next_job_turnarounds(sims, job_ids[i], job_procs[i])
+        turnarounds = cqp.pool_next_job_turnarounds(sims, job_ids[i], job_procs[i], timeout=5)
+        assert turnarounds == expected, (i, turnarounds, expected)
+        if (i >= 20):
+            assert(sims[0] not in cqp.what_if_pool)
+        if (i >= 40):
+            assert(sims[1] not in cqp.what_if_pool)
+        selected_sim = min(turnarounds, key=turnarounds.get) if turnarounds else None
+        for sim in sims:
+            if sim == selected_sim:
+                cqp.enable_next_job(sim)
+            else:
+                cqp.disable_next_job(sim)
+            with disable_print():
+                cqp.line_step(sim)
+
+    cqp.stop_what_if_pool()
+    assert(cqp.what_if_pool == {})